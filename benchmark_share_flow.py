@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark flow chia sẻ trên Studio giả lập (tests/mock_studio.py) với LLM giả.
+Không cần profile Chrome, mạng hay GOOGLE_API_KEY nên kết quả lặp lại được.
+
+    python benchmark_share_flow.py --videos 20 --lang en --passes 2
+
+Lượt 1 chia sẻ mới, các lượt sau đo trường hợp đã chia sẻ (precheck bỏ qua Lưu).
+In videos/phút, số lần gọi LLM/video và p50/p95 từng bước.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+sys.path.append('src')
+
+from tests.mock_studio import MockStudioServer
+
+def run_benchmark(videos, lang, passes, emails, block_resources, headless, prefetch=False, plan=False):
+    server = MockStudioServer(lang=lang).start()
+    # Cấu hình phải có trước khi import agent
+    os.environ["STUDIO_URL"] = server.url
+    os.environ.setdefault("SELECTOR_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "selector_cache.json"))
+
+    from playwright.sync_api import sync_playwright
+    from src.agent.youtube_share_agent import share_video_on_page, new_share_page, prefetch_video_page, get_share_llm
+    from src.agent.youtube_share_plan import SharePlanner
+    from src.agent.youtube_share_routing import ResourceBlocker
+    from src.agent.youtube_share_helpers import install_share_helpers
+    from src.agent.youtube_share_trace import get_tracer, span, print_trace_summary
+    from tests.fake_llm import install_fake_llm
+
+    registry = install_fake_llm()
+    # Với --plan: một lần gọi LLM lập selector cho cả flow thay cho LLM của từng bước
+    planner = SharePlanner(get_share_llm) if plan else None
+    tracer = get_tracer()
+    video_ids = [f"mockVid{i:04d}" for i in range(videos)]
+    report = []
+
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=headless)
+            context = install_share_helpers(browser.new_context())
+            if block_resources:
+                ResourceBlocker().attach(context)
+            # Với --prefetch: hai tab luân phiên, tab kia tải trước video kế tiếp
+            pages = [new_share_page(context) for _ in range(2 if prefetch else 1)]
+            for pass_no in range(1, passes + 1):
+                tracer.reset()
+                llm_before = sum(s["calls"] for s in registry.stats()["calls"].values())
+                saves_before = server.requests["save"]
+                succeeded = 0
+                start = time.perf_counter()
+                with span(f"pass {pass_no}", "batch"):
+                    prefetched = None
+                    for i, video_id in enumerate(video_ids):
+                        page = pages[i % len(pages)]
+                        is_prefetched = prefetched == video_id
+                        prefetched = None
+                        if prefetch and i + 1 < len(video_ids):
+                            if prefetch_video_page(pages[(i + 1) % len(pages)], video_ids[i + 1]):
+                                prefetched = video_ids[i + 1]
+                        with span(video_id, "video"):
+                            if share_video_on_page(page, video_id, emails, prefetched=is_prefetched, planner=planner):
+                                succeeded += 1
+                elapsed = time.perf_counter() - start
+                llm_calls = sum(s["calls"] for s in registry.stats()["calls"].values()) - llm_before
+                report.append({
+                    "pass": pass_no,
+                    "succeeded": succeeded,
+                    "elapsed": elapsed,
+                    "videos_per_minute": videos / elapsed * 60 if elapsed else 0.0,
+                    "llm_calls_per_video": llm_calls / videos if videos else 0.0,
+                    "saves": server.requests["save"] - saves_before,
+                    "summary": tracer.summary()
+                })
+            browser.close()
+    finally:
+        server.stop()
+
+    print(f"\n{'='*60}")
+    print(f"📊 BENCHMARK ({videos} video, giao diện {lang}, {len(emails)} email{', prefetch' if prefetch else ''}{', plan' if plan else ''})")
+    print(f"{'='*60}")
+    for r in report:
+        print(f"\nLượt {r['pass']}: {r['succeeded']}/{videos} thành công, {r['elapsed']:.1f}s, "
+              f"{r['videos_per_minute']:.1f} video/phút, {r['llm_calls_per_video']:.2f} LLM call/video, {r['saves']} lần Lưu")
+        print_trace_summary(r["summary"])
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark flow chia sẻ trên Studio giả lập")
+    parser.add_argument("--videos", type=int, default=10)
+    parser.add_argument("--lang", choices=["vi", "en"], default="vi")
+    parser.add_argument("--passes", type=int, default=2)
+    parser.add_argument("--emails", default="test1@gmail.com,test2@gmail.com")
+    parser.add_argument("--block-resources", action="store_true")
+    parser.add_argument("--prefetch", action="store_true", help="Tải trước video kế tiếp trong tab thứ hai")
+    parser.add_argument("--plan", action="store_true", help="Planning mode: một lần gọi LLM cho cả flow")
+    parser.add_argument("--headed", action="store_true", help="Hiện cửa sổ browser")
+    args = parser.parse_args()
+    run_benchmark(
+        args.videos,
+        args.lang,
+        args.passes,
+        [e.strip() for e in args.emails.split(",") if e.strip()],
+        args.block_resources,
+        headless=not args.headed,
+        prefetch=args.prefetch,
+        plan=args.plan
+    )
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,102 @@ import os
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-import json
 import time
 
+from src.agent.youtube_share_waits import (
+    wait_for_keyword_element,
+    wait_for_dialog_open,
+    wait_for_email_field,
+    wait_for_dialog_closed,
+    wait_for_button_enabled,
+    wait_for_dom_settled,
+    count_visible_dialogs,
+    click_and_wait_for_save,
+    EMAIL_FIELD_SELECTOR
+)
+from src.agent.youtube_share_selector_cache import get_selector_cache, get_cache_key, click_cached_selector
+from src.agent.youtube_share_snapshot import (
+    snapshot_to_page_info,
+    rank_elements,
+    click_snapshot_element
+)
+from src.agent.youtube_share_axtree import take_snapshot, invalidate_snapshot, print_ax_stats
+from src.agent.youtube_share_prompt import build_llm_context, keywords_for_step, prompt_token_summary
+from src.agent.youtube_share_extract import extract_share_info_cached, get_extract_cache
+from src.agent.youtube_share_llm import get_llm_client, print_llm_stats
+from src.agent.youtube_share_response import invoke_structured, print_parse_stats
+from src.agent.youtube_share_schemas import ShareInfo, AIAction, FoundElement, PopupDone, FoundInput
+from src.agent.youtube_share_journal import ShareJournal, job_id_slug, STATUS_IN_PROGRESS, STATUS_DONE, STATUS_FAILED, STATUS_SKIPPED
+from src.agent.youtube_share_precheck import precheck_share
+from src.agent.youtube_share_manifest import ShareManifest
+from src.agent.youtube_share_routing import BLOCK_RESOURCES, ResourceBlocker, format_saved
+from src.agent.youtube_share_trace import span, get_tracer, print_trace_summary
+from src.agent.youtube_share_ratelimit import ShareRateLimiter, MAX_THROTTLE_RETRIES
+from src.agent.youtube_share_helpers import install_share_helpers, call_helper
+from src.agent.youtube_share_memory import MemoryWatchdog, RECYCLE_PAGE, RESTART_CONTEXT, print_memory_stats
+from src.agent.youtube_share_plan import PLAN_MODE, SharePlanner, plan_strategy, print_plan_stats
+from src.agent.youtube_share_steps import (
+    Strategy,
+    ShareStep,
+    run_steps,
+    print_step_summary,
+    dialog_scope,
+    role_strategy,
+    snapshot_strategy,
+    function_strategy
+)
+
 # Load biến môi trường từ file .env
 load_dotenv()
 
 PROFILE_PATH = os.getenv("BROWSER_USER_DATA", "")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
 LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.5-flash")
+# Đổi sang Studio giả lập khi chạy benchmark offline (tests/mock_studio.py)
+STUDIO_URL = os.getenv("STUDIO_URL", "https://studio.youtube.com").rstrip("/")
+
+VISIBILITY_KEYWORDS = ["chế độ hiển thị", "visibility"]
+DONE_KEYWORDS = ["xong", "done"]
+DONE_NAMES = ["Xong", "Done"]
+# Từ khóa cho các hàm tìm nút bằng JavaScript (window.__ytShare)
+DONE_BUTTON_KEYWORDS = ["xong", "done", "ok", "confirm", "apply"]
+EDIT_BUTTON_KEYWORDS = ["chỉnh sửa", "edit", "sửa", "modify"]
+SAVE_NAMES = ["Lưu", "Save"]
+
+# YouTube giới hạn số người được chia sẻ một video riêng tư
+MAX_SHARE_EMAILS = 50
+# Số email nhập vào dialog mỗi lần
+EMAIL_CHUNK_SIZE = 10
+
+BROWSER_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-web-security',
+    '--no-sandbox',
+    '--window-size=1280,800',
+    # Tab nền (prefetch video kế tiếp) vẫn tải trang với tốc độ bình thường
+    '--disable-background-timer-throttling',
+    '--disable-renderer-backgrounding',
+    '--disable-backgrounding-occluded-windows',
+]
+
+# Tải trước trang edit của video kế tiếp trong tab thứ hai khi đang thao tác video hiện tại (1 = bật)
+PREFETCH_NEXT = os.getenv("SHARE_PREFETCH", "0") == "1"
+
+def get_share_llm():
+    """
+    Client Gemini dùng chung cho agent (tạo một lần, giữ kết nối giữa các lần gọi)
+    """
+    return get_llm_client(LLM_MODEL, google_api_key=GOOGLE_API_KEY)
 
 def extract_share_info(prompt: str):
+    """
+    Trích xuất video_id, email cần chia sẻ từ prompt. Hỗ trợ nhiều video_id cùng lúc.
+    Dùng regex cho trường hợp thông thường, chỉ gọi LLM khi lệnh mơ hồ
+    (kết quả được nhớ theo prompt, xem youtube_share_extract).
+    """
+    return extract_share_info_cached(prompt, extract_share_info_with_llm)
+
+def extract_share_info_with_llm(prompt: str):
     """
     Sử dụng LLM để phân tích prompt và trích xuất video_id, email cần chia sẻ.
     Hỗ trợ nhiều video_id cùng lúc.
@@ -22,143 +106,17 @@ def extract_share_info(prompt: str):
         ("system", "Bạn là AI chuyên phân tích lệnh chia sẻ video YouTube riêng tư. Hãy trích xuất video_id và email từ lệnh người dùng. Hỗ trợ nhiều video_id cùng lúc. Trả về JSON với format: {{\"video_ids\": [\"...\", \"...\"], \"emails\": [\"...\"]}}. Nếu không đủ thông tin, trả về lỗi rõ ràng."),
         ("user", "{prompt}")
     ])
-    llm = ChatGoogleGenerativeAI(model=LLM_MODEL, google_api_key=GOOGLE_API_KEY)
-    chain = template | llm
-    result = chain.invoke({"prompt": prompt})
-    
-    # Tìm JSON trong kết quả (xử lý cả markdown code block và JSON thường)
-    import re, json
-    
-    # Lấy content từ result
-    result_str = str(result.content) if hasattr(result, 'content') else str(result)
-    
-    # Thử tìm JSON trong markdown code block trước
-    markdown_pattern = r'```(?:json)?\s*(\{[\s\S]*?\})\s*```'
-    markdown_match = re.search(markdown_pattern, result_str)
-    if markdown_match:
-        try:
-            json_str = markdown_match.group(1)
-            data = json.loads(json_str)
-            return data
-        except Exception as e:
-            pass
-    
-    # Nếu không tìm thấy trong markdown, thử tìm JSON thường
-    json_pattern = r'\{[\s\S]*?\}'
-    json_match = re.search(json_pattern, result_str)
-    if json_match:
-        try:
-            json_str = json_match.group(0)
-            data = json.loads(json_str)
-            return data
-        except Exception as e:
-            pass
-    
-    raise ValueError(f"Không thể phân tích prompt: {result}")
+    data = invoke_structured("extract_share_info", get_share_llm(), ShareInfo, {"prompt": prompt}, template=template)
+    if not data:
+        raise ValueError(f"Không thể phân tích prompt: {prompt}")
+    return data
 
 def get_page_info(page):
     """
     Lấy thông tin về trang hiện tại để AI có thể phân tích
+    (cây accessibility đã cache hoặc một lần đi qua DOM, xem youtube_share_axtree)
     """
-    # Lấy tất cả text hiển thị trên trang
-    page_text = page.evaluate("""
-        () => {
-            const walker = document.createTreeWalker(
-                document.body,
-                NodeFilter.SHOW_TEXT,
-                null,
-                false
-            );
-            const texts = [];
-            let node;
-            while (node = walker.nextNode()) {
-                const text = node.textContent.trim();
-                if (text && text.length > 0) {
-                    texts.push(text);
-                }
-            }
-            return texts.join(' | ');
-        }
-    """)
-    
-    # Lấy thông tin về các element có thể click (mở rộng tìm kiếm)
-    clickable_elements = page.evaluate("""
-        () => {
-            // Tìm tất cả các element có thể click
-            const selectors = [
-                'button', '[role="button"]', 'ytcp-button', 
-                'input[type="button"]', 'input[type="submit"]',
-                'div[onclick]', 'span[onclick]', 'a[onclick]',
-                'div[tabindex]', 'span[tabindex]', 'a[tabindex]',
-                '[data-testid*="visibility"]', '[data-testid*="share"]',
-                '[aria-label*="visibility"]', '[aria-label*="share"]',
-                '.ytcp-button', '.ytcp-dropdown-trigger',
-                '[class*="visibility"]', '[class*="share"]',
-                '[class*="dropdown"]', '[class*="menu"]'
-            ];
-            
-            const elements = [];
-            selectors.forEach(selector => {
-                try {
-                    const found = document.querySelectorAll(selector);
-                    found.forEach(el => {
-                        if (el.offsetParent !== null) { // Chỉ lấy element visible
-                            const text = el.textContent?.trim() || el.innerText?.trim() || '';
-                            const ariaLabel = el.getAttribute('aria-label') || '';
-                            const title = el.getAttribute('title') || '';
-                            const dataTestId = el.getAttribute('data-testid') || '';
-                            
-                            if (text || ariaLabel || title || dataTestId) {
-                                elements.push({
-                                    text: text,
-                                    ariaLabel: ariaLabel,
-                                    title: title,
-                                    dataTestId: dataTestId,
-                                    tagName: el.tagName,
-                                    className: el.className,
-                                    id: el.id,
-                                    selector: selector,
-                                    visible: true
-                                });
-                            }
-                        }
-                    });
-                } catch (e) {
-                    // Bỏ qua selector không hợp lệ
-                }
-            });
-            
-            // Loại bỏ duplicate
-            const unique = elements.filter((el, index, self) => 
-                index === self.findIndex(t => 
-                    t.text === el.text && t.tagName === el.tagName
-                )
-            );
-            
-            return unique;
-        }
-    """)
-    
-    # Lấy thông tin về các input field
-    inputs_info = page.evaluate("""
-        () => {
-            const inputs = Array.from(document.querySelectorAll('input, textarea'));
-            return inputs.map(input => ({
-                type: input.type,
-                placeholder: input.placeholder,
-                value: input.value,
-                className: input.className,
-                id: input.id,
-                visible: input.offsetParent !== null
-            })).filter(input => input.visible);
-        }
-    """)
-    
-    return {
-        "page_text": page_text,
-        "clickable_elements": clickable_elements,
-        "inputs": inputs_info
-    }
+    return snapshot_to_page_info(take_snapshot(page))
 
 def ask_ai_for_action(page_info, current_step, emails=None):
     """
@@ -213,28 +171,17 @@ def ask_ai_for_action(page_info, current_step, emails=None):
         Hãy cho biết cần thực hiện thao tác gì tiếp theo.""")
     ])
     
-    llm = ChatGoogleGenerativeAI(model=LLM_MODEL, google_api_key=GOOGLE_API_KEY)
-    chain = template | llm
-    
-    result = chain.invoke({
-        "page_text": page_info["page_text"],
-        "clickable_elements": json.dumps(page_info["clickable_elements"], indent=2),
-        "inputs": json.dumps(page_info["inputs"], indent=2),
+    # Chỉ gửi phần trang liên quan đến bước hiện tại, trong ngân sách token
+    context = build_llm_context(page_info, current_step)
+    result = invoke_structured("ask_ai_for_action", get_share_llm(), AIAction, {
+        "page_text": context["page_text"],
+        "clickable_elements": context["clickable_elements"],
+        "inputs": context["inputs"],
         "current_step": current_step,
         "emails": emails or []
-    })
-    
-    # Parse JSON response
-    import re
-    result_str = str(result.content) if hasattr(result, 'content') else str(result)
-    
-    # Tìm JSON trong response
-    json_match = re.search(r'\{[\s\S]*?\}', result_str)
-    if json_match:
-        try:
-            return json.loads(json_match.group(0))
-        except:
-            pass
+    }, template=template)
+    if result:
+        return result
     
     return {"action": "error", "message": "Không thể parse response từ AI"}
 
@@ -364,9 +311,8 @@ def execute_ai_action(page, action_info, current_step):
             return False
     
     elif action == "wait":
-        time.sleep(2)
         print("Đang chờ...")
-        return True
+        return wait_for_dom_settled(page)
     
     elif action == "done":
         print("Hoàn tất!")
@@ -378,85 +324,23 @@ def execute_ai_action(page, action_info, current_step):
     
     return False
 
-def debug_page_elements(page):
+def debug_page_elements(page, page_info=None):
     """
     Debug: In ra thông tin chi tiết về các element trên trang
     """
     print("\n=== DEBUG: THÔNG TIN ELEMENT TRÊN TRANG ===")
     
-    # Lấy tất cả text
-    page_text = page.evaluate("""
-        () => {
-            const walker = document.createTreeWalker(
-                document.body,
-                NodeFilter.SHOW_TEXT,
-                null,
-                false
-            );
-            const texts = [];
-            let node;
-            while (node = walker.nextNode()) {
-                const text = node.textContent.trim();
-                if (text && text.length > 0 && text.length < 100) {
-                    texts.push(text);
-                }
-            }
-            return texts.slice(0, 20); // Chỉ lấy 20 text đầu tiên
-        }
-    """)
-    print(f"Text trên trang: {page_text}")
+    if page_info is None:
+        page_info = get_page_info(page)
     
-    # Lấy tất cả element có thể click
-    clickable = page.evaluate("""
-        () => {
-            const selectors = [
-                'button', '[role="button"]', 'ytcp-button', 
-                'div[onclick]', 'span[onclick]', 'a[onclick]',
-                'div[tabindex]', 'span[tabindex]', 'a[tabindex]',
-                '[data-testid*="visibility"]', '[data-testid*="share"]',
-                '[aria-label*="visibility"]', '[aria-label*="share"]',
-                '.ytcp-button', '.ytcp-dropdown-trigger',
-                '[class*="visibility"]', '[class*="share"]',
-                '[class*="dropdown"]', '[class*="menu"]'
-            ];
-            
-            const elements = [];
-            selectors.forEach(selector => {
-                try {
-                    const found = document.querySelectorAll(selector);
-                    found.forEach(el => {
-                        if (el.offsetParent !== null) {
-                            const text = el.textContent?.trim() || el.innerText?.trim() || '';
-                            const ariaLabel = el.getAttribute('aria-label') || '';
-                            const title = el.getAttribute('title') || '';
-                            const dataTestId = el.getAttribute('data-testid') || '';
-                            
-                            if (text || ariaLabel || title || dataTestId) {
-                                elements.push({
-                                    text: text,
-                                    ariaLabel: ariaLabel,
-                                    title: title,
-                                    dataTestId: dataTestId,
-                                    tagName: el.tagName,
-                                    className: el.className,
-                                    id: el.id,
-                                    selector: selector
-                                });
-                            }
-                        }
-                    });
-                } catch (e) {
-                    // Bỏ qua selector không hợp lệ
-                }
-            });
-            
-            return elements.slice(0, 10); // Chỉ lấy 10 element đầu tiên
-        }
-    """)
+    # Chỉ in 20 text ngắn đầu tiên
+    page_text = [t for t in page_info["snapshot"]["texts"] if len(t) < 100][:20]
+    print(f"Text trên trang: {page_text}")
     
     print(f"\nElement có thể click:")
-    for i, elem in enumerate(clickable):
-        print(f"  {i+1}. Text: '{elem['text']}' | Aria: '{elem['ariaLabel']}' | Title: '{elem['title']}' | Tag: {elem['tagName']} | Class: {elem['className']}")
+    for i, elem in enumerate(page_info["clickable_elements"][:10]):
+        print(f"  {i+1}. Text: '{elem['text']}' | Aria: '{elem.get('ariaLabel', '')}' | Title: '{elem.get('title', '')}' | "
+              f"Tag: {elem.get('tagName') or elem.get('role')} | Class: {elem.get('className', '')}")
     
     print("=== KẾT THÚC DEBUG ===\n")
 
@@ -465,48 +349,9 @@ def click_element_by_javascript(page, target):
     Click element bằng JavaScript trực tiếp
     """
     try:
-        # Thử click bằng JavaScript với nhiều selector khác nhau
-        selectors = [
-            f'button:contains("{target}")',
-            f'[role="button"]:contains("{target}")',
-            f'div:contains("{target}")',
-            f'span:contains("{target}")',
-            f'a:contains("{target}")',
-            f'ytcp-button:contains("{target}")',
-            f'[aria-label*="{target}"]',
-            f'[title*="{target}"]',
-            f'[data-testid*="{target.lower()}"]',
-            f'[class*="{target.lower()}"]'
-        ]
-        
-        for selector in selectors:
-            try:
-                # Thử click bằng JavaScript
-                result = page.evaluate(f"""
-                    () => {{
-                        const elements = document.querySelectorAll('{selector.replace(":contains", "")}');
-                        for (let el of elements) {{
-                            const text = el.textContent || el.innerText || '';
-                            const ariaLabel = el.getAttribute('aria-label') || '';
-                            const title = el.getAttribute('title') || '';
-                            
-                            if (text.includes('{target}') || ariaLabel.includes('{target}') || title.includes('{target}')) {{
-                                if (el.offsetParent !== null) {{
-                                    el.click();
-                                    return true;
-                                }}
-                            }}
-                        }}
-                        return false;
-                    }}
-                """)
-                
-                if result:
-                    print(f"Đã click (JavaScript): {target}")
-                    return True
-            except:
-                continue
-        
+        if call_helper(page, "clickByText", target):
+            print(f"Đã click (JavaScript): {target}")
+            return True
         return False
     except Exception as e:
         print(f"Lỗi JavaScript click: {e}")
@@ -533,46 +378,18 @@ def find_similar_element(page, target):
         
         keywords = similar_keywords.get(target, [target.lower()])
         
-        # Tìm tất cả element có text
-        elements = page.evaluate(f"""
-            () => {{
-                const allElements = document.querySelectorAll('button, [role="button"], div, span, a, ytcp-button, [tabindex]');
-                const results = [];
-                
-                for (let el of allElements) {{
-                    if (el.offsetParent !== null) {{
-                        const text = (el.textContent || el.innerText || '').toLowerCase();
-                        const ariaLabel = (el.getAttribute('aria-label') || '').toLowerCase();
-                        const title = (el.getAttribute('title') || '').toLowerCase();
-                        
-                        for (let keyword of {keywords}) {{
-                            if (text.includes(keyword) || ariaLabel.includes(keyword) || title.includes(keyword)) {{
-                                results.push({{
-                                    element: el,
-                                    text: el.textContent || el.innerText || '',
-                                    ariaLabel: el.getAttribute('aria-label') || '',
-                                    tagName: el.tagName,
-                                    className: el.getAttribute('class') || '',
-                                    id: el.getAttribute('id') || '',
-                                    tabIndex: el.getAttribute('tabindex')
-                                }});
-                                break;
-                            }}
-                        }}
-                    }}
-                }}
-                
-                return results.slice(0, 5); // Chỉ lấy 5 kết quả đầu tiên
-            }}
-        """)
+        # Chấm điểm trên snapshot thay vì quét lại toàn bộ DOM
+        ranked = rank_elements(take_snapshot(page)["elements"], keywords)
+        elements = [el for _, el in ranked[:5]]
         
         if elements:
             print(f"Tìm thấy {len(elements)} element tương tự với '{target}':")
             for i, elem in enumerate(elements):
-                print(f"  {i+1}. Text: '{elem['text']}' | Aria: '{elem['ariaLabel']}' | Tag: {elem['tagName']} | TabIndex: {elem['tabIndex']}")
+                print(f"  {i+1}. Text: '{elem['text']}' | Aria: '{elem['ariaLabel']}' | Tag: {elem['tagName']}")
             
             # Thử click vào element đầu tiên
-            if click_element_by_javascript(page, elements[0]['text']):
+            if click_snapshot_element(page, elements[0]):
+                print(f"Đã click (snapshot): {elements[0]['text']}")
                 return True
         
         return False
@@ -588,13 +405,14 @@ def handle_popup_done(page):
     
     # Bước 1: Tìm popup/modal bằng AI
     page_info = get_page_info(page)
+    context = build_llm_context(page_info, "Xong hoặc Done trong popup", include_inputs=False)
     
     ai_prompt = f"""
     Tìm popup/modal trên trang này và nút "Xong" hoặc "Done" trong popup đó.
     
     Thông tin trang:
-    - Text: {page_info['page_text'][:500]}...
-    - Clickable elements: {json.dumps(page_info['clickable_elements'][:10], indent=2)}
+    - Text: {context['page_text']}
+    - Clickable elements: {context['clickable_elements']}
     
     Hãy phân tích và trả về JSON với format:
     {{
@@ -607,15 +425,9 @@ def handle_popup_done(page):
     """
     
     try:
-        llm = ChatGoogleGenerativeAI(model=LLM_MODEL, google_api_key=GOOGLE_API_KEY)
-        result = llm.invoke(ai_prompt)
+        ai_result = invoke_structured("handle_popup_done", get_share_llm(), PopupDone, ai_prompt)
         
-        import re
-        result_str = str(result.content)
-        json_match = re.search(r'\{[\s\S]*?\}', result_str)
-        
-        if json_match:
-            ai_result = json.loads(json_match.group(0))
+        if ai_result:
             if ai_result.get("found_popup") and ai_result.get("found_done_button"):
                 popup_selector = ai_result.get("popup_selector")
                 done_selector = ai_result.get("done_button_selector")
@@ -637,62 +449,7 @@ def handle_popup_done(page):
     print("🔧 Thử logic thủ công thông minh cho popup...")
     
     # Tìm popup/modal bằng JavaScript thông minh
-    result = page.evaluate("""
-        () => {
-            const popupSelectors = [
-                '[role="dialog"]',
-                '[class*="modal"]',
-                '[class*="popup"]',
-                '[class*="dialog"]',
-                '.ytcp-dialog',
-                '.ytcp-modal',
-                'tp-yt-paper-dialog',
-                '[data-testid*="dialog"]',
-                '[data-testid*="modal"]',
-                '[data-testid*="popup"]'
-            ];
-            
-            for (let selector of popupSelectors) {
-                try {
-                    const popups = document.querySelectorAll(selector);
-                    for (let popup of popups) {
-                        if (popup.offsetParent !== null) {
-                            // Tìm nút Xong trong popup
-                            const keywords = ['xong', 'done', 'ok', 'confirm', 'apply'];
-                            const buttons = popup.querySelectorAll('button, [role="button"], ytcp-button, div, span, a');
-                            
-                            for (let btn of buttons) {
-                                if (btn.offsetParent !== null) {
-                                    const text = (btn.textContent || btn.innerText || '').toLowerCase();
-                                    const ariaLabel = (btn.getAttribute('aria-label') || '').toLowerCase();
-                                    
-                                    for (let keyword of keywords) {
-                                        if (text.includes(keyword) || ariaLabel.includes(keyword)) {
-                                            try {
-                                                btn.click();
-                                                return {
-                                                    success: true,
-                                                    popupSelector: selector,
-                                                    buttonText: btn.textContent || btn.innerText || '',
-                                                    keyword: keyword
-                                                };
-                                            } catch (e) {
-                                                continue;
-                                            }
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    }
-                } catch (e) {
-                    continue;
-                }
-            }
-            
-            return {success: false};
-        }
-    """)
+    result = call_helper(page, "clickInPopup", DONE_BUTTON_KEYWORDS)
     
     if result.get('success'):
         print(f"✅ Đã click Xong trong popup thông minh: '{result.get('buttonText', '')}'")
@@ -704,7 +461,7 @@ def handle_popup_done(page):
     print("🔄 Fallback: tìm nút Xong thông thường...")
     return find_done_button(page)
 
-def find_visibility_button(page):
+def find_visibility_button(page, use_cache=True, use_llm=True):
     """
     Tìm và click vào nút "Chế độ hiển thị" sử dụng logic thông minh
     """
@@ -712,10 +469,12 @@ def find_visibility_button(page):
         page, 
         "Chế độ hiển thị hoặc Visibility", 
         "button",
-        fallback_selectors=['button:has-text("Chế độ hiển thị")', 'button:has-text("Visibility")']
+        fallback_selectors=['button:has-text("Chế độ hiển thị")', 'button:has-text("Visibility")'],
+        use_cache=use_cache,
+        use_llm=use_llm
     )
 
-def find_share_button(page):
+def find_share_button(page, use_llm=True):
     """
     Tìm và click vào nút "Chia sẻ riêng tư" hoặc "Chỉnh sửa" sử dụng logic thông minh
     """
@@ -723,95 +482,7 @@ def find_share_button(page):
     
     # Bước 1: Tìm nút Chỉnh sửa trước (khi video đã chia sẻ)
     print("🔍 Tìm kiếm nút Chỉnh sửa...")
-    result = page.evaluate("""
-        () => {
-            const keywords = ['chỉnh sửa', 'edit', 'sửa', 'modify'];
-            const elements = document.querySelectorAll('button, [role="button"], div, span, a, ytcp-button');
-            const foundElements = [];
-            
-            for (let el of elements) {
-                if (el.offsetParent !== null) {
-                    const text = (el.textContent || el.innerText || '').toLowerCase();
-                    const ariaLabel = (el.getAttribute('aria-label') || '').toLowerCase();
-                    
-                    for (let keyword of keywords) {
-                        if (text.includes(keyword) || ariaLabel.includes(keyword)) {
-                            foundElements.push({
-                                element: el,
-                                text: el.textContent || el.innerText || '',
-                                ariaLabel: el.getAttribute('aria-label') || '',
-                                tagName: el.tagName,
-                                className: el.getAttribute('class') || ''
-                            });
-                            break;
-                        }
-                    }
-                }
-            }
-            
-            // Sắp xếp theo độ ưu tiên: button > role="button" > div/span
-            foundElements.sort((a, b) => {
-                const aPriority = a.tagName === 'BUTTON' ? 3 : (a.element.getAttribute('role') === 'button' ? 2 : 1);
-                const bPriority = b.tagName === 'BUTTON' ? 3 : (b.element.getAttribute('role') === 'button' ? 2 : 1);
-                return bPriority - aPriority;
-            });
-            
-            // Thử click element đầu tiên
-            if (foundElements.length > 0) {
-                const element = foundElements[0].element;
-                try {
-                    // Thử click thông thường trước
-                    element.click();
-                    return {
-                        success: true,
-                        text: foundElements[0].text,
-                        tagName: foundElements[0].tagName,
-                        className: foundElements[0].className,
-                        method: 'normal_click'
-                    };
-                } catch (e) {
-                    // Nếu không được, thử trigger event
-                    try {
-                        element.dispatchEvent(new MouseEvent('click', {
-                            bubbles: true,
-                            cancelable: true,
-                            view: window
-                        }));
-                        return {
-                            success: true,
-                            text: foundElements[0].text,
-                            tagName: foundElements[0].tagName,
-                            className: foundElements[0].className,
-                            method: 'mouse_event'
-                        };
-                    } catch (e2) {
-                        // Cuối cùng thử focus và Enter
-                        try {
-                            element.focus();
-                            element.dispatchEvent(new KeyboardEvent('keydown', {
-                                key: 'Enter',
-                                code: 'Enter',
-                                keyCode: 13,
-                                which: 13,
-                                bubbles: true
-                            }));
-                            return {
-                                success: true,
-                                text: foundElements[0].text,
-                                tagName: foundElements[0].tagName,
-                                className: foundElements[0].className,
-                                method: 'keyboard_event'
-                            };
-                        } catch (e3) {
-                            console.log('Tất cả phương pháp click đều thất bại');
-                        }
-                    }
-                }
-            }
-            
-            return {success: false, foundElements: foundElements};
-        }
-    """)
+    result = call_helper(page, "clickEditButton", EDIT_BUTTON_KEYWORDS)
     
     if result.get('success'):
         print(f"✅ Đã click nút Chỉnh sửa ({result.get('method')}): '{result.get('text', '').strip()}'")
@@ -829,10 +500,11 @@ def find_share_button(page):
         page, 
         "Chia sẻ riêng tư hoặc Chia sẻ", 
         "button",
-        fallback_selectors=['button:has-text("Chia sẻ riêng tư")', 'button:has-text("Chia sẻ")']
+        fallback_selectors=['button:has-text("Chia sẻ riêng tư")', 'button:has-text("Chia sẻ")'],
+        use_llm=use_llm
     )
 
-def find_done_button(page):
+def find_done_button(page, use_llm=True):
     """
     Tìm và click vào nút "Xong" sử dụng logic thông minh
     """
@@ -840,7 +512,8 @@ def find_done_button(page):
         page, 
         "Xong hoặc Done", 
         "button",
-        fallback_selectors=['#done-button', 'button:has-text("Xong")', 'button:has-text("Done")']
+        fallback_selectors=['#done-button', 'button:has-text("Xong")', 'button:has-text("Done")'],
+        use_llm=use_llm
     )
 
 def find_done_button_enabled(page):
@@ -849,79 +522,9 @@ def find_done_button_enabled(page):
     """
     print("🔍 Tìm kiếm nút Xong enabled...")
     
-    result = page.evaluate("""
-        () => {
-            const keywords = ['xong', 'done', 'ok', 'confirm', 'apply'];
-            const buttons = document.querySelectorAll('button, [role="button"], ytcp-button');
-            const foundButtons = [];
-            
-            for (let btn of buttons) {
-                if (btn.offsetParent !== null) {
-                    const text = (btn.textContent || btn.innerText || '').toLowerCase();
-                    const ariaLabel = (btn.getAttribute('aria-label') || '').toLowerCase();
-                    const className = (btn.getAttribute('class') || '').toLowerCase();
-                    const disabled = btn.disabled;
-                    
-                    // Kiểm tra có phải nút Xong không
-                    for (let keyword of keywords) {
-                        if (text.includes(keyword) || ariaLabel.includes(keyword)) {
-                            foundButtons.push({
-                                element: btn,
-                                text: btn.textContent || btn.innerText || '',
-                                ariaLabel: btn.getAttribute('aria-label') || '',
-                                className: className,
-                                disabled: disabled,
-                                score: 0
-                            });
-                            break;
-                        }
-                    }
-                }
-            }
-            
-            // Sắp xếp: enabled trước, disabled sau
-            foundButtons.sort((a, b) => {
-                if (a.disabled !== b.disabled) {
-                    return a.disabled ? 1 : -1; // enabled trước
-                }
-                return b.score - a.score;
-            });
-            
-            // Thử click nút enabled đầu tiên
-            for (let btn of foundButtons) {
-                if (!btn.disabled && !btn.className.includes('disabled')) {
-                    try {
-                        btn.element.click();
-                        return {
-                            success: true,
-                            text: btn.text,
-                            enabled: true,
-                            className: btn.className
-                        };
-                    } catch (e) {
-                        continue;
-                    }
-                }
-            }
-            
-            // Nếu không có nút enabled, thử click nút disabled đầu tiên
-            if (foundButtons.length > 0) {
-                try {
-                    foundButtons[0].element.click();
-                    return {
-                        success: true,
-                        text: foundButtons[0].text,
-                        enabled: false,
-                        className: foundButtons[0].className
-                    };
-                } catch (e) {
-                    return {success: false, error: e.toString()};
-                }
-            }
-            
-            return {success: false, foundButtons: foundButtons};
-        }
-    """)
+    # Chờ nút Xong được bật (observer trong trang) để không click nút còn disabled
+    wait_for_button_enabled(page, "done_enabled", DONE_BUTTON_KEYWORDS, timeout=2000)
+    result = call_helper(page, "clickEnabledButton", DONE_BUTTON_KEYWORDS)
     
     if result.get('success'):
         enabled_status = "enabled" if result.get('enabled') else "disabled"
@@ -938,7 +541,7 @@ def find_done_button_enabled(page):
     print("❌ Không tìm thấy nút Xong enabled")
     return False
 
-def find_save_button(page):
+def find_save_button(page, use_cache=True, use_llm=True):
     """
     Tìm và click vào nút "Lưu" sử dụng logic thông minh
     """
@@ -946,25 +549,24 @@ def find_save_button(page):
         page, 
         "Lưu hoặc Save", 
         "button",
-        fallback_selectors=['button:has-text("Lưu")', 'button:has-text("Save")', '#save-button']
+        fallback_selectors=['button:has-text("Lưu")', 'button:has-text("Save")', '#save-button'],
+        use_cache=use_cache,
+        use_llm=use_llm
     )
 
-def smart_find_element(page, target_description, element_type="button", fallback_selectors=None):
+def ask_ai_for_element(page, page_info, target_description, cache, cache_key):
     """
-    Tìm element thông minh bằng cách kết hợp AI và logic thủ công
+    Hỏi AI selector của element và click, ghi selector vào cache nếu click được
     """
-    print(f"🧠 Tìm kiếm thông minh: {target_description}")
-    
-    # Bước 1: Hỏi AI để phân tích trang và tìm element
-    page_info = get_page_info(page)
+    context = build_llm_context(page_info, target_description, include_inputs=False)
     
     # Tạo prompt cho AI để tìm element cụ thể
     ai_prompt = f"""
     Tìm element "{target_description}" trên trang này.
     
     Thông tin trang:
-    - Text: {page_info['page_text'][:500]}...
-    - Clickable elements: {json.dumps(page_info['clickable_elements'][:10], indent=2)}
+    - Text: {context['page_text']}
+    - Clickable elements: {context['clickable_elements']}
     
     Hãy phân tích và trả về JSON với format:
     {{
@@ -989,18 +591,11 @@ def smart_find_element(page, target_description, element_type="button", fallback
     
     try:
         # Hỏi AI
-        llm = ChatGoogleGenerativeAI(model=LLM_MODEL, google_api_key=GOOGLE_API_KEY)
-        result = llm.invoke(ai_prompt)
-        
-        # Parse kết quả AI
-        import re
-        result_str = str(result.content)
-        json_match = re.search(r'\{[\s\S]*?\}', result_str)
+        ai_result = invoke_structured("smart_find_element", get_share_llm(), FoundElement, ai_prompt)
         
-        if json_match:
-            ai_result = json.loads(json_match.group(0))
+        if ai_result:
             if ai_result.get("found"):
-                element_info = ai_result.get("element_info", {})
+                element_info = ai_result.get("element_info") or {}
                 selector = element_info.get("selector")
                 
                 if selector:
@@ -1010,6 +605,7 @@ def smart_find_element(page, target_description, element_type="button", fallback
                         if element.is_visible():
                             element.click()
                             print(f"✅ Đã click element theo AI: {element_info.get('text', '')}")
+                            cache.record_success(cache_key, selector)
                             return True
                     except Exception as e:
                         print(f"❌ AI selector thất bại: {e}")
@@ -1018,137 +614,52 @@ def smart_find_element(page, target_description, element_type="button", fallback
         
     except Exception as e:
         print(f"❌ Lỗi AI: {e}")
+    return False
+
+def smart_find_element(page, target_description, element_type="button", fallback_selectors=None, use_cache=True, use_llm=True):
+    """
+    Tìm element thông minh bằng cách kết hợp AI và logic thủ công.
+    use_llm=False: bỏ qua bước hỏi AI, chỉ chạy logic thủ công (planning mode)
+    """
+    print(f"🧠 Tìm kiếm thông minh: {target_description}")
+    
+    # Bước 0: Thử selector đã học trong cache (không cần gọi LLM)
+    cache = get_selector_cache()
+    cache_key = get_cache_key(page, target_description)
+    if use_cache and click_cached_selector(page, cache, cache_key):
+        return True
+    
+    # Bước 1: Hỏi AI để phân tích trang và tìm element
+    page_info = get_page_info(page)
+    if use_llm and ask_ai_for_element(page, page_info, target_description, cache, cache_key):
+        return True
     
     # Bước 2: Logic thủ công thông minh (không fix cứng)
     print("🔧 Thử logic thủ công thông minh...")
     
     # Tạo từ khóa tìm kiếm dựa trên mô tả
-    keywords = []
-    if "xong" in target_description.lower() or "done" in target_description.lower():
-        keywords = ["xong", "done", "ok", "confirm", "apply", "save", "submit"]
-    elif "chia sẻ" in target_description.lower() or "share" in target_description.lower():
-        keywords = ["chia sẻ", "share", "edit", "chỉnh sửa", "private", "riêng tư"]
-    elif "hiển thị" in target_description.lower() or "visibility" in target_description.lower():
-        keywords = ["hiển thị", "visibility", "chế độ", "public", "private", "unlisted"]
-    elif "lưu" in target_description.lower() or "save" in target_description.lower():
-        keywords = ["lưu", "save", "publish", "update"]
-    else:
-        # Tách từ khóa từ mô tả
-        keywords = target_description.lower().split()
-    
-    # Tìm element bằng JavaScript thông minh
-    result = page.evaluate(f"""
-        () => {{
-            const keywords = {keywords};
-            const elementTypes = ['button', 'ytcp-button', '[role="button"]', 'div', 'span', 'a'];
-            const foundElements = [];
-            
-            for (let tag of elementTypes) {{
-                const elements = document.querySelectorAll(tag);
-                for (let el of elements) {{
-                    if (el.offsetParent !== null) {{
-                        const text = (el.textContent || el.innerText || '').toLowerCase();
-                        const ariaLabel = (el.getAttribute('aria-label') || '').toLowerCase();
-                        const title = (el.getAttribute('title') || '').toLowerCase();
-                        const className = (el.getAttribute('class') || '').toLowerCase();
-                        const id = (el.getAttribute('id') || '').toLowerCase();
-                        
-                        // Tính điểm phù hợp
-                        let score = 0;
-                        for (let keyword of keywords) {{
-                            if (text.includes(keyword)) score += 3;
-                            if (ariaLabel.includes(keyword)) score += 2;
-                            if (title.includes(keyword)) score += 2;
-                            if (className.includes(keyword)) score += 1;
-                            if (id.includes(keyword)) score += 1;
-                        }}
-                        
-                        if (score > 0) {{
-                            foundElements.push({{
-                                element: el,
-                                text: el.textContent || el.innerText || '',
-                                ariaLabel: el.getAttribute('aria-label') || '',
-                                tagName: el.tagName,
-                                className: el.getAttribute('class') || '',
-                                id: el.getAttribute('id') || '',
-                                score: score
-                            }});
-                        }}
-                    }}
-                }}
-            }}
-            
-            // Sắp xếp theo điểm số
-            foundElements.sort((a, b) => b.score - a.score);
-            
-            // Thử click element có điểm cao nhất
-            if (foundElements.length > 0) {{
-                const bestElement = foundElements[0];
-                try {{
-                    const element = bestElement.element;
-                    
-                    // Thử nhiều cách click khác nhau
-                    if (element.tagName === 'BUTTON' || element.getAttribute('role') === 'button') {{
-                        element.click();
-                    }} else {{
-                        // Với DIV/SPAN, thử trigger click event
-                        element.dispatchEvent(new MouseEvent('click', {{
-                            bubbles: true,
-                            cancelable: true,
-                            view: window
-                        }}));
-                        
-                        // Nếu không được, thử focus và nhấn Enter
-                        if (!element.onclick) {{
-                            element.focus();
-                            element.dispatchEvent(new KeyboardEvent('keydown', {{
-                                key: 'Enter',
-                                code: 'Enter',
-                                keyCode: 13,
-                                which: 13,
-                                bubbles: true
-                            }}));
-                        }}
-                    }}
-                    
-                    return {{
-                        success: true,
-                        text: bestElement.text,
-                        tagName: bestElement.tagName,
-                        className: bestElement.className,
-                        isClickable: bestElement.isClickable,
-                        type: 'edit'
-                    }};
-                }} catch (e) {{
-                    console.log('Không thể click element:', e);
-                    
-                    // Thử click bằng JavaScript trực tiếp
-                    try {{
-                        bestElement.element.dispatchEvent(new Event('click', {{ bubbles: true }}));
-                        return {{
-                            success: true,
-                            text: bestElement.text,
-                            tagName: bestElement.tagName,
-                            className: bestElement.className,
-                            isClickable: bestElement.isClickable,
-                            type: 'edit',
-                            method: 'javascript_event'
-                        }};
-                    }} catch (e2) {{
-                        console.log('JavaScript event cũng thất bại:', e2);
-                    }}
-                }}
-            }}
-            
-            return {{success: false, foundElements: foundElements.slice(0, 5)}};
-        }}
-    """)
+    keywords = keywords_for_step(target_description)
+    
+    # Chấm điểm trên snapshot đã lấy ở bước 1 (không quét DOM lại)
+    for score, element in rank_elements(page_info["clickable_elements"], keywords)[:3]:
+        if click_snapshot_element(page, element):
+            print(f"✅ Đã click element thông minh (snapshot): '{element.get('text', '')}'")
+            print(f"   Điểm số: {score}")
+            print(f"   Tag: {element.get('tagName') or element.get('role')}")
+            if element.get("selector"):
+                cache.record_success(cache_key, element["selector"])
+            return True
+    
+    # Fallback: quét toàn bộ div/span nếu snapshot không có element phù hợp
+    result = call_helper(page, "clickBestMatch", keywords)
     
     if result.get('success'):
         print(f"✅ Đã click element thông minh: '{result.get('text', '')}'")
         print(f"   Điểm số: {result.get('score')}")
         print(f"   Tag: {result.get('tagName')}")
         print(f"   Class: {result.get('className')}")
+        if result.get('selector'):
+            cache.record_success(cache_key, result['selector'])
         return True
     
     # Bước 3: Fallback với selectors cơ bản (nếu có)
@@ -1160,6 +671,7 @@ def smart_find_element(page, target_description, element_type="button", fallback
                 if element.is_visible():
                     element.click()
                     print(f"✅ Đã click với fallback selector: {selector}")
+                    cache.record_success(cache_key, selector)
                     return True
             except:
                 continue
@@ -1167,21 +679,25 @@ def smart_find_element(page, target_description, element_type="button", fallback
     print(f"❌ Không tìm thấy element: {target_description}")
     return False
 
-def find_and_fill_email_field(page, email):
+def find_and_fill_email_field(page, email, use_llm=True):
     """
-    Tìm và nhập email vào field sử dụng logic thông minh
+    Tìm và nhập email vào field sử dụng logic thông minh.
+    use_llm=False: bỏ qua bước hỏi AI, chỉ nhập bằng JavaScript (planning mode)
     """
     print(f"🔍 Tìm kiếm email field thông minh cho: {email}")
+    if not use_llm:
+        return fill_email_field_by_javascript(page, email)
     
     # Bước 1: Hỏi AI để tìm input field
     page_info = get_page_info(page)
+    context = build_llm_context(page_info, "Ô nhập email")
     
     ai_prompt = f"""
     Tìm input field để nhập email trên trang này.
     
     Thông tin trang:
-    - Text: {page_info['page_text'][:500]}...
-    - Input fields: {json.dumps(page_info['inputs'], indent=2)}
+    - Text: {context['page_text']}
+    - Input fields: {context['inputs']}
     
     Hãy phân tích và trả về JSON với format:
     {{
@@ -1196,17 +712,11 @@ def find_and_fill_email_field(page, email):
     """
     
     try:
-        llm = ChatGoogleGenerativeAI(model=LLM_MODEL, google_api_key=GOOGLE_API_KEY)
-        result = llm.invoke(ai_prompt)
+        ai_result = invoke_structured("find_and_fill_email_field", get_share_llm(), FoundInput, ai_prompt)
         
-        import re
-        result_str = str(result.content)
-        json_match = re.search(r'\{[\s\S]*?\}', result_str)
-        
-        if json_match:
-            ai_result = json.loads(json_match.group(0))
+        if ai_result:
             if ai_result.get("found"):
-                input_info = ai_result.get("input_info", {})
+                input_info = ai_result.get("input_info") or {}
                 selector = input_info.get("selector")
                 
                 if selector:
@@ -1223,97 +733,15 @@ def find_and_fill_email_field(page, email):
         print(f"❌ Lỗi AI input: {e}")
     
     # Bước 2: Logic thủ công thông minh
+    return fill_email_field_by_javascript(page, email)
+
+def fill_email_field_by_javascript(page, email):
+    """
+    Tìm và nhập email vào field bằng JavaScript (chấm điểm các input đang hiển thị)
+    """
     print("🔧 Thử logic thủ công thông minh cho input...")
     
-    result = page.evaluate(f"""
-        () => {{
-            const email = '{email}';
-            const inputSelectors = [
-                'input[type="email"]',
-                'input[type="text"]',
-                'input[placeholder*="email"]',
-                'input[placeholder*="Email"]',
-                'input[aria-label*="email"]',
-                'input[aria-label*="Email"]',
-                'textarea',
-                '[contenteditable="true"]',
-                '[role="textbox"]',
-                '[data-testid*="email"]',
-                '[data-testid*="input"]',
-                'ytcp-text-input',
-                'ytcp-input',
-                'form input',
-                '.email-input',
-                '.input-field',
-                'input',
-                'textarea'
-            ];
-            
-            for (let selector of inputSelectors) {{
-                try {{
-                    const elements = document.querySelectorAll(selector);
-                    for (let el of elements) {{
-                        if (el.offsetParent !== null) {{
-                            // Kiểm tra xem element có phải là input field không
-                            const tagName = el.tagName.toLowerCase();
-                            const type = el.getAttribute('type') || '';
-                            const placeholder = el.getAttribute('placeholder') || '';
-                            const ariaLabel = el.getAttribute('aria-label') || '';
-                            const contentEditable = el.getAttribute('contenteditable');
-                            const role = el.getAttribute('role');
-                            
-                            // Tính điểm phù hợp
-                            let score = 0;
-                            if (tagName === 'input' || tagName === 'textarea') score += 2;
-                            if (type === 'email') score += 3;
-                            if (type === 'text') score += 1;
-                            if (placeholder.toLowerCase().includes('email')) score += 2;
-                            if (ariaLabel.toLowerCase().includes('email')) score += 2;
-                            if (contentEditable === 'true') score += 1;
-                            if (role === 'textbox') score += 1;
-                            
-                            if (score > 0) {{
-                                try {{
-                                    // Focus vào element
-                                    el.focus();
-                                    
-                                    // Clear nội dung cũ
-                                    el.value = '';
-                                    el.textContent = '';
-                                    
-                                    // Nhập email
-                                    if (tagName === 'input' || tagName === 'textarea') {{
-                                        el.value = email;
-                                    }} else {{
-                                        el.textContent = email;
-                                    }}
-                                    
-                                    // Trigger events
-                                    el.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                                    el.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                                    
-                                    return {{
-                                        success: true,
-                                        selector: selector,
-                                        tagName: tagName,
-                                        score: score,
-                                        type: type,
-                                        placeholder: placeholder
-                                    }};
-                                }} catch (e) {{
-                                    continue;
-                                }}
-                            }}
-                        }}
-                    }}
-                }} catch (e) {{
-                    continue;
-                }}
-            }}
-            
-            return {{success: false}};
-        }}
-    """)
+    result = call_helper(page, "fillEmailField", email)
     
     if result.get('success'):
         print(f"✅ Đã nhập email thông minh: {email}")
@@ -1327,6 +755,49 @@ def find_and_fill_email_field(page, email):
     print("❌ Không thể tìm thấy email field thông minh")
     return False
 
+def split_share_emails(emails):
+    """
+    Chuẩn hóa danh sách email: bỏ khoảng trắng, bỏ trùng (giữ thứ tự).
+    Trả về (email được chia sẻ, email vượt số người tối đa YouTube cho phép chia sẻ một video riêng tư)
+    """
+    seen = set()
+    result = []
+    for email in emails:
+        email = email.strip()
+        if email and email.lower() not in seen:
+            seen.add(email.lower())
+            result.append(email)
+    return result[:MAX_SHARE_EMAILS], result[MAX_SHARE_EMAILS:]
+
+def prepare_share_emails(emails):
+    """
+    Chuẩn hóa danh sách email và giới hạn theo số người tối đa YouTube cho phép
+    """
+    result, over_limit = split_share_emails(emails)
+    if over_limit:
+        print(f"⚠️ YouTube chỉ cho phép chia sẻ tối đa {MAX_SHARE_EMAILS} người, bỏ qua {len(over_limit)} email: {over_limit}")
+    return result
+
+def chunk_emails(emails, size=EMAIL_CHUNK_SIZE):
+    """
+    Chia danh sách email thành các nhóm nhỏ để nhập vào dialog
+    """
+    return [emails[i:i + size] for i in range(0, len(emails), size)]
+
+def fill_emails_in_field(page, field, emails):
+    """
+    Nhập tất cả email vào ô input của dialog chia sẻ, mỗi lần một nhóm,
+    phân cách bằng dấu phẩy. Chỉ cần click "Xong" một lần sau khi nhập.
+    """
+    for i, chunk in enumerate(chunk_emails(emails)):
+        text = ", ".join(chunk)
+        if i == 0:
+            field.fill(text)
+        else:
+            # Nối thêm vào cuối nội dung đã nhập
+            page.keyboard.press("End")
+            page.keyboard.insert_text(", " + text)
+
 def find_done_button_email_section(page):
     """
     Tìm và click vào nút "Xong" trong phần nhập email (bước 3)
@@ -1334,90 +805,7 @@ def find_done_button_email_section(page):
     print("🔍 Tìm kiếm nút Xong trong phần nhập email...")
     
     # Tìm nút Xong trong context của email input
-    result = page.evaluate("""
-        () => {
-            const keywords = ['xong', 'done', 'ok', 'confirm', 'apply'];
-            const buttons = document.querySelectorAll('button, [role="button"], ytcp-button');
-            const foundButtons = [];
-            
-            for (let btn of buttons) {
-                if (btn.offsetParent !== null) {
-                    const text = (btn.textContent || btn.innerText || '').toLowerCase();
-                    const ariaLabel = (btn.getAttribute('aria-label') || '').toLowerCase();
-                    const className = (btn.getAttribute('class') || '').toLowerCase();
-                    const disabled = btn.disabled;
-                    
-                    // Kiểm tra có phải nút Xong không
-                    for (let keyword of keywords) {
-                        if (text.includes(keyword) || ariaLabel.includes(keyword)) {
-                            // Kiểm tra xem nút này có liên quan đến email input không
-                            // Tìm input field gần nhất
-                            let emailInputNearby = false;
-                            const emailInputs = document.querySelectorAll('input[type="email"], input[type="text"], textarea, [contenteditable="true"]');
-                            
-                            for (let input of emailInputs) {
-                                if (input.offsetParent !== null) {
-                                    const rect1 = btn.getBoundingClientRect();
-                                    const rect2 = input.getBoundingClientRect();
-                                    
-                                    // Kiểm tra khoảng cách giữa button và input
-                                    const distance = Math.sqrt(
-                                        Math.pow(rect1.left - rect2.left, 2) + 
-                                        Math.pow(rect1.top - rect2.top, 2)
-                                    );
-                                    
-                                    if (distance < 500) { // Trong phạm vi 500px
-                                        emailInputNearby = true;
-                                        break;
-                                    }
-                                }
-                            }
-                            
-                            foundButtons.push({
-                                element: btn,
-                                text: btn.textContent || btn.innerText || '',
-                                ariaLabel: btn.getAttribute('aria-label') || '',
-                                className: className,
-                                disabled: disabled,
-                                emailInputNearby: emailInputNearby,
-                                distance: emailInputNearby ? 0 : 1000 // Ưu tiên nút gần email input
-                            });
-                            break;
-                        }
-                    }
-                }
-            }
-            
-            // Sắp xếp: nút gần email input trước, enabled trước
-            foundButtons.sort((a, b) => {
-                if (a.emailInputNearby !== b.emailInputNearby) {
-                    return a.emailInputNearby ? -1 : 1;
-                }
-                if (a.disabled !== b.disabled) {
-                    return a.disabled ? 1 : -1;
-                }
-                return a.distance - b.distance;
-            });
-            
-            // Thử click nút đầu tiên (ưu tiên nhất)
-            if (foundButtons.length > 0) {
-                try {
-                    foundButtons[0].element.click();
-                    return {
-                        success: true,
-                        text: foundButtons[0].text,
-                        emailInputNearby: foundButtons[0].emailInputNearby,
-                        enabled: !foundButtons[0].disabled,
-                        className: foundButtons[0].className
-                    };
-                } catch (e) {
-                    return {success: false, error: e.toString()};
-                }
-            }
-            
-            return {success: false, foundButtons: foundButtons};
-        }
-    """)
+    result = call_helper(page, "clickDoneNearInput", DONE_BUTTON_KEYWORDS)
     
     if result.get('success'):
         nearby_status = "gần email input" if result.get('emailInputNearby') else "không gần email input"
@@ -1436,69 +824,14 @@ def find_done_button_email_section(page):
     print("❌ Không tìm thấy nút Xong trong phần email")
     return False
 
-def find_done_button_popup(page):
+def find_done_button_popup(page, use_llm=True):
     """
     Tìm và click vào nút "Xong" trong popup Chế độ hiển thị (bước 4)
     """
     print("🔍 Tìm kiếm nút Xong trong popup Chế độ hiển thị...")
     
     # Tìm popup/modal trước
-    result = page.evaluate("""
-        () => {
-            const popupSelectors = [
-                '[role="dialog"]',
-                '[class*="modal"]',
-                '[class*="popup"]',
-                '[class*="dialog"]',
-                '.ytcp-dialog',
-                '.ytcp-modal',
-                'tp-yt-paper-dialog',
-                '[data-testid*="dialog"]',
-                '[data-testid*="modal"]',
-                '[data-testid*="popup"]'
-            ];
-            
-            for (let selector of popupSelectors) {
-                try {
-                    const popups = document.querySelectorAll(selector);
-                    for (let popup of popups) {
-                        if (popup.offsetParent !== null) {
-                            // Tìm nút Xong trong popup
-                            const keywords = ['xong', 'done', 'ok', 'confirm', 'apply'];
-                            const buttons = popup.querySelectorAll('button, [role="button"], ytcp-button, div, span, a');
-                            
-                            for (let btn of buttons) {
-                                if (btn.offsetParent !== null) {
-                                    const text = (btn.textContent || btn.innerText || '').toLowerCase();
-                                    const ariaLabel = (btn.getAttribute('aria-label') || '').toLowerCase();
-                                    
-                                    for (let keyword of keywords) {
-                                        if (text.includes(keyword) || ariaLabel.includes(keyword)) {
-                                            try {
-                                                btn.click();
-                                                return {
-                                                    success: true,
-                                                    popupSelector: selector,
-                                                    buttonText: btn.textContent || btn.innerText || '',
-                                                    keyword: keyword
-                                                };
-                                            } catch (e) {
-                                                continue;
-                                            }
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    }
-                } catch (e) {
-                    continue;
-                }
-            }
-            
-            return {success: false};
-        }
-    """)
+    result = call_helper(page, "clickInPopup", DONE_BUTTON_KEYWORDS)
     
     if result.get('success'):
         print(f"✅ Đã click nút Xong trong popup: '{result.get('buttonText', '')}'")
@@ -1508,9 +841,16 @@ def find_done_button_popup(page):
     
     # Nếu không tìm thấy popup, thử tìm nút Xong thông thường (có thể là popup ẩn)
     print("🔍 Không tìm thấy popup, thử tìm nút Xong thông thường...")
-    return find_done_button(page)
+    return find_done_button(page, use_llm=use_llm)
 
-def share_video_with_ai(prompt: str):
+def share_video_with_ai(prompt: str, batch: bool = True, page_pool_size: int = 1, concurrency: int = 1, job_id: str = None,
+                        block_resources: bool = BLOCK_RESOURCES, prefetch: bool = PREFETCH_NEXT):
+    """
+    Phân tích prompt và chia sẻ các video tìm được.
+    Mặc định chạy batch mode: chỉ mở Chrome profile một lần cho tất cả video,
+    tiến độ được ghi vào journal của job (chạy tiếp bằng resume_share_job).
+    concurrency > 1: chạy nhiều tab song song bằng engine async.
+    """
     info = extract_share_info(prompt)
     video_ids = info.get("video_ids", [])
     emails = info.get("emails", [])
@@ -1531,298 +871,682 @@ def share_video_with_ai(prompt: str):
     print(f"Video IDs: {video_ids}")
     print(f"Emails: {emails}")
     
-    # Xử lý từng video ID
+    if concurrency > 1:
+        from src.agent.youtube_share_async import run_concurrent_share
+        return run_concurrent_share(video_ids, emails, concurrency=concurrency)
+    
+    if batch:
+        journal = ShareJournal.create(video_ids, emails, job_id=job_id)
+        print(f"📒 Job {journal.job_id} (chạy tiếp bằng --resume {journal.job_id}): {journal.path}")
+        return share_videos_batch(video_ids, emails, page_pool_size=page_pool_size, journal=journal,
+                                  block_resources=block_resources, prefetch=prefetch)
+    
+    # Xử lý từng video ID (mỗi video một lần khởi động Chrome)
+    limiter = ShareRateLimiter(PROFILE_PATH)
+    planner = SharePlanner(get_share_llm) if PLAN_MODE else None
     for i, video_id in enumerate(video_ids):
         print(f"\n{'='*60}")
         print(f"🎬 XỬ LÝ VIDEO {i+1}/{len(video_ids)}: {video_id}")
         print(f"{'='*60}")
         
         try:
-            share_single_video(video_id, emails)
+            share_single_video(video_id, emails, limiter=limiter, planner=planner)
             print(f"✅ Hoàn thành video {i+1}: {video_id}")
         except Exception as e:
             print(f"❌ Lỗi xử lý video {i+1}: {video_id} - {e}")
             continue
-        
-        # Chờ một chút giữa các video
-        if i < len(video_ids) - 1:
-            print("⏳ Chờ 3 giây trước khi xử lý video tiếp theo...")
-            import time
-            time.sleep(3)
     
     print(f"\n🎉 HOÀN THÀNH XỬ LÝ {len(video_ids)} VIDEO!")
 
-def share_single_video(video_id: str, emails: list):
+def share_manifest(path: str, page_pool_size: int = 1, job_id: str = None, dry_run: bool = False,
+                   block_resources: bool = BLOCK_RESOURCES, prefetch: bool = PREFETCH_NEXT):
+    """
+    Chia sẻ theo manifest CSV/JSONL (video_id → email), không cần LLM phân tích lệnh.
+    Mỗi video chỉ được mở một lần với tất cả email của nó.
+    """
+    manifest = ShareManifest.load(path)
+    manifest.print_summary()
+    if dry_run or not manifest.videos:
+        return manifest
+    
+    if not os.path.exists(PROFILE_PATH):
+        print(f"Không tìm thấy profile: {PROFILE_PATH}")
+        return
+    
+    video_ids = list(manifest.videos)
+    journal = ShareJournal.create(video_ids, manifest.videos, job_id=job_id)
+    print(f"📒 Job {journal.job_id} (chạy tiếp bằng --resume {journal.job_id}): {journal.path}")
+    return share_videos_batch(video_ids, manifest.videos, page_pool_size=page_pool_size, journal=journal,
+                              block_resources=block_resources, prefetch=prefetch)
+
+def resume_share_job(job_id: str, page_pool_size: int = 1, block_resources: bool = BLOCK_RESOURCES,
+                     prefetch: bool = PREFETCH_NEXT):
+    """
+    Chạy tiếp job đã dừng: đọc journal, bỏ qua cặp (video, email) đã xong
+    """
+    journal = ShareJournal.open(job_id)
+    print(f"📒 Resume job {job_id}: {journal.summary()}")
+    if not os.path.exists(PROFILE_PATH):
+        print(f"Không tìm thấy profile: {PROFILE_PATH}")
+        return
+    return share_videos_batch(
+        journal.job["video_ids"],
+        journal.job["emails"],
+        page_pool_size=page_pool_size,
+        journal=journal,
+        block_resources=block_resources,
+        prefetch=prefetch
+    )
+
+def launch_share_context(p, profile_path: str = None):
+    """
+    Khởi động Chrome với profile đã đăng nhập (persistent context)
+    """
+    context = p.chromium.launch_persistent_context(
+        user_data_dir=profile_path or PROFILE_PATH,
+        headless=False,
+        args=BROWSER_ARGS
+    )
+    # Thư viện JS dùng chung (window.__ytShare) cho mọi page của context
+    return install_share_helpers(context)
+
+def new_share_page(context):
+    """
+    Tạo page mới để chạy flow chia sẻ.
+    Tự động chấp nhận dialog "Rời khỏi trang?" khi page được dùng lại cho video khác.
+    """
+    page = context.new_page()
+    page.on("dialog", lambda dialog: dialog.accept())
+    return page
+
+def share_single_video(video_id: str, emails: list, limiter=None, planner=None):
     """
-    Xử lý chia sẻ một video cụ thể
+    Xử lý chia sẻ một video cụ thể (khởi động Chrome riêng cho video này)
     """
     with sync_playwright() as p:
-        browser = p.chromium.launch_persistent_context(
-            user_data_dir=PROFILE_PATH,
-            headless=False,
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--disable-web-security',
-                '--no-sandbox',
-                '--window-size=1280,800',
-            ]
-        )
+        browser = launch_share_context(p)
         page = browser.new_page()
-        
-        # Truy cập trang edit video
-        print("Truy cập trang edit video...")
-        page.goto(f"https://studio.youtube.com/video/{video_id}/edit")
-        page.wait_for_timeout(5000)
-        
-        # Kiểm tra xem có phải đang ở trang edit không
-        current_url = page.url
-        print(f"URL hiện tại: {current_url}")
-        
-        # Nếu không phải trang edit, thử điều hướng lại
-        if "/edit" not in current_url:
-            print("Không phải trang edit, thử điều hướng lại...")
-            page.goto(f"https://studio.youtube.com/video/{video_id}/edit")
-            page.wait_for_timeout(3000)
-        
-        # Chờ trang load hoàn toàn (thay đổi từ networkidle sang domcontentloaded)
+        if limiter:
+            limiter.watch(page)
         try:
-            print("Chờ trang load...")
-            page.wait_for_load_state("domcontentloaded", timeout=15000)
-            print("✅ Trang đã load xong")
-        except Exception as e:
-            print(f"⚠️ Timeout chờ trang load: {e}")
-            print("Tiếp tục với trang hiện tại...")
-        
-        # Chờ thêm một chút để JavaScript chạy xong
-        page.wait_for_timeout(3000)
-        
-        # Debug: In ra thông tin element trên trang
-        debug_page_elements(page)
+            return share_video_on_page(page, video_id, emails, limiter=limiter, planner=planner)
+        finally:
+            browser.close()
+
+def emails_for_video(emails, video_id):
+    """
+    emails là list dùng chung cho mọi video hoặc dict {video_id: [email, ...]} (manifest)
+    """
+    return emails.get(video_id, []) if isinstance(emails, dict) else emails
+
+def cap_video_emails(video_id, emails, journal=None):
+    """
+    Giới hạn email của video theo MAX_SHARE_EMAILS; email vượt giới hạn được ghi skipped
+    vào journal để --resume không chạy lại chúng mãi
+    """
+    emails, over_limit = split_share_emails(emails)
+    if over_limit:
+        reason = f"vượt giới hạn {MAX_SHARE_EMAILS} người chia sẻ của YouTube"
+        print(f"⚠️ {video_id}: {reason}, bỏ qua {len(over_limit)} email: {over_limit}")
+        if journal:
+            journal.record(video_id, over_limit, "precheck", STATUS_SKIPPED, error=reason)
+    return emails
+
+def share_videos_batch(video_ids: list, emails, page_pool_size: int = 1, journal=None, block_resources: bool = BLOCK_RESOURCES,
+                       profile_path: str = None, on_result=None, prefetch: bool = PREFETCH_NEXT, plan: bool = PLAN_MODE):
+    """
+    Batch mode: khởi động Chrome profile một lần, giữ context "ấm" và
+    chạy tất cả video qua một pool page dùng lại.
+    emails: list dùng chung hoặc dict {video_id: [email, ...]}.
+    journal: ghi tiến độ từng cặp (video, email), bỏ qua cặp đã xong khi resume.
+    block_resources: chặn ảnh/media/font/telemetry khi tải Studio.
+    profile_path: profile Chrome dùng cho batch (mặc định BROWSER_USER_DATA).
+    on_result(result): gọi sau mỗi video (vd: gửi tiến độ về coordinator).
+    prefetch: trong lúc thao tác dialog của video N, tab kế tiếp đã điều hướng tới video N+1
+    (cần ít nhất 2 page, pool được tăng lên 2 nếu cần).
+    plan: planning mode, một lần gọi LLM lập selector cho cả flow (dùng lại cho các video sau).
+    Điều hướng và Lưu được giới hạn tốc độ theo profile; video lỗi do Studio giới hạn
+    (429, toast "thử lại sau") được chạy lại sau khi backoff.
+    Bộ nhớ được đo sau mỗi video (MemoryWatchdog): page được thay sau N video hoặc khi JS heap
+    vượt ngưỡng, context được khởi động lại khi Chrome dùng quá nhiều bộ nhớ.
+    Trả về danh sách thời gian xử lý từng video.
+    """
+    page_pool_size = max(2 if prefetch else 1, page_pool_size)
+    results = []
+    
+    if journal:
+        # Chỉ xử lý các email chưa hoàn tất của từng video
+        pending = [(video_id, journal.pending_emails(video_id, emails_for_video(emails, video_id))) for video_id in video_ids]
+        for video_id, video_emails in pending:
+            if not video_emails:
+                print(f"⏭️ Bỏ qua {video_id}: đã chia sẻ xong trong job {journal.job_id}")
+            elif journal.failed_step(video_id):
+                print(f"🔁 {video_id}: lần trước lỗi ở bước {journal.failed_step(video_id)}, chạy lại cho {len(video_emails)} email còn lại")
+        pending = [(video_id, video_emails) for video_id, video_emails in pending if video_emails]
+    else:
+        pending = [(video_id, emails_for_video(emails, video_id)) for video_id in video_ids]
+    pending = [(video_id, cap_video_emails(video_id, video_emails, journal)) for video_id, video_emails in pending]
+    if not pending:
+        print("✅ Không còn video nào cần xử lý")
+        return results
+    
+    tracer = get_tracer()
+    tracer.reset()
+    with sync_playwright() as p, span("batch", "batch", videos=len(pending)):
+        startup_start = time.perf_counter()
+        limiter = ShareRateLimiter(profile_path or PROFILE_PATH)
+        planner = SharePlanner(get_share_llm) if plan else None
+        watchdog = MemoryWatchdog(profile_path or PROFILE_PATH)
         
-        # Kiểm tra xem có nút "Chế độ hiển thị" không
-        visibility_button = page.locator('button:has-text("Chế độ hiển thị"), button:has-text("Visibility"), [aria-label*="visibility"], [aria-label*="hiển thị"]')
-        if visibility_button.count() > 0:
-            print("✅ Tìm thấy nút Chế độ hiển thị")
-        else:
-            print("❌ Không tìm thấy nút Chế độ hiển thị, có thể cần scroll hoặc chờ thêm")
-            # Thử scroll xuống để tìm
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
-            page.wait_for_timeout(2000)
-            debug_page_elements(page)
+        def start_context():
+            context = launch_share_context(p, profile_path)
+            blocker = ResourceBlocker().attach(context) if block_resources else None
+            pages = [limiter.watch(new_share_page(context)) for _ in range(page_pool_size)]
+            return context, blocker, pages
         
-        # Thực hiện các bước tự động với AI
-        steps = [
-            "Tìm và click vào nút Chế độ hiển thị/Visibility",
-            "Click vào nút Chia sẻ riêng tư/Chia sẻ/Chỉnh sửa",
-            "Nhập email vào ô input và click Xong",
-            "Click Xong của popup Chế độ hiển thị",
-            "Click Lưu/Save"
-        ]
+        with span("launch_context", "startup"):
+            context, blocker, pages = start_context()
+        prefetched = {}
+        startup_time = time.perf_counter() - startup_start
+        print(f"🚀 Khởi động Chrome profile một lần: {startup_time:.2f}s ({page_pool_size} page{', prefetch' if prefetch else ''})")
         
-        for i, step in enumerate(steps):
-            print(f"\n--- Bước {i+1}: {step} ---")
-            
-            # Xử lý đặc biệt cho bước 1 (tìm nút Chế độ hiển thị)
-            if i == 0:  # Bước 1
-                print("🔄 Xử lý bước 1: Tìm nút Chế độ hiển thị")
-                if find_visibility_button(page):
-                    print("✅ Hoàn thành bước 1")
-                    page.wait_for_timeout(2000)
-                    continue
-                else:
-                    print("❌ Không thể tìm thấy nút Chế độ hiển thị, thử dùng AI...")
-            
-            # Xử lý đặc biệt cho bước 2 (tìm nút Chia sẻ riêng tư)
-            if i == 1:  # Bước 2
-                print("🔄 Xử lý bước 2: Tìm nút Chia sẻ riêng tư")
-                if find_share_button(page):
-                    print("✅ Hoàn thành bước 2")
-                    page.wait_for_timeout(2000)
-                    continue
-                else:
-                    print("❌ Không thể tìm thấy nút Chia sẻ riêng tư, thử dùng AI...")
-            
-            # Xử lý đặc biệt cho bước 3 (nhập email và click Xong)
-            if i == 2:  # Bước 3
-                print("🔄 Xử lý bước 3: Nhập email và click Xong")
-                if emails and len(emails) > 0:
-                    email = emails[0]  # Lấy email đầu tiên
-                    print(f"📧 Nhập email: {email}")
+        try:
+            for i, (video_id, video_emails) in enumerate(pending):
+                print(f"\n{'='*60}")
+                print(f"🎬 XỬ LÝ VIDEO {i+1}/{len(pending)}: {video_id}")
+                print(f"{'='*60}")
+                
+                video_start = time.perf_counter()
+                routes_before = blocker.snapshot() if blocker else None
+                slot = i % page_pool_size
+                is_prefetched = prefetched.pop(slot, None) == video_id
+                if prefetch and i + 1 < len(pending):
+                    # Tab kế tiếp bắt đầu tải video N+1 trong lúc video N chạy các bước
+                    next_slot = (i + 1) % page_pool_size
+                    if prefetch_video_page(pages[next_slot], pending[i + 1][0]):
+                        prefetched[next_slot] = pending[i + 1][0]
+                for attempt in range(MAX_THROTTLE_RETRIES + 1):
+                    page = pages[slot]
+                    error = None
+                    steps = []
+                    precheck = {"pending": video_emails, "already_shared": []}
                     
-                    # Tìm input field và nhập email với nhiều loại element khác nhau
+                    def on_step(result, video_id=video_id, precheck=precheck, steps=steps):
+                        steps.append(result["step"])
+                        if result["step"] == "precheck" and result["data"]:
+                            precheck.update(result["data"])
+                        if not journal:
+                            return
+                        if precheck["already_shared"] and result["step"] == "precheck":
+                            journal.record(video_id, precheck["already_shared"], "precheck", STATUS_SKIPPED)
+                        status = STATUS_IN_PROGRESS if result["success"] else STATUS_FAILED
+                        if precheck["pending"]:
+                            journal.record(video_id, precheck["pending"], result["step"], status)
                     try:
-                        # Thử nhiều loại input field khác nhau
-                        input_selectors = [
-                            'input[type="email"]',
-                            'input[type="text"]',
-                            'input[placeholder*="email"]',
-                            'input[placeholder*="Email"]',
-                            'input[aria-label*="email"]',
-                            'input[aria-label*="Email"]',
-                            'textarea',
-                            '[contenteditable="true"]',
-                            '[role="textbox"]',
-                            '[data-testid*="email"]',
-                            '[data-testid*="input"]',
-                            'ytcp-text-input',
-                            'ytcp-input',
-                            'form input',
-                            '.email-input',
-                            '.input-field'
-                        ]
-                        
-                        input_found = False
-                        for selector in input_selectors:
-                            try:
-                                input_field = page.locator(selector)
-                                if input_field.count() > 0:
-                                    for j in range(input_field.count()):
-                                        field = input_field.nth(j)
-                                        if field.is_visible():
-                                            print(f"✅ Tìm thấy input field với selector: {selector}")
-                                            
-                                            # Thử nhập email
-                                            try:
-                                                field.fill(email)
-                                                print(f"✅ Đã nhập email: {email}")
-                                                input_found = True
-                                                break
-                                            except Exception as fill_error:
-                                                print(f"❌ Không thể nhập vào field này: {fill_error}")
-                                                continue
-                                    
-                                    if input_found:
-                                        break
-                            except Exception as e:
-                                print(f"❌ Lỗi với selector {selector}: {e}")
-                                continue
-                        
-                        if input_found:
-                            # Chờ một chút để UI cập nhật
-                            print("⏳ Chờ UI cập nhật sau khi nhập email...")
-                            page.wait_for_timeout(2000)
-                            
-                            # Tìm và click nút "Xong" với logic cải thiện
-                            print("🔍 Tìm nút Xong sau khi nhập email...")
-                            
-                            # Thử tìm nút Xong với nhiều cách khác nhau
-                            done_found = False
-                            
-                            # Cách 1: Tìm nút Xong thông minh
-                            if find_done_button_email_section(page):
-                                print("✅ Đã click Xong (thông minh)")
-                                done_found = True
-                            else:
-                                print("❌ Không tìm thấy nút Xong (thông minh)")
-                            
-                            # Cách 2: Nếu không tìm thấy, thử tìm nút enabled
-                            if not done_found:
-                                print("🔍 Thử tìm nút Xong enabled...")
-                                
-                                # Thử nhiều lần với thời gian chờ khác nhau
-                                for attempt in range(3):
-                                    print(f"   Lần thử {attempt + 1}/3...")
-                                    
-                                    if find_done_button_enabled(page):
-                                        print("✅ Đã click nút Xong enabled")
-                                        done_found = True
-                                        break
-                                    else:
-                                        print(f"   Lần {attempt + 1} thất bại, chờ 2 giây...")
-                                        page.wait_for_timeout(2000)
-                                
-                                if not done_found:
-                                    print("❌ Không tìm thấy nút Xong enabled sau 3 lần thử")
-                            
-                            # Cách 3: Thử nhấn Enter
-                            if not done_found:
-                                print("🔍 Thử nhấn Enter...")
-                                try:
-                                    page.keyboard.press('Enter')
-                                    print("✅ Đã nhấn Enter")
-                                    done_found = True
-                                except Exception as e:
-                                    print(f"❌ Không thể nhấn Enter: {e}")
-                            
-                            # Cách 4: Thử click nút disabled (cuối cùng)
-                            if not done_found:
-                                print("🔍 Thử click nút Xong disabled...")
-                                if find_done_button(page):  # Sử dụng hàm cũ để click cả disabled
-                                    print("✅ Đã click nút Xong (có thể disabled)")
-                                    done_found = True
-                                else:
-                                    print("❌ Không thể click nút Xong disabled")
-                            
-                            if done_found:
-                                print("✅ Hoàn thành nhập email và click Xong")
-                                # Chờ thêm thời gian để popup xuất hiện
-                                page.wait_for_timeout(3000)
-                                continue
-                            else:
-                                print("❌ Không thể click Xong, thử dùng AI...")
-                        else:
-                            print("❌ Không tìm thấy input field phù hợp, thử JavaScript...")
-                            # Thử bằng JavaScript
-                            if find_and_fill_email_field(page, email):
-                                page.wait_for_timeout(2000)
-                                if find_done_button_enabled(page):
-                                    print("✅ Đã click Xong sau khi nhập email (JavaScript)")
-                                    page.wait_for_timeout(3000)
-                                    continue
-                                else:
-                                    print("❌ Không tìm thấy nút Xong, thử dùng AI...")
-                            else:
-                                print("❌ Không thể nhập email, thử dùng AI...")
-                            
+                        with span(video_id, "video", emails=len(video_emails), attempt=attempt) as video_span:
+                            success = share_video_on_page(page, video_id, video_emails, on_step=on_step, limiter=limiter,
+                                                          prefetched=is_prefetched and attempt == 0, planner=planner)
+                            video_span["args"]["success"] = success
                     except Exception as e:
-                        print(f"❌ Lỗi nhập email: {e}, thử dùng AI...")
-            
-            # Xử lý đặc biệt cho bước 4 (popup)
-            if i == 3:  # Bước 4
-                print("🔄 Xử lý bước 4: Click Xong trong popup Chế độ hiển thị")
-                if find_done_button_popup(page):
-                    print("✅ Hoàn thành bước 4")
-                    page.wait_for_timeout(2000)
-                    continue
-                else:
-                    print("❌ Không thể xử lý popup, thử dùng AI...")
-            
-            # Xử lý đặc biệt cho bước 5 (Lưu)
-            if i == 4:  # Bước 5
-                print("🔄 Xử lý bước 5: Click Lưu")
-                if find_save_button(page):
-                    print("✅ Hoàn thành bước 5")
-                    page.wait_for_timeout(2000)
-                    continue
-                else:
-                    print("❌ Không thể tìm thấy nút Lưu, thử dùng AI...")
-            
-            # Lấy thông tin trang hiện tại
-            page_info = get_page_info(page)
-            
-            # Hỏi AI cần làm gì
-            action_info = ask_ai_for_action(page_info, step, emails if "email" in step.lower() else None)
-            print(f"AI đề xuất: {action_info}")
-            
-            # Thực hiện thao tác
-            success = execute_ai_action(page, action_info, step)
-            if not success:
-                print(f"Không thể thực hiện bước: {step}")
-                # Thử lại với phương pháp thủ công cho bước 1
-                if i == 0:
-                    print("🔄 Thử lại với phương pháp thủ công...")
-                    if find_visibility_button(page):
-                        print("✅ Hoàn thành bước 1 (thủ công)")
-                        page.wait_for_timeout(2000)
-                        continue
-                break
-            
-            # Chờ một chút
-            page.wait_for_timeout(2000)
-        
-        print(f"\nHoàn tất quy trình chia sẻ video {video_id}!")
-        browser.close()
+                        success = False
+                        error = str(e)
+                        print(f"❌ Lỗi xử lý video {i+1}: {video_id} - {e}")
+                        # Page có thể ở trạng thái lỗi, thay bằng page mới
+                        try:
+                            page.close()
+                        except Exception:
+                            pass
+                        watchdog.forget(page)
+                        pages[slot] = limiter.watch(new_share_page(context))
+                    
+                    throttled = limiter.take_throttled(None if error else page)
+                    if not throttled:
+                        if success:
+                            limiter.record_success()
+                        break
+                    # Bị giới hạn trong lần chạy: coi như thất bại kể cả khi các bước báo thành công
+                    success = False
+                    error = error or f"Studio giới hạn ({throttled[0]})"
+                    limiter.record_throttle(throttled)
+                    if attempt == MAX_THROTTLE_RETRIES:
+                        break
+                    # Chờ backoff (trong limiter.acquire) rồi chạy lại video
+                    print(f"🔁 Chạy lại {video_id} (lần {attempt + 2}/{MAX_THROTTLE_RETRIES + 1})")
+                
+                unchanged = success and not precheck["pending"]
+                if journal:
+                    if success and precheck["pending"]:
+                        journal.record(video_id, precheck["pending"], "save", STATUS_DONE)
+                    elif error:
+                        journal.record(video_id, precheck["pending"], steps[-1] if steps else "navigation", STATUS_FAILED, error=error)
+                
+                duration = time.perf_counter() - video_start
+                saved = ResourceBlocker.saved_since(routes_before, blocker.snapshot()) if blocker else None
+                results.append({
+                    "video_id": video_id,
+                    "success": success,
+                    "duration": duration,
+                    "error": error,
+                    "unchanged": unchanged,
+                    "saved": saved,
+                    "attempts": attempt + 1
+                })
+                status = "✅" if success else "❌"
+                print(f"{status} Video {i+1}: {video_id} - {duration:.2f}s{' | ' + format_saved(saved) if saved else ''}")
+                if on_result:
+                    on_result(results[-1])
+                
+                # Giữ bộ nhớ Chrome ổn định cho batch dài (chỉ khi còn video tiếp theo)
+                action = watchdog.after_video(pages[slot])
+                if action and i + 1 < len(pending):
+                    watchdog.record(action)
+                    if action == RESTART_CONTEXT:
+                        # Trang tải trước nằm trong context cũ, video kế tiếp điều hướng lại
+                        context.close()
+                        with span("restart_context", "startup"):
+                            context, blocker, pages = start_context()
+                        watchdog.reset_context()
+                        prefetched.clear()
+                    elif action == RECYCLE_PAGE:
+                        watchdog.forget(pages[slot])
+                        pages[slot].close()
+                        pages[slot] = limiter.watch(new_share_page(context))
+                        prefetched.pop(slot, None)
+        finally:
+            context.close()
+    
+    print_batch_timing_report(results, startup_time, limiter.stats(), planner, watchdog.stats())
+    print_trace_summary(tracer.summary())
+    summary_path, trace_path = tracer.export(f"share-{journal.job_id if journal else time.strftime('%Y%m%d-%H%M%S')}")
+    print(f"📈 Trace: {trace_path} (chrome://tracing), tổng hợp: {summary_path}")
+    return results
+
+def print_batch_timing_report(results: list, startup_time: float, rate_stats: dict = None, planner=None,
+                              memory_stats: dict = None):
+    """
+    In báo cáo thời gian từng video và thời gian khởi động tiết kiệm được
+    """
+    total = sum(r["duration"] for r in results)
+    succeeded = sum(1 for r in results if r["success"])
+    
+    print(f"\n{'='*60}")
+    print("⏱️ BÁO CÁO THỜI GIAN BATCH")
+    print(f"{'='*60}")
+    for r in results:
+        status = "✅" if r["success"] else "❌"
+        note = " (đã chia sẻ trước, không lưu)" if r.get("unchanged") else ""
+        print(f"  {status} {r['video_id']}: {r['duration']:.2f}s{note}")
+    unchanged = sum(1 for r in results if r.get("unchanged"))
+    if unchanged:
+        print(f"Không cần thay đổi: {unchanged}/{len(results)} video")
+    saved = [r["saved"] for r in results if r.get("saved")]
+    if saved:
+        requests_saved = sum(s["requests"] for s in saved)
+        bytes_saved = sum(s["bytes"] for s in saved)
+        print(f"Chặn tài nguyên: {requests_saved} request (~{bytes_saved / 1024 / 1024:.1f} MB ước tính), "
+              f"TB {requests_saved / len(saved):.0f} request/page")
+    if rate_stats:
+        retried = sum(1 for r in results if r.get("attempts", 1) > 1)
+        waited = rate_stats["waited"]
+        print(f"Giới hạn tốc độ: chờ {waited['navigation']:.1f}s điều hướng / {waited['save']:.1f}s lưu / "
+              f"{waited['backoff']:.1f}s backoff, bị giới hạn {rate_stats['throttles']} lần, "
+              f"{retried} video chạy lại do Studio giới hạn")
+    print_memory_stats(memory_stats)
+    print(f"Khởi động Chrome: {startup_time:.2f}s (1 lần)")
+    print(f"Tổng thời gian video: {total:.2f}s")
+    if results:
+        print(f"Trung bình mỗi video: {total / len(results):.2f}s")
+        # Chế độ cũ khởi động Chrome cho mỗi video
+        print(f"Ước tính tiết kiệm khởi động: {startup_time * (len(results) - 1):.2f}s")
+    for step, usage in prompt_token_summary().items():
+        print(f"LLM context [{step}]: {usage['calls']} lần, ~{usage['sent']} tokens (toàn trang: ~{usage['full']})")
+    cache_stats = get_selector_cache().stats()
+    print(f"Selector cache: {cache_stats['hits']} hit / {cache_stats['misses']} miss / {cache_stats['invalidations']} invalidate")
+    extract_stats = get_extract_cache().stats()
+    print(f"Phân tích lệnh: {extract_stats['regex']} regex / {extract_stats['hits']} cache / {extract_stats['llm_calls']} LLM")
+    print_plan_stats(planner)
+    print_ax_stats()
+    print_llm_stats()
+    print_parse_stats()
+    print(f"🎉 HOÀN THÀNH {succeeded}/{len(results)} VIDEO!")
+
+def edit_url(video_id: str):
+    return f"{STUDIO_URL}/video/{video_id}/edit"
+
+def prefetch_video_page(page, video_id: str):
+    """
+    Bắt đầu tải trang edit của video trong tab nền: chỉ chờ response đầu tiên (commit),
+    phần còn lại tải song song trong lúc tab kia thao tác. Trả về True nếu đã bắt đầu tải.
+    Không lấy token điều hướng ở đây (sẽ chặn video đang chạy): token được lấy khi
+    share_video_on_page dùng trang đã tải trước.
+    """
+    try:
+        with span("prefetch", "navigation", video_id=video_id):
+            page.goto(edit_url(video_id), wait_until="commit")
+        print(f"⏩ Tải trước video kế tiếp: {video_id}")
+        return True
+    except Exception as e:
+        print(f"⚠️ Không tải trước được {video_id}: {e}")
+        return False
+
+def share_video_on_page(page, video_id: str, emails: list, on_step=None, limiter=None, prefetched=False, planner=None):
+    """
+    Chạy flow chia sẻ cho một video trên page có sẵn.
+    on_step(result) được gọi sau mỗi bước (dùng để ghi journal).
+    limiter: ShareRateLimiter của tài khoản, giới hạn tốc độ điều hướng và Lưu.
+    prefetched: page đã được điều hướng tới video này (prefetch_video_page), không goto lại.
+    planner: SharePlanner dùng chung cho batch (planning mode), None để mỗi bước tự gọi LLM.
+    Trả về True nếu hoàn tất tất cả các bước.
+    """
+    # Log độ trễ chờ từng bước (so sánh với sleep cố định cũ)
+    waits = []
+    
+    # Truy cập trang edit video
+    if prefetched:
+        print("Dùng trang edit đã tải trước...")
+        # Lượt điều hướng của trang tải trước được tính khi dùng
+        if limiter:
+            limiter.acquire("navigation")
+        page.bring_to_front()
+    else:
+        print("Truy cập trang edit video...")
+        if limiter:
+            limiter.acquire("navigation")
+        with span("goto_edit", "navigation", video_id=video_id):
+            page.goto(edit_url(video_id), wait_until="domcontentloaded")
+    
+    # Kiểm tra xem có phải đang ở trang edit không
+    current_url = page.url
+    print(f"URL hiện tại: {current_url}")
+    
+    # Nếu không phải trang edit, thử điều hướng lại
+    if "/edit" not in current_url:
+        print("Không phải trang edit, thử điều hướng lại...")
+        page.goto(edit_url(video_id), wait_until="domcontentloaded")
+    
+    # Chờ đến khi nút Chế độ hiển thị render xong (thay cho sleep 5s + 3s)
+    print("Chờ trang load...")
+    wait_for_keyword_element(page, "navigation", VISIBILITY_KEYWORDS, timeout=15000, log=waits)
+    
+    # Chỉ debug khi chưa thấy nút Chế độ hiển thị
+    visibility_button = page.locator('button:has-text("Chế độ hiển thị"), button:has-text("Visibility"), [aria-label*="visibility"], [aria-label*="hiển thị"]')
+    if visibility_button.count() > 0:
+        print("✅ Tìm thấy nút Chế độ hiển thị")
+    else:
+        print("❌ Không tìm thấy nút Chế độ hiển thị, có thể cần scroll hoặc chờ thêm")
+        # Thử scroll xuống để tìm
+        page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
+        wait_for_keyword_element(page, "visibility_control", VISIBILITY_KEYWORDS, timeout=2000, log=waits)
+        debug_page_elements(page)
+    
+    # Thực hiện các bước bằng step engine (strategy nhanh trước, LLM sau cùng)
+    if planner:
+        planner.begin_video()
+    results = run_steps(page, build_share_steps(emails, waits, limiter, planner), on_step=on_step)
+    print_step_summary(results)
+    print_wait_summary(waits)
+    
+    if not results[-1]["success"]:
+        print(f"Không thể thực hiện bước: {results[-1]['step']}")
+        return False
+    
+    if results[-1]["finished"]:
+        print(f"\nVideo {video_id} đã được chia sẻ cho tất cả email, không cần thay đổi")
+        return True
+    
+    print(f"\nHoàn tất quy trình chia sẻ video {video_id}!")
+    return True
+
+def ai_action_strategy(step_description, emails=None):
+    """
+    Strategy cuối cùng: hỏi AI thao tác tiếp theo dựa trên trạng thái trang
+    """
+    def run(page):
+        page_info = get_page_info(page)
+        action_info = ask_ai_for_action(page_info, step_description, emails)
+        print(f"AI đề xuất: {action_info}")
+        if not execute_ai_action(page, action_info, step_description):
+            return False
+        # Chờ DOM ổn định sau thao tác của AI (hết giờ thì đã có cảnh báo, bước sau tự chờ element)
+        wait_for_dom_settled(page)
+        invalidate_snapshot(page)
+        return True
+    return function_strategy("ai_action", run, uses_llm=True)
+
+def fill_email_by_selectors(page, emails):
+    """
+    Tìm input field bằng danh sách selector và nhập tất cả email
+    """
+    input_selectors = [
+        'input[type="email"]',
+        'input[type="text"]',
+        'input[placeholder*="email"]',
+        'input[placeholder*="Email"]',
+        'input[aria-label*="email"]',
+        'input[aria-label*="Email"]',
+        'textarea',
+        '[contenteditable="true"]',
+        '[role="textbox"]',
+        '[data-testid*="email"]',
+        '[data-testid*="input"]',
+        'ytcp-text-input',
+        'ytcp-input',
+        'form input',
+        '.email-input',
+        '.input-field'
+    ]
+    
+    for selector in input_selectors:
+        try:
+            input_field = page.locator(selector)
+            for j in range(input_field.count()):
+                field = input_field.nth(j)
+                if field.is_visible():
+                    print(f"✅ Tìm thấy input field với selector: {selector}")
+                    try:
+                        fill_emails_in_field(page, field, emails)
+                        print(f"✅ Đã nhập email: {', '.join(emails)}")
+                        return True
+                    except Exception as fill_error:
+                        print(f"❌ Không thể nhập vào field này: {fill_error}")
+        except Exception as e:
+            print(f"❌ Lỗi với selector {selector}: {e}")
+    return False
+
+def fill_email_in_dialog(page, emails, timeout_ms):
+    """
+    Nhập email vào ô input của dialog chia sẻ đang mở
+    """
+    field = dialog_scope(page, True).locator(EMAIL_FIELD_SELECTOR).first
+    field.wait_for(state="visible", timeout=timeout_ms)
+    fill_emails_in_field(page, field, emails)
+    print(f"✅ Đã nhập email: {', '.join(emails)}")
+    return True
+
+def press_enter(page):
+    page.keyboard.press('Enter')
+    print("✅ Đã nhấn Enter")
+    return True
+
+def build_share_steps(emails, waits, limiter=None, planner=None):
+    """
+    Khai báo các bước của flow chia sẻ và strategy của từng bước (theo thứ tự ưu tiên).
+    planner: SharePlanner, thay các lần gọi LLM của từng bước bằng một plan cho cả flow
+    (logic thủ công của các hàm tìm thông minh vẫn được giữ).
+    """
+    share_emails = prepare_share_emails(emails)
+    dialogs = {"before": 0}
+    
+    def llm_strategies(step, strategies, fallbacks=(), in_dialog=False, cache_step=None, fill=None):
+        # Planning mode: một lần gọi LLM cho cả flow thay cho LLM của từng bước;
+        # logic thủ công của các hàm tìm thông minh (fallbacks, không gọi LLM) vẫn chạy sau plan
+        if planner:
+            return [plan_strategy(planner, step, in_dialog=in_dialog, cache_step=cache_step, fill=fill), *fallbacks]
+        return strategies
+    
+    def remember_dialogs(page):
+        dialogs["before"] = count_visible_dialogs(page)
+    
+    def save_with_limit(page, attempt):
+        if limiter:
+            limiter.acquire("save")
+        return click_and_wait_for_save(page, attempt, log=waits)
+    
+    def precheck(page):
+        # Chỉ nhập các email chưa có quyền xem (sửa list tại chỗ cho các strategy sau)
+        data = precheck_share(page, share_emails)
+        share_emails[:] = data["pending"]
+        return data
+    
+    return [
+        ShareStep(
+            "visibility",
+            [
+                role_strategy(["Chế độ hiển thị", "Visibility"], exact=False),
+                snapshot_strategy(VISIBILITY_KEYWORDS, cache_step="Chế độ hiển thị hoặc Visibility"),
+                # Selector cache đã được thử ở đầu bước
+                *llm_strategies("visibility", [
+                    function_strategy("smart_find", lambda page: find_visibility_button(page, use_cache=False), uses_llm=True),
+                    ai_action_strategy("Tìm và click vào nút Chế độ hiển thị/Visibility")
+                ], [
+                    function_strategy("smart_find", lambda page: find_visibility_button(page, use_cache=False, use_llm=False))
+                ], cache_step="Chế độ hiển thị hoặc Visibility")
+            ],
+            cache_step="Chế độ hiển thị hoặc Visibility",
+            after=lambda page: wait_for_dialog_open(page, "visibility_dialog", fallback_ms=1000, log=waits)
+        ),
+        ShareStep(
+            "share",
+            [
+                role_strategy(["Chỉnh sửa", "Edit", "Chia sẻ riêng tư", "Share privately", "Chia sẻ", "Share"], in_dialog=True),
+                snapshot_strategy(["chỉnh sửa", "edit", "chia sẻ riêng tư", "chia sẻ", "share"], in_dialog=True, cache_step="Chia sẻ riêng tư hoặc Chia sẻ"),
+                *llm_strategies("share", [
+                    function_strategy("smart_find", find_share_button, uses_llm=True),
+                    ai_action_strategy("Click vào nút Chia sẻ riêng tư/Chia sẻ/Chỉnh sửa")
+                ], [
+                    function_strategy("smart_find", lambda page: find_share_button(page, use_llm=False))
+                ], in_dialog=True, cache_step="Chia sẻ riêng tư hoặc Chia sẻ")
+            ],
+            cache_step="Chia sẻ riêng tư hoặc Chia sẻ",
+            after=lambda page: wait_for_email_field(page, "share_dialog", fallback_ms=1000, log=waits)
+        ),
+        ShareStep(
+            "precheck",
+            [function_strategy("shared_list", precheck)],
+            finish_if=lambda result: not result["data"]["pending"]
+        ),
+        ShareStep(
+            "email",
+            [
+                Strategy("dialog_field", lambda page, timeout: fill_email_in_dialog(page, share_emails, timeout)),
+                function_strategy("input_selectors", lambda page: fill_email_by_selectors(page, share_emails)),
+                function_strategy("javascript", lambda page: fill_email_field_by_javascript(page, ", ".join(share_emails))),
+                *llm_strategies("email", [
+                    function_strategy("smart_find", lambda page: find_and_fill_email_field(page, ", ".join(share_emails)), uses_llm=True),
+                    ai_action_strategy("Nhập email vào ô input", share_emails)
+                ], [
+                    function_strategy("smart_find", lambda page: find_and_fill_email_field(page, ", ".join(share_emails), use_llm=False))
+                ], in_dialog=True, fill=lambda page, field: fill_emails_in_field(page, field, share_emails))
+            ],
+            # Chờ nút Xong được bật sau khi nhập email
+            after=lambda page: wait_for_button_enabled(page, "email_done_enabled", DONE_KEYWORDS, timeout=3000, fallback_ms=500, log=waits)
+        ),
+        ShareStep(
+            "email_done",
+            [
+                role_strategy(DONE_NAMES, in_dialog=True),
+                function_strategy("email_section", find_done_button_email_section),
+                function_strategy("enabled_button", find_done_button_enabled),
+                function_strategy("enter", press_enter)
+            ],
+            before=remember_dialogs,
+            after=lambda page: wait_for_dialog_closed(page, "email_dialog_closed", dialogs["before"], fallback_ms=1000, log=waits)
+        ),
+        ShareStep(
+            "popup_done",
+            [
+                role_strategy(DONE_NAMES, in_dialog=True),
+                snapshot_strategy(DONE_KEYWORDS, in_dialog=True),
+                *llm_strategies("popup_done", [
+                    function_strategy("popup_smart_find", find_done_button_popup, uses_llm=True)
+                ], [
+                    function_strategy("popup_smart_find", lambda page: find_done_button_popup(page, use_llm=False))
+                ], in_dialog=True)
+            ],
+            before=remember_dialogs,
+            after=lambda page: wait_for_dialog_closed(page, "popup_closed", dialogs["before"], fallback_ms=1000, log=waits)
+        ),
+        ShareStep(
+            "save",
+            [
+                role_strategy(SAVE_NAMES),
+                snapshot_strategy(["lưu", "save"], cache_step="Lưu hoặc Save"),
+                *llm_strategies("save", [
+                    function_strategy("smart_find", lambda page: find_save_button(page, use_cache=False), uses_llm=True),
+                    ai_action_strategy("Click Lưu/Save")
+                ], [
+                    function_strategy("smart_find", lambda page: find_save_button(page, use_cache=False, use_llm=False))
+                ], cache_step="Lưu hoặc Save")
+            ],
+            cache_step="Lưu hoặc Save",
+            # Click Lưu và chờ RPC lưu của Studio trả về
+            wrap=save_with_limit
+        )
+    ]
+
+def print_wait_summary(waits):
+    """
+    In tổng thời gian chờ thực tế so với tổng sleep cố định của flow cũ
+    """
+    if not waits:
+        return
+    waited = sum(w["elapsed_ms"] for w in waits)
+    budget = sum(w["budget_ms"] for w in waits)
+    fallbacks = sum(1 for w in waits if not w["ready"])
+    print(f"⏱️ Tổng thời gian chờ: {waited:.0f}ms (sleep cũ: {budget}ms, fallback: {fallbacks})")
 
 if __name__ == "__main__":
-    user_prompt = input("Nhập lệnh AI (ví dụ: 'Chia sẻ video abc123 cho email test@gmail.com'): ")
-    share_video_with_ai(user_prompt)
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Chia sẻ video YouTube riêng tư")
+    parser.add_argument("prompt", nargs="?", help="Lệnh chia sẻ (bỏ trống để nhập)")
+    parser.add_argument("--manifest", metavar="FILE", help="File CSV/JSONL video_id → email (không cần LLM)")
+    parser.add_argument("--profiles", metavar="FILE", help="JSON kênh → profile: chạy manifest với một worker process cho mỗi profile")
+    parser.add_argument("--dry-run", action="store_true", help="Chỉ đọc manifest và in thống kê")
+    parser.add_argument("--job-id", help="Đặt tên job (mặc định tự sinh)")
+    parser.add_argument("--resume", metavar="JOB_ID", help="Chạy tiếp job đã dừng từ journal")
+    parser.add_argument("--page-pool", type=int, default=1, help="Số page dùng lại trong batch mode")
+    parser.add_argument("--concurrency", type=int, default=1, metavar="N",
+                        help="Chạy N tab song song bằng engine async (chỉ cho lệnh chia sẻ, không ghi journal)")
+    parser.add_argument("--block-resources", action="store_true", default=BLOCK_RESOURCES,
+                        help="Chặn ảnh, media, font và telemetry khi tải Studio")
+    parser.add_argument("--prefetch", action="store_true", default=PREFETCH_NEXT,
+                        help="Tải trước trang edit của video kế tiếp trong tab thứ hai")
+    args = parser.parse_args()
+    if args.concurrency > 1 and (args.manifest or args.resume):
+        parser.error("--concurrency chỉ dùng với lệnh chia sẻ (không dùng với --manifest/--resume)")
+    if args.job_id:
+        job_id = job_id_slug(args.job_id)
+        if job_id != args.job_id:
+            print(f"⚠️ Job id '{args.job_id}' có ký tự không dùng được trong tên file, dùng '{job_id}'")
+        args.job_id = job_id
+        # Chạy sharded dùng lại journal của từng shard theo job id nên được phép trùng
+        if not args.profiles and not args.dry_run and os.path.exists(ShareJournal(job_id).path):
+            parser.error(f"Job {job_id} đã tồn tại, chạy tiếp bằng --resume {job_id} hoặc đặt --job-id khác")
+    if args.resume and not os.path.exists(ShareJournal(args.resume).path):
+        parser.error(f"Không tìm thấy journal của job {job_id_slug(args.resume)}")
+    
+    if args.resume:
+        resume_share_job(args.resume, page_pool_size=args.page_pool, block_resources=args.block_resources,
+                         prefetch=args.prefetch)
+    elif args.manifest and args.profiles and not args.dry_run:
+        from src.agent.youtube_share_shards import share_manifest_sharded
+        share_manifest_sharded(args.manifest, args.profiles, job_id=args.job_id, page_pool_size=args.page_pool,
+                               block_resources=args.block_resources, prefetch=args.prefetch)
+    elif args.manifest:
+        share_manifest(args.manifest, page_pool_size=args.page_pool, job_id=args.job_id, dry_run=args.dry_run,
+                       block_resources=args.block_resources, prefetch=args.prefetch)
+    else:
+        user_prompt = args.prompt or input("Nhập lệnh AI (ví dụ: 'Chia sẻ video abc123 cho email test@gmail.com'): ")
+        share_video_with_ai(user_prompt, page_pool_size=args.page_pool, concurrency=args.concurrency, job_id=args.job_id,
+                            block_resources=args.block_resources, prefetch=args.prefetch)
\ No newline at end of file
@@ -2,7 +2,8 @@ import os
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from src.agent.youtube_share_llm import get_llm_client
+from src.agent.youtube_share_response import parse_json_object, message_text
 import json
 import time
 
@@ -21,37 +22,14 @@ def extract_share_info(prompt: str):
         ("system", "Bạn là AI chuyên phân tích lệnh chia sẻ video YouTube riêng tư. Hãy trích xuất video_id và email từ lệnh người dùng. Trả về JSON với format: {{\"video_id\": \"...\", \"emails\": [\"...\"]}}. Nếu không đủ thông tin, trả về lỗi rõ ràng."),
         ("user", "{prompt}")
     ])
-    llm = ChatGoogleGenerativeAI(model=LLM_MODEL, google_api_key=GOOGLE_API_KEY)
+    llm = get_llm_client(LLM_MODEL, google_api_key=GOOGLE_API_KEY)
     chain = template | llm
     result = chain.invoke({"prompt": prompt})
     
-    # Tìm JSON trong kết quả (xử lý cả markdown code block và JSON thường)
-    import re, json
-    
-    # Lấy content từ result
-    result_str = str(result.content) if hasattr(result, 'content') else str(result)
-    
-    # Thử tìm JSON trong markdown code block trước
-    markdown_pattern = r'```(?:json)?\s*(\{[\s\S]*?\})\s*```'
-    markdown_match = re.search(markdown_pattern, result_str)
-    if markdown_match:
-        try:
-            json_str = markdown_match.group(1)
-            data = json.loads(json_str)
-            return data
-        except Exception as e:
-            pass
-    
-    # Nếu không tìm thấy trong markdown, thử tìm JSON thường
-    json_pattern = r'\{[\s\S]*?\}'
-    json_match = re.search(json_pattern, result_str)
-    if json_match:
-        try:
-            json_str = json_match.group(0)
-            data = json.loads(json_str)
-            return data
-        except Exception as e:
-            pass
+    # Tìm object JSON theo cân bằng ngoặc (xử lý cả markdown code block và object lồng nhau)
+    data = parse_json_object(message_text(result))
+    if data is not None:
+        return data
     
     raise ValueError(f"Không thể phân tích prompt: {result}")
 
@@ -0,0 +1,248 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from playwright.async_api import async_playwright
+
+from src.agent.youtube_share_agent import PROFILE_PATH, BROWSER_ARGS, STUDIO_URL, prepare_share_emails, chunk_emails
+from src.agent.youtube_share_waits import DIALOG_SELECTOR, EMAIL_FIELD_SELECTOR, VISIBLE_DIALOG_COUNT_JS, is_save_response
+from src.agent.youtube_share_precheck import SHARED_EMAILS_JS, email_delta
+from src.agent.youtube_share_helpers import SHARE_HELPERS_JS, CALL_HELPER_JS, helper_predicate
+
+# Thời gian tối đa chờ mỗi bước (ms)
+STEP_TIMEOUT_MS = 15000
+NAVIGATION_TIMEOUT_MS = 30000
+
+# Các bước của flow chia sẻ, theo thứ tự
+SHARE_STEPS = ["visibility", "share", "precheck", "email", "email_done", "popup_done", "save"]
+
+DIALOG_SELECTORS = [
+    'tp-yt-paper-dialog',
+    'ytcp-dialog',
+    '[role="dialog"]'
+]
+
+
+@dataclass
+class TabShareState:
+    """
+    Trạng thái flow chia sẻ của một tab (mỗi tab có state riêng)
+    """
+    video_id: str
+    emails: list
+    step_index: int = 0
+    status: str = "pending"
+    failed_step: str = None
+    error: str = None
+    started_at: float = field(default_factory=time.perf_counter)
+    duration: float = 0.0
+
+    @property
+    def current_step(self):
+        if self.step_index < len(SHARE_STEPS):
+            return SHARE_STEPS[self.step_index]
+        return None
+
+    def advance(self):
+        self.step_index += 1
+
+    def fail(self, error):
+        self.status = "failed"
+        self.failed_step = self.current_step
+        self.error = str(error)
+
+    def as_row(self):
+        return {
+            "video_id": self.video_id,
+            "emails": self.emails,
+            "status": self.status,
+            "duration": self.duration,
+            "failed_step": self.failed_step,
+            "error": self.error
+        }
+
+
+async def click_when_ready(page, keywords, in_dialog=False, enabled_only=True, timeout=STEP_TIMEOUT_MS):
+    """
+    Chờ đến khi element khớp từ khóa xuất hiện rồi click ngay (không sleep cố định)
+    """
+    handle = await page.wait_for_function(
+        helper_predicate("clickByKeywords"),
+        arg={
+            "keywords": keywords,
+            "inDialog": in_dialog,
+            "enabledOnly": enabled_only,
+            "dialogSelectors": DIALOG_SELECTORS
+        },
+        timeout=timeout
+    )
+    return await handle.json_value()
+
+
+async def fill_email_when_ready(page, value, timeout=STEP_TIMEOUT_MS):
+    """
+    Chờ ô nhập email xuất hiện rồi điền email
+    """
+    await page.wait_for_function(
+        helper_predicate("fillEmail"),
+        arg={"value": value, "dialogSelectors": DIALOG_SELECTORS},
+        timeout=timeout
+    )
+
+
+async def fill_emails_when_ready(page, emails, timeout=STEP_TIMEOUT_MS):
+    """
+    Nhập tất cả email vào dialog theo từng nhóm, trong cùng một lần mở dialog
+    """
+    chunks = chunk_emails(emails)
+    await fill_email_when_ready(page, ", ".join(chunks[0]), timeout=timeout)
+    for chunk in chunks[1:]:
+        await page.keyboard.press("End")
+        await page.keyboard.insert_text(", " + ", ".join(chunk))
+
+
+async def click_and_wait_for_dialog_closed(page, keywords, timeout=STEP_TIMEOUT_MS):
+    """
+    Click nút trong dialog trên cùng rồi chờ dialog đó đóng (số dialog hiển thị giảm)
+    """
+    dialogs_before = await page.evaluate(VISIBLE_DIALOG_COUNT_JS, DIALOG_SELECTOR)
+    await click_when_ready(page, keywords, in_dialog=True, timeout=timeout)
+    result = await page.evaluate(CALL_HELPER_JS, ["waitForState", [{
+        "state": "dialogCount",
+        "op": "lt",
+        "before": dialogs_before,
+        "dialogSelector": DIALOG_SELECTOR,
+        "timeout": timeout
+    }]])
+    if not isinstance(result, dict) or not result.get("ready"):
+        raise TimeoutError(f"Hết {timeout}ms chờ dialog đóng")
+
+
+async def click_and_wait_for_save(page, timeout=STEP_TIMEOUT_MS):
+    """
+    Click Lưu và chờ RPC lưu của Studio trả về thành công (lỗi nếu không có response hoặc HTTP lỗi)
+    """
+    async with page.expect_response(is_save_response, timeout=timeout) as response_info:
+        await click_when_ready(page, ["lưu", "save"], timeout=timeout)
+    response = await response_info.value
+    if not response.ok:
+        raise RuntimeError(f"RPC lưu trả về HTTP {response.status}")
+
+
+async def run_share_step(page, state: TabShareState):
+    """
+    Thực hiện bước hiện tại của state machine trên tab
+    """
+    step = state.current_step
+    if step == "visibility":
+        await click_when_ready(page, ["chế độ hiển thị", "visibility"], enabled_only=False)
+    elif step == "share":
+        await click_when_ready(page, ["chỉnh sửa", "edit", "chia sẻ riêng tư", "share privately", "chia sẻ", "share"], in_dialog=True)
+    elif step == "precheck":
+        await precheck_in_tab(page, state)
+    elif step == "email":
+        await fill_emails_when_ready(page, state.emails)
+    elif step == "email_done":
+        # Chờ dialog chia sẻ đóng để bước sau click vào Xong của dialog chế độ hiển thị
+        await click_and_wait_for_dialog_closed(page, ["xong", "done"])
+    elif step == "popup_done":
+        await click_and_wait_for_dialog_closed(page, ["xong", "done"])
+    elif step == "save":
+        await click_and_wait_for_save(page)
+
+
+async def precheck_in_tab(page, state: TabShareState):
+    """
+    Bỏ các email đã có quyền xem; nếu không còn email nào thì đóng dialog, không lưu
+    """
+    await page.wait_for_selector(EMAIL_FIELD_SELECTOR, state="visible", timeout=STEP_TIMEOUT_MS)
+    existing = await page.evaluate(SHARED_EMAILS_JS, DIALOG_SELECTOR)
+    state.emails, already_shared = email_delta(state.emails, existing)
+    if already_shared:
+        print(f"   [{state.video_id}] 🔎 đã chia sẻ trước: {', '.join(already_shared)}")
+    if not state.emails:
+        for _ in range(await page.evaluate(VISIBLE_DIALOG_COUNT_JS, DIALOG_SELECTOR)):
+            await page.keyboard.press("Escape")
+        state.status = "unchanged"
+
+
+async def share_video_in_tab(context, video_id: str, emails: list, semaphore: asyncio.Semaphore):
+    """
+    Chạy toàn bộ flow chia sẻ một video trong một tab riêng
+    """
+    async with semaphore:
+        state = TabShareState(video_id=video_id, emails=prepare_share_emails(emails))
+        page = await context.new_page()
+        page.on("dialog", lambda dialog: asyncio.ensure_future(dialog.accept()))
+        try:
+            await page.goto(
+                f"{STUDIO_URL}/video/{video_id}/edit",
+                wait_until="domcontentloaded",
+                timeout=NAVIGATION_TIMEOUT_MS
+            )
+            while state.current_step:
+                await run_share_step(page, state)
+                print(f"   [{video_id}] ✅ {state.current_step}")
+                if state.status == "unchanged":
+                    break
+                state.advance()
+            else:
+                state.status = "success"
+        except Exception as e:
+            state.fail(e)
+            print(f"   [{video_id}] ❌ {state.failed_step}: {e}")
+        finally:
+            state.duration = time.perf_counter() - state.started_at
+            await page.close()
+        return state.as_row()
+
+
+async def share_videos_concurrently(video_ids: list, emails: list, concurrency: int = 3):
+    """
+    Chia sẻ nhiều video song song: N tab trong cùng một persistent context
+    """
+    concurrency = max(1, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with async_playwright() as p:
+        context = await p.chromium.launch_persistent_context(
+            user_data_dir=PROFILE_PATH,
+            headless=False,
+            args=BROWSER_ARGS
+        )
+        # Thư viện JS dùng chung (window.__ytShare) cho mọi tab
+        await context.add_init_script(SHARE_HELPERS_JS)
+        try:
+            print(f"🚀 Chạy {len(video_ids)} video với tối đa {concurrency} tab song song")
+            results = await asyncio.gather(*[
+                share_video_in_tab(context, video_id, emails, semaphore)
+                for video_id in video_ids
+            ])
+        finally:
+            await context.close()
+    return list(results)
+
+
+def print_results_table(results: list):
+    """
+    In bảng kết quả: video_id, emails, status, duration, bước lỗi
+    """
+    print(f"\n{'video_id':<14} {'emails':<30} {'status':<9} {'duration':>9}  failed_step")
+    print("-" * 80)
+    for row in results:
+        emails = ", ".join(row["emails"])
+        if len(emails) > 30:
+            emails = emails[:27] + "..."
+        print(f"{row['video_id']:<14} {emails:<30} {row['status']:<9} {row['duration']:>8.2f}s  {row['failed_step'] or ''}")
+    succeeded = sum(1 for row in results if row["status"] in ("success", "unchanged"))
+    print(f"\n🎉 HOÀN THÀNH {succeeded}/{len(results)} VIDEO!")
+
+
+def run_concurrent_share(video_ids: list, emails: list, concurrency: int = 3):
+    """
+    Wrapper sync cho share_videos_concurrently
+    """
+    start = time.perf_counter()
+    results = asyncio.run(share_videos_concurrently(video_ids, emails, concurrency))
+    print_results_table(results)
+    print(f"⏱️ Tổng thời gian: {time.perf_counter() - start:.2f}s")
+    return results
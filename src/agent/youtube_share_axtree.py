@@ -0,0 +1,255 @@
+"""
+Snapshot trang từ cây accessibility thay cho quét DOM bằng JS.
+- Lấy cây bằng CDP Accessibility.getFullAXTree (Chromium), fallback
+  page.accessibility.snapshot() của Playwright, cuối cùng là snapshot DOM
+- Chỉ giữ role tương tác (button, link, radio, textbox...) có accessible name;
+  node ẩn (dialog đã đóng) đã bị Chrome đánh dấu ignored nên tự bị loại
+- Cache theo page cho đến khi điều hướng hoặc số dialog đang mở thay đổi:
+  các hàm tìm element chấm điểm trên cây đã cắt bằng Python, không đi lại DOM
+Element có cùng format với snapshot DOM (youtube_share_snapshot) và được click
+lại bằng selector role của Playwright.
+"""
+import json
+import os
+
+from src.agent.youtube_share_snapshot import MAX_ELEMENTS, take_page_snapshot
+from src.agent.youtube_share_waits import count_visible_dialogs
+from src.agent.youtube_share_trace import span
+
+# Nguồn snapshot cho get_page_info/smart_find_element: "ax" (cây accessibility) hoặc "dom"
+SNAPSHOT_BACKEND = os.getenv("SHARE_SNAPSHOT_BACKEND", "ax")
+
+INTERACTIVE_ROLES = {
+    "button", "link", "radio", "checkbox", "switch", "tab",
+    "menuitem", "menuitemradio", "menuitemcheckbox", "option",
+    "textbox", "searchbox", "combobox",
+}
+INPUT_ROLES = {"textbox", "searchbox", "combobox"}
+DIALOG_ROLES = {"dialog", "alertdialog"}
+# Tên của các role này được đưa vào text trang (ngoài tên element tương tác)
+TEXT_ROLES = {"heading", "dialog", "alertdialog"}
+
+
+def role_selector(role, name=None, nth=0):
+    """
+    Selector role của Playwright (tên khớp chính xác), nth cho element trùng role + tên
+    """
+    selector = f"role={role}"
+    if name:
+        selector += f"[name={json.dumps(name, ensure_ascii=False)}s]"
+    return f"{selector} >> nth={nth}" if nth else selector
+
+
+def ax_value(node, field):
+    return (node.get(field) or {}).get("value")
+
+
+def ax_property(node, name):
+    for prop in node.get("properties", []):
+        if prop.get("name") == name:
+            return (prop.get("value") or {}).get("value")
+    return None
+
+
+def cdp_entries(nodes):
+    """
+    Node của Accessibility.getFullAXTree → (role, name, disabled, inDialog, value) theo thứ tự cây
+    """
+    by_id = {node["nodeId"]: node for node in nodes}
+    dialog_memo = {}
+
+    def in_dialog(node_id):
+        if node_id not in dialog_memo:
+            node = by_id.get(node_id)
+            if node is None:
+                dialog_memo[node_id] = False
+            else:
+                parent_id = node.get("parentId")
+                parent = by_id.get(parent_id)
+                dialog_memo[node_id] = bool(parent) and (ax_value(parent, "role") in DIALOG_ROLES or in_dialog(parent_id))
+        return dialog_memo[node_id]
+
+    entries = []
+    for node in nodes:
+        if node.get("ignored"):
+            continue
+        role = ax_value(node, "role")
+        if role not in INTERACTIVE_ROLES and role not in TEXT_ROLES:
+            continue
+        entries.append((
+            role,
+            (ax_value(node, "name") or "").strip(),
+            bool(ax_property(node, "disabled")),
+            in_dialog(node["nodeId"]),
+            ax_value(node, "value")
+        ))
+    return entries
+
+
+def playwright_entries(tree, in_dialog=False, entries=None):
+    """
+    Cây của page.accessibility.snapshot() → cùng format với cdp_entries
+    """
+    entries = [] if entries is None else entries
+    if not tree:
+        return entries
+    role = tree.get("role")
+    if role in INTERACTIVE_ROLES or role in TEXT_ROLES:
+        entries.append((role, (tree.get("name") or "").strip(), bool(tree.get("disabled")), in_dialog, tree.get("value")))
+    for child in tree.get("children", []):
+        playwright_entries(child, in_dialog or role in DIALOG_ROLES, entries)
+    return entries
+
+
+def build_ax_snapshot(entries, max_elements=MAX_ELEMENTS):
+    """
+    Snapshot {texts, elements, inputs, droppedElements} từ các node đã cắt
+    """
+    texts = []
+    seen_texts = set()
+    elements = []
+    inputs = []
+    dropped = 0
+    occurrences = {}
+
+    for role, name, disabled, in_dialog, value in entries:
+        if name and name not in seen_texts:
+            seen_texts.add(name)
+            texts.append(name)
+        if role not in INTERACTIVE_ROLES:
+            continue
+        # Thứ tự của element trong các element cùng role + tên (cho nth của selector)
+        nth = occurrences.get((role, name), 0)
+        occurrences[(role, name)] = nth + 1
+        selector = role_selector(role, name, nth)
+
+        if role in INPUT_ROLES:
+            inputs.append({
+                "type": role,
+                "ariaLabel": name,
+                "value": (value or "")[:200],
+                "selector": selector,
+                "inDialog": in_dialog,
+                "source": "ax",
+                "visible": True
+            })
+            continue
+        if not name:
+            continue
+        if len(elements) >= max_elements:
+            dropped += 1
+            continue
+        elements.append({
+            "text": name[:100],
+            "ariaLabel": "",
+            "title": "",
+            "tagName": "",
+            "role": role,
+            "className": "",
+            "id": "",
+            "disabled": disabled,
+            "inDialog": in_dialog,
+            "selector": selector,
+            "source": "ax",
+            "visible": True
+        })
+    return {"texts": texts, "elements": elements, "inputs": inputs, "droppedElements": dropped}
+
+
+class AXSnapshotCache:
+    """
+    Snapshot accessibility theo page, tạo lại khi page điều hướng hoặc số dialog đang mở thay đổi
+    """
+
+    def __init__(self):
+        self.pages = {}
+        self.counts = {"builds": 0, "hits": 0, "invalidations": 0, "nodes": 0, "kept": 0, "fallbacks": 0}
+
+    def state(self, page):
+        state = self.pages.get(page)
+        if state is None:
+            state = self.pages[page] = {"session": None, "snapshot": None, "url": None, "dialogs": None}
+            page.on("framenavigated", lambda frame: frame == page.main_frame and self.invalidate(page))
+            page.on("close", lambda _: self.pages.pop(page, None))
+        return state
+
+    def invalidate(self, page):
+        state = self.pages.get(page)
+        if state and state["snapshot"] is not None:
+            state["snapshot"] = None
+            self.counts["invalidations"] += 1
+
+    def fetch_entries(self, page, state):
+        """
+        Node accessibility của page: CDP trước, fallback snapshot của Playwright.
+        Trả về (số node trong cây, entries).
+        """
+        try:
+            if state["session"] is None:
+                state["session"] = page.context.new_cdp_session(page)
+            nodes = state["session"].send("Accessibility.getFullAXTree")["nodes"]
+            return len(nodes), cdp_entries(nodes)
+        except Exception:
+            state["session"] = None
+        tree = page.accessibility.snapshot(interesting_only=True)
+        entries = playwright_entries(tree)
+        return len(entries), entries
+
+    def get(self, page):
+        state = self.state(page)
+        dialogs = count_visible_dialogs(page)
+        if state["snapshot"] is not None and state["url"] == page.url and state["dialogs"] == dialogs:
+            self.counts["hits"] += 1
+            return state["snapshot"]
+
+        with span("ax_snapshot", "dom") as ax_span:
+            total, entries = self.fetch_entries(page, state)
+            snapshot = build_ax_snapshot(entries)
+            ax_span["args"].update(nodes=total, elements=len(snapshot["elements"]))
+        state.update(snapshot=snapshot, url=page.url, dialogs=dialogs)
+        self.counts["builds"] += 1
+        self.counts["nodes"] += total
+        self.counts["kept"] += len(snapshot["elements"]) + len(snapshot["inputs"])
+        return snapshot
+
+    def stats(self):
+        return dict(self.counts)
+
+
+_ax_cache = AXSnapshotCache()
+
+
+def get_ax_cache():
+    return _ax_cache
+
+
+def invalidate_snapshot(page):
+    """
+    Bỏ snapshot đã cache của page (sau thao tác làm thay đổi trang mà không mở/đóng dialog)
+    """
+    _ax_cache.invalidate(page)
+
+
+def take_snapshot(page, backend=SNAPSHOT_BACKEND):
+    """
+    Snapshot trang theo backend đã cấu hình; cây accessibility lỗi thì dùng snapshot DOM
+    """
+    if backend == "ax":
+        try:
+            return _ax_cache.get(page)
+        except Exception as e:
+            _ax_cache.counts["fallbacks"] += 1
+            print(f"⚠️ Không lấy được cây accessibility, dùng snapshot DOM: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+    return take_page_snapshot(page)
+
+
+def print_ax_stats():
+    """
+    In số lần tạo/dùng lại snapshot accessibility và tỉ lệ node được giữ
+    """
+    s = _ax_cache.stats()
+    if not s["builds"] and not s["fallbacks"]:
+        return
+    kept = 100 * s["kept"] / s["nodes"] if s["nodes"] else 0
+    print(f"AX snapshot: {s['builds']} lần tạo / {s['hits']} cache hit / {s['invalidations']} invalidate, "
+          f"giữ {s['kept']}/{s['nodes']} node ({kept:.0f}%), {s['fallbacks']} lần dùng DOM")
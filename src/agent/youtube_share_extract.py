@@ -0,0 +1,153 @@
+"""
+Trích xuất video_id và email từ lệnh chia sẻ bằng regex.
+Video ID YouTube (11 ký tự, hoặc nằm trong URL Studio/watch/youtu.be) và email
+có format cố định nên không cần gọi LLM cho các trường hợp thông thường.
+Chỉ khi lệnh mơ hồ mới fallback sang LLM; kết quả được nhớ trong LRU theo
+prompt đã chuẩn hóa nên chạy lại cùng lệnh không tốn lần gọi LLM nào.
+"""
+import re
+from collections import OrderedDict
+
+# Số prompt tối đa nhớ trong LRU
+EXTRACT_CACHE_SIZE = 256
+
+VIDEO_ID_PATTERN = r"[A-Za-z0-9_-]{11}"
+
+# URL chứa video ID: Studio, watch?v=, youtu.be, shorts, embed
+VIDEO_URL_RE = re.compile(
+    r"(?:https?://)?(?:[\w-]+\.)?(?:youtube\.com/(?:video/|watch\?(?:[^\s#]*&)?v=|shorts/|embed/|live/)|youtu\.be/)"
+    r"(" + VIDEO_ID_PATTERN + r")(?![\w-])[^\s,;]*"
+)
+
+# Video ID đứng riêng (không dính vào từ/URL khác)
+BARE_VIDEO_ID_RE = re.compile(r"(?<![\w\-/.@=])(" + VIDEO_ID_PATTERN + r")(?![\w\-@])")
+
+# Token dạng tên biến/slug chữ thường (vd: "video_12345", "file-2024-1"): không chắc là video ID
+IDENTIFIER_LIKE_RE = re.compile(r"[a-z0-9]+(?:[_-][a-z0-9]+)+")
+
+# Đoạn liên tiếp chỉ gồm chữ cái hoặc chỉ gồm chữ số
+ALNUM_RUN_RE = re.compile(r"[A-Za-z]+|[0-9]+")
+
+EMAIL_RE = re.compile(r"(?<![\w.%+-])[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}(?![\w-])")
+
+
+def normalize_prompt(prompt):
+    """
+    Chuẩn hóa prompt làm key cache (gộp khoảng trắng, giữ nguyên hoa/thường vì video ID phân biệt)
+    """
+    return " ".join(prompt.split())
+
+
+def dedupe(items):
+    """
+    Bỏ phần tử trùng, giữ thứ tự
+    """
+    return list(dict.fromkeys(items))
+
+
+def blank_match(match):
+    # Thay phần đã đọc bằng khoảng trắng cùng độ dài để giữ vị trí trong prompt
+    return " " * len(match.group(0))
+
+
+def looks_like_video_id(token):
+    """
+    Token 11 ký tự có giống video ID không: có cả chữ cái lẫn chữ số xen kẽ nhau
+    (ít nhất 3 đoạn chữ/số, không tính - và _), và không phải tên biến/slug chữ thường.
+    Từ thường ("Immediately"), số điện thoại ("09123456789"), mã ticket ("ABCD-123456")
+    hay tên biến ("video_12345") bị coi là mơ hồ để LLM xử lý.
+    """
+    if IDENTIFIER_LIKE_RE.fullmatch(token):
+        return False
+    return len(ALNUM_RUN_RE.findall(token.replace("-", "").replace("_", ""))) >= 3
+
+
+def extract_share_info_local(prompt):
+    """
+    Trích xuất {"video_ids": [...], "emails": [...]} bằng regex.
+    Trả về None nếu lệnh mơ hồ (thiếu video/email hoặc có token không chắc chắn)
+    để caller fallback sang LLM.
+    """
+    # (vị trí, video_id) để giữ đúng thứ tự xuất hiện trong prompt
+    found = [(match.start(), match.group(1)) for match in VIDEO_URL_RE.finditer(prompt)]
+    text = VIDEO_URL_RE.sub(blank_match, prompt)
+
+    emails = [email.lower() for email in EMAIL_RE.findall(text)]
+    text = EMAIL_RE.sub(blank_match, text)
+
+    # Còn ký tự @ nghĩa là có email sai format
+    if "@" in text:
+        return None
+
+    for match in BARE_VIDEO_ID_RE.finditer(text):
+        if not looks_like_video_id(match.group(1)):
+            return None
+        found.append((match.start(), match.group(1)))
+
+    video_ids = [video_id for _, video_id in sorted(found)]
+    if not video_ids or not emails:
+        return None
+    return {"video_ids": dedupe(video_ids), "emails": dedupe(emails)}
+
+
+class ExtractCache:
+    """
+    LRU nhớ kết quả trích xuất theo prompt đã chuẩn hóa, kèm thống kê nguồn kết quả
+    """
+
+    def __init__(self, max_size=EXTRACT_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.regex = 0
+        self.llm_calls = 0
+
+    def get(self, key):
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return self.entries[key]
+
+    def put(self, key, info):
+        self.entries[key] = info
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "regex": self.regex,
+            "llm_calls": self.llm_calls,
+            "size": len(self.entries)
+        }
+
+
+_extract_cache = ExtractCache()
+
+
+def get_extract_cache():
+    return _extract_cache
+
+
+def extract_share_info_cached(prompt, llm_extract, cache=None):
+    """
+    Trích xuất thông tin chia sẻ: LRU → regex → llm_extract(prompt).
+    Trả về bản sao để caller sửa thoải mái mà không ảnh hưởng cache.
+    """
+    cache = cache or _extract_cache
+    key = normalize_prompt(prompt)
+
+    info = cache.get(key)
+    if info is None:
+        info = extract_share_info_local(key)
+        if info is not None:
+            cache.regex += 1
+        else:
+            print("🤖 Lệnh mơ hồ, dùng LLM để phân tích...")
+            cache.llm_calls += 1
+            info = llm_extract(prompt)
+        cache.put(key, info)
+
+    return {k: list(v) if isinstance(v, list) else v for k, v in info.items()}
@@ -0,0 +1,432 @@
+"""
+Thư viện JavaScript dùng chung cho flow chia sẻ, cài một lần cho mỗi context bằng
+add_init_script và gọi qua window.__ytShare.<hàm>(...) với tham số JSON.
+Mỗi lần gọi chỉ gửi tên hàm + tham số thay vì cả đoạn script, và từ khóa/email
+không còn được chèn vào script bằng f-string.
+"""
+
+HELPER_NAMESPACE = "__ytShare"
+HELPER_VERSION = 3
+
+# Trả về khi document hiện tại chưa có thư viện (page không tạo từ context đã cài)
+HELPER_MISSING = "__ytShare:missing"
+
+SHARE_HELPERS_JS = """
+(() => {
+    if (window.__ytShare && window.__ytShare.version === %(version)d) return;
+
+    const POPUP_SELECTORS = [
+        '[role="dialog"]',
+        '[class*="modal"]',
+        '[class*="popup"]',
+        '[class*="dialog"]',
+        '.ytcp-dialog',
+        '.ytcp-modal',
+        'tp-yt-paper-dialog',
+        '[data-testid*="dialog"]',
+        '[data-testid*="modal"]',
+        '[data-testid*="popup"]'
+    ];
+    const BUTTON_SELECTOR = 'button, [role="button"], ytcp-button';
+    const CLICKABLE_SELECTOR = 'button, [role="button"], ytcp-button, div, span, a';
+    const TEXT_FIELD_SELECTOR = 'input[type="email"], input[type="text"], textarea, [contenteditable="true"]';
+
+    const isVisible = (el) => el.offsetParent !== null;
+    const textOf = (el) => el.textContent || el.innerText || '';
+    const attr = (el, name) => el.getAttribute(name) || '';
+    const isDisabled = (el) => !!el.disabled || attr(el, 'aria-disabled') === 'true'
+        || attr(el, 'class').toLowerCase().includes('disabled');
+    const matchKeyword = (el, keywords) => {
+        const text = textOf(el).toLowerCase();
+        const ariaLabel = attr(el, 'aria-label').toLowerCase();
+        return keywords.find(k => text.includes(k) || ariaLabel.includes(k)) || null;
+    };
+    const describe = (el) => ({
+        text: textOf(el),
+        ariaLabel: attr(el, 'aria-label'),
+        tagName: el.tagName,
+        className: attr(el, 'class')
+    });
+    const visibleDialogs = (dialogSelectors) => {
+        const roots = [];
+        for (const selector of dialogSelectors) {
+            document.querySelectorAll(selector).forEach(d => {
+                if (isVisible(d)) roots.push(d);
+            });
+        }
+        // Dialog mở sau cùng nằm cuối danh sách
+        return roots.reverse();
+    };
+    // Click thường, lỗi thì thử MouseEvent rồi Enter
+    const clickWithFallback = (el) => {
+        try {
+            el.click();
+            return 'normal_click';
+        } catch (e) {
+            try {
+                el.dispatchEvent(new MouseEvent('click', {bubbles: true, cancelable: true, view: window}));
+                return 'mouse_event';
+            } catch (e2) {
+                el.focus();
+                el.dispatchEvent(new KeyboardEvent('keydown', {key: 'Enter', code: 'Enter', keyCode: 13, which: 13, bubbles: true}));
+                return 'keyboard_event';
+            }
+        }
+    };
+    // Selector ổn định cho element để lưu vào cache
+    const buildSelector = (el) => {
+        const tag = el.tagName.toLowerCase();
+        const id = el.getAttribute('id');
+        if (id) return tag + '#' + CSS.escape(id);
+        const ariaLabel = el.getAttribute('aria-label');
+        if (ariaLabel) return tag + '[aria-label="' + ariaLabel.replace(/"/g, '\\\\"') + '"]';
+        const text = (el.textContent || '').trim();
+        if (text && text.length <= 40) return tag + ':has-text("' + text.replace(/"/g, '\\\\"') + '")';
+        return null;
+    };
+
+    window.__ytShare = {
+        version: %(version)d,
+
+        // Click element đầu tiên có text/aria-label/title chứa target
+        clickByText(target) {
+            const value = CSS.escape(target);
+            const lower = CSS.escape(target.toLowerCase());
+            const selectors = [
+                'button, [role="button"], ytcp-button, a',
+                '[aria-label*="' + value + '"]',
+                '[title*="' + value + '"]',
+                '[data-testid*="' + lower + '"]',
+                '[class*="' + lower + '"]'
+            ];
+            for (const selector of selectors) {
+                for (const el of document.querySelectorAll(selector)) {
+                    if (!isVisible(el)) continue;
+                    const matches = textOf(el).includes(target) || attr(el, 'aria-label').includes(target)
+                        || attr(el, 'title').includes(target);
+                    if (matches) {
+                        el.click();
+                        return true;
+                    }
+                }
+            }
+            return false;
+        },
+
+        // Nút Chỉnh sửa (video đã chia sẻ): ưu tiên button > role="button" > div/span
+        clickEditButton(keywords) {
+            const found = [];
+            for (const el of document.querySelectorAll(CLICKABLE_SELECTOR)) {
+                if (isVisible(el) && matchKeyword(el, keywords)) found.push(el);
+            }
+            const priority = (el) => el.tagName === 'BUTTON' ? 3 : (el.getAttribute('role') === 'button' ? 2 : 1);
+            found.sort((a, b) => priority(b) - priority(a));
+            if (found.length === 0) return {success: false, foundElements: []};
+            try {
+                const method = clickWithFallback(found[0]);
+                return {success: true, method, ...describe(found[0])};
+            } catch (e) {
+                return {success: false, foundElements: found.map(describe)};
+            }
+        },
+
+        // Nút theo từ khóa, ưu tiên nút enabled; không có thì click nút disabled đầu tiên
+        clickEnabledButton(keywords) {
+            const found = [];
+            for (const el of document.querySelectorAll(BUTTON_SELECTOR)) {
+                if (isVisible(el) && matchKeyword(el, keywords)) found.push({el, disabled: isDisabled(el)});
+            }
+            // Sắp xếp: enabled trước, disabled sau
+            found.sort((a, b) => (a.disabled ? 1 : 0) - (b.disabled ? 1 : 0));
+            if (found.length === 0) return {success: false, foundButtons: []};
+            try {
+                found[0].el.click();
+                return {success: true, enabled: !found[0].disabled, ...describe(found[0].el)};
+            } catch (e) {
+                return {success: false, error: e.toString(),
+                        foundButtons: found.map(b => ({...describe(b.el), disabled: b.disabled}))};
+            }
+        },
+
+        // Nút Xong gần ô nhập email (trong phạm vi 500px), enabled trước
+        clickDoneNearInput(keywords) {
+            const inputs = Array.from(document.querySelectorAll(TEXT_FIELD_SELECTOR)).filter(isVisible);
+            const found = [];
+            for (const el of document.querySelectorAll(BUTTON_SELECTOR)) {
+                if (!isVisible(el) || !matchKeyword(el, keywords)) continue;
+                const rect = el.getBoundingClientRect();
+                const nearby = inputs.some(input => {
+                    const other = input.getBoundingClientRect();
+                    return Math.hypot(rect.left - other.left, rect.top - other.top) < 500;
+                });
+                found.push({el, nearby, disabled: isDisabled(el)});
+            }
+            found.sort((a, b) => {
+                if (a.nearby !== b.nearby) return a.nearby ? -1 : 1;
+                return (a.disabled ? 1 : 0) - (b.disabled ? 1 : 0);
+            });
+            if (found.length === 0) return {success: false, foundButtons: []};
+            try {
+                found[0].el.click();
+                return {success: true, emailInputNearby: found[0].nearby, enabled: !found[0].disabled, ...describe(found[0].el)};
+            } catch (e) {
+                return {success: false, error: e.toString(),
+                        foundButtons: found.map(b => ({...describe(b.el), emailInputNearby: b.nearby, disabled: b.disabled}))};
+            }
+        },
+
+        // Nút theo từ khóa bên trong popup/modal đang hiển thị
+        clickInPopup(keywords) {
+            for (const selector of POPUP_SELECTORS) {
+                for (const popup of document.querySelectorAll(selector)) {
+                    if (!isVisible(popup)) continue;
+                    for (const btn of popup.querySelectorAll(CLICKABLE_SELECTOR)) {
+                        if (!isVisible(btn)) continue;
+                        const keyword = matchKeyword(btn, keywords);
+                        if (!keyword) continue;
+                        try {
+                            btn.click();
+                            return {success: true, popupSelector: selector, buttonText: textOf(btn), keyword};
+                        } catch (e) {
+                            continue;
+                        }
+                    }
+                }
+            }
+            return {success: false};
+        },
+
+        // Chấm điểm mọi element hiển thị theo từ khóa và click element điểm cao nhất
+        clickBestMatch(keywords) {
+            const elementTypes = ['button', 'ytcp-button', '[role="button"]', 'div', 'span', 'a'];
+            const found = [];
+            for (const tag of elementTypes) {
+                for (const el of document.querySelectorAll(tag)) {
+                    if (!isVisible(el)) continue;
+                    const text = textOf(el).toLowerCase();
+                    const ariaLabel = attr(el, 'aria-label').toLowerCase();
+                    const title = attr(el, 'title').toLowerCase();
+                    const className = attr(el, 'class').toLowerCase();
+                    const id = attr(el, 'id').toLowerCase();
+                    let score = 0;
+                    for (const keyword of keywords) {
+                        if (text.includes(keyword)) score += 3;
+                        if (ariaLabel.includes(keyword)) score += 2;
+                        if (title.includes(keyword)) score += 2;
+                        if (className.includes(keyword)) score += 1;
+                        if (id.includes(keyword)) score += 1;
+                    }
+                    if (score > 0) found.push({el, score});
+                }
+            }
+            found.sort((a, b) => b.score - a.score);
+            if (found.length === 0) return {success: false, foundElements: []};
+
+            const best = found[0];
+            const element = best.el;
+            try {
+                if (element.tagName === 'BUTTON' || element.getAttribute('role') === 'button') {
+                    element.click();
+                } else {
+                    // Với DIV/SPAN, trigger click event rồi thử focus + Enter
+                    element.dispatchEvent(new MouseEvent('click', {bubbles: true, cancelable: true, view: window}));
+                    if (!element.onclick) {
+                        element.focus();
+                        element.dispatchEvent(new KeyboardEvent('keydown', {key: 'Enter', code: 'Enter', keyCode: 13, which: 13, bubbles: true}));
+                    }
+                }
+                return {success: true, score: best.score, selector: buildSelector(element), ...describe(element)};
+            } catch (e) {
+                try {
+                    element.dispatchEvent(new Event('click', {bubbles: true}));
+                    return {success: true, score: best.score, method: 'javascript_event', ...describe(element)};
+                } catch (e2) {
+                    return {success: false, foundElements: found.slice(0, 5).map(f => ({...describe(f.el), score: f.score}))};
+                }
+            }
+        },
+
+        // Chấm điểm các ô nhập đang hiển thị và điền email vào ô phù hợp đầu tiên
+        fillEmailField(email) {
+            const inputSelectors = [
+                'input[type="email"]', 'input[type="text"]',
+                'input[placeholder*="email"]', 'input[placeholder*="Email"]',
+                'input[aria-label*="email"]', 'input[aria-label*="Email"]',
+                'textarea', '[contenteditable="true"]', '[role="textbox"]',
+                '[data-testid*="email"]', '[data-testid*="input"]',
+                'ytcp-text-input', 'ytcp-input', 'form input', '.email-input', '.input-field', 'input'
+            ];
+            for (const selector of inputSelectors) {
+                for (const el of document.querySelectorAll(selector)) {
+                    if (!isVisible(el)) continue;
+                    const tagName = el.tagName.toLowerCase();
+                    const type = attr(el, 'type');
+                    const placeholder = attr(el, 'placeholder');
+                    let score = 0;
+                    if (tagName === 'input' || tagName === 'textarea') score += 2;
+                    if (type === 'email') score += 3;
+                    if (type === 'text') score += 1;
+                    if (placeholder.toLowerCase().includes('email')) score += 2;
+                    if (attr(el, 'aria-label').toLowerCase().includes('email')) score += 2;
+                    if (el.getAttribute('contenteditable') === 'true') score += 1;
+                    if (el.getAttribute('role') === 'textbox') score += 1;
+                    if (score === 0) continue;
+                    try {
+                        el.focus();
+                        if (tagName === 'input' || tagName === 'textarea') {
+                            el.value = email;
+                        } else {
+                            el.textContent = email;
+                        }
+                        el.dispatchEvent(new Event('input', {bubbles: true}));
+                        el.dispatchEvent(new Event('change', {bubbles: true}));
+                        return {success: true, selector, tagName, score, type, placeholder};
+                    } catch (e) {
+                        continue;
+                    }
+                }
+            }
+            return {success: false};
+        },
+
+        // Dùng trong wait_for_function: tìm element theo từ khóa (trong dialog nếu cần), click khi tìm thấy
+        clickByKeywords({keywords, inDialog, enabledOnly, dialogSelectors}) {
+            const roots = inDialog ? visibleDialogs(dialogSelectors) : [document];
+            for (const root of roots) {
+                const candidates = root.querySelectorAll('button, [role="button"], ytcp-button, tp-yt-paper-radio-button');
+                let best = null;
+                let bestScore = 0;
+                for (const el of candidates) {
+                    if (!isVisible(el)) continue;
+                    if (enabledOnly && isDisabled(el)) continue;
+                    const text = (el.textContent || '').trim().toLowerCase();
+                    const ariaLabel = attr(el, 'aria-label').toLowerCase();
+                    let score = 0;
+                    keywords.forEach((keyword, index) => {
+                        // Từ khóa đứng trước được ưu tiên hơn
+                        const weight = keywords.length - index;
+                        if (text === keyword) score += 10 * weight;
+                        else if (text.includes(keyword)) score += 3 * weight;
+                        if (ariaLabel.includes(keyword)) score += 2 * weight;
+                    });
+                    if (score > bestScore) {
+                        best = el;
+                        bestScore = score;
+                    }
+                }
+                if (best) {
+                    best.click();
+                    return (best.textContent || '').trim() || true;
+                }
+            }
+            return false;
+        },
+
+        // Trạng thái UI cần chờ:
+        //   {state: 'element', keywords, inDialog, enabledOnly} - nút theo từ khóa hiển thị (và được bật)
+        //   {state: 'dialogCount', op: 'gt' | 'lt', before} - có dialog mở thêm / đóng bớt
+        matchesState(arg) {
+            const dialogs = Array.from(document.querySelectorAll(arg.dialogSelector)).filter(isVisible);
+            if (arg.state === 'dialogCount') {
+                return arg.op === 'gt' ? dialogs.length > arg.before : dialogs.length < arg.before;
+            }
+            const roots = arg.inDialog ? dialogs : [document];
+            for (const root of roots) {
+                for (const el of root.querySelectorAll(BUTTON_SELECTOR)) {
+                    if (!isVisible(el)) continue;
+                    if (arg.enabledOnly && isDisabled(el)) continue;
+                    if (matchKeyword(el, arg.keywords)) return true;
+                }
+            }
+            return false;
+        },
+
+        // Promise resolve ngay khi trạng thái khớp (MutationObserver, kèm một lần kiểm tra
+        // dự phòng mỗi 250ms), hoặc {ready: false} sau timeout ms
+        waitForState(arg) {
+            const start = performance.now();
+            const result = (ready) => ({ready, elapsedMs: performance.now() - start});
+            if (this.matchesState(arg)) return Promise.resolve(result(true));
+            return new Promise(resolve => {
+                let finished = false;
+                const finish = (ready) => {
+                    if (finished) return;
+                    finished = true;
+                    observer.disconnect();
+                    clearTimeout(timer);
+                    clearInterval(safety);
+                    resolve(result(ready));
+                };
+                const check = () => {
+                    if (this.matchesState(arg)) finish(true);
+                };
+                const observer = new MutationObserver(check);
+                observer.observe(document.documentElement, {
+                    childList: true,
+                    subtree: true,
+                    attributes: true,
+                    attributeFilter: ['disabled', 'aria-disabled', 'hidden', 'style', 'class', 'opened', 'aria-hidden']
+                });
+                // Poll dự phòng: isVisible dựa vào offsetParent/layout, có thể đổi chỉ do CSS
+                // (animation, transition, stylesheet tải muộn) mà không có mutation nào;
+                // 250ms đủ thưa để không tốn CPU
+                const safety = setInterval(check, 250);
+                const timer = setTimeout(() => finish(false), arg.timeout);
+            });
+        },
+
+        // Dùng trong wait_for_function: điền giá trị vào ô nhập email của dialog đang mở
+        fillEmail({value, dialogSelectors}) {
+            const roots = visibleDialogs(dialogSelectors);
+            roots.push(document);
+            for (const root of roots) {
+                for (const el of root.querySelectorAll('textarea, input[type="email"], input[type="text"], [contenteditable="true"]')) {
+                    if (!isVisible(el)) continue;
+                    el.focus();
+                    if (el.tagName === 'TEXTAREA' || el.tagName === 'INPUT') {
+                        el.value = value;
+                    } else {
+                        el.textContent = value;
+                    }
+                    el.dispatchEvent(new Event('input', {bubbles: true}));
+                    el.dispatchEvent(new Event('change', {bubbles: true}));
+                    return true;
+                }
+            }
+            return false;
+        }
+    };
+})()
+""" % {"version": HELPER_VERSION}
+
+# Gọi một hàm của thư viện với danh sách tham số
+CALL_HELPER_JS = """
+    ([name, args]) => window.%(ns)s ? window.%(ns)s[name](...args) : '%(missing)s'
+""" % {"ns": HELPER_NAMESPACE, "missing": HELPER_MISSING}
+
+
+def install_share_helpers(target):
+    """
+    Cài thư viện cho mọi document của context/page (chạy trước script của trang)
+    """
+    target.add_init_script(SHARE_HELPERS_JS)
+    return target
+
+
+def call_helper(page, name, *args):
+    """
+    Gọi window.__ytShare.<name>(*args). Nếu document chưa có thư viện
+    (page tạo từ context chưa cài) thì cài vào document hiện tại rồi gọi lại.
+    """
+    result = page.evaluate(CALL_HELPER_JS, [name, list(args)])
+    if result == HELPER_MISSING:
+        page.evaluate(SHARE_HELPERS_JS)
+        result = page.evaluate(CALL_HELPER_JS, [name, list(args)])
+    return result
+
+
+def helper_predicate(name):
+    """
+    Biểu thức cho wait_for_function: falsy cho đến khi thư viện đã cài và hàm trả về truthy
+    """
+    return f"(arg) => window.{HELPER_NAMESPACE} && window.{HELPER_NAMESPACE}.{name}(arg)"
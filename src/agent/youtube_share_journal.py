@@ -0,0 +1,156 @@
+"""
+Journal append-only (JSONL) cho job chia sẻ nhiều video.
+Mỗi dòng ghi trạng thái của một cặp (video_id, email): bước đã đạt tới và kết quả.
+Dòng sau ghi đè dòng trước khi đọc lại, nên job bị dừng giữa chừng có thể
+chạy tiếp bằng --resume <job-id>: bỏ qua cặp đã xong, chỉ chạy lại phần còn lại.
+"""
+import json
+import os
+import re
+import time
+import uuid
+
+SHARE_JOURNAL_DIR = os.getenv("SHARE_JOURNAL_DIR", "./tmp/jobs")
+
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+# Trạng thái coi như đã xong, không cần chạy lại khi resume
+COMPLETED_STATUSES = {STATUS_DONE, STATUS_SKIPPED}
+
+
+def new_job_id():
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+
+def job_id_slug(text):
+    """
+    Phần job id an toàn cho tên file: chỉ giữ chữ, số, "-", "_" và "."
+    """
+    return re.sub(r"[^\w.-]+", "-", text).strip("-.") or "job"
+
+
+class ShareJournal:
+    """
+    Journal của một job: header (danh sách video, email) + record từng cặp (video_id, email)
+    """
+
+    def __init__(self, job_id, directory=SHARE_JOURNAL_DIR):
+        # Job id nằm trong đường dẫn file: bỏ dấu phân cách thư mục, ".." và ký tự lạ
+        self.job_id = job_id_slug(job_id)
+        self.path = os.path.join(directory, f"{self.job_id}.jsonl")
+        self.job = None
+        self.pairs = {}
+        self.corrupt_lines = 0
+
+    @classmethod
+    def create(cls, video_ids, emails, job_id=None, directory=SHARE_JOURNAL_DIR):
+        """
+        Tạo job mới và ghi header
+        """
+        journal = cls(job_id or new_job_id(), directory)
+        if os.path.exists(journal.path):
+            raise ValueError(f"Job {journal.job_id} đã tồn tại: {journal.path} (chạy tiếp bằng --resume {journal.job_id})")
+        os.makedirs(directory, exist_ok=True)
+        journal.append([{
+            "type": "job",
+            "job_id": journal.job_id,
+            "video_ids": list(video_ids),
+            "emails": emails,
+            "created_at": time.time()
+        }])
+        return journal
+
+    @classmethod
+    def open(cls, job_id, directory=SHARE_JOURNAL_DIR):
+        """
+        Mở job đã có và đọc lại trạng thái từ journal
+        """
+        journal = cls(job_id, directory)
+        if not os.path.exists(journal.path):
+            raise ValueError(f"Không tìm thấy journal của job {job_id}: {journal.path}")
+        journal.replay()
+        if journal.job is None:
+            raise ValueError(f"Journal {journal.path} không có header job")
+        return journal
+
+    def replay(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Dòng cuối bị cắt ngang khi process bị kill
+                    self.corrupt_lines += 1
+                    continue
+                self.apply(record)
+
+    def apply(self, record):
+        if record.get("type") == "job":
+            self.job = record
+        elif record.get("type") == "pair":
+            self.pairs[(record["video_id"], record["email"])] = record
+
+    def append(self, records):
+        """
+        Ghi các record và fsync một lần để không mất khi crash
+        """
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        if self.ends_mid_line():
+            # Không nối record mới vào dòng bị cắt ngang
+            data = "\n" + data
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        for record in records:
+            self.apply(record)
+
+    def ends_mid_line(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def record(self, video_id, emails, step, status, error=None):
+        """
+        Ghi bước đạt tới và kết quả cho từng email của video
+        """
+        now = time.time()
+        self.append([{
+            "type": "pair",
+            "video_id": video_id,
+            "email": email,
+            "step": step,
+            "status": status,
+            "error": error,
+            "ts": now
+        } for email in emails])
+
+    def status(self, video_id, email):
+        record = self.pairs.get((video_id, email))
+        return record["status"] if record else None
+
+    def failed_step(self, video_id):
+        """
+        Bước lỗi gần nhất của video (None nếu video chưa lỗi)
+        """
+        steps = [r["step"] for (v, _), r in self.pairs.items() if v == video_id and r["status"] == STATUS_FAILED]
+        return steps[-1] if steps else None
+
+    def pending_emails(self, video_id, emails):
+        """
+        Email của video chưa hoàn tất
+        """
+        return [e for e in emails if self.status(video_id, e) not in COMPLETED_STATUSES]
+
+    def summary(self):
+        counts = {}
+        for record in self.pairs.values():
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+        return counts
@@ -0,0 +1,136 @@
+"""
+Registry client LLM dùng chung cho các share agent.
+Mỗi bộ (provider, model, tham số) chỉ tạo client một lần khi dùng lần đầu và
+giữ lại cho cả process, nên kết nối HTTP/gRPC (và TLS handshake) được tái sử dụng
+giữa các lần gọi. Thống kê số client tạo mới/tái sử dụng và độ trễ lần gọi đầu
+(cold, gồm thiết lập kết nối) tách riêng với các lần gọi sau (warm).
+"""
+import threading
+import time
+
+from src.agent.youtube_share_trace import span
+
+DEFAULT_PROVIDER = "google"
+
+
+def create_google_client(model, **params):
+    # Import khi cần để module dùng được cả khi chưa cài langchain_google_genai
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(model=model, **params)
+
+
+CLIENT_FACTORIES = {
+    "google": create_google_client,
+}
+
+
+class LLMClientRegistry:
+    """
+    Client LLM dùng chung, key theo provider/model/tham số
+    """
+
+    def __init__(self, factories=None):
+        self.factories = factories or CLIENT_FACTORIES
+        self.clients = {}
+        self.warm = set()
+        self.lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.calls = {}
+
+    @staticmethod
+    def make_key(provider, model, params):
+        return (provider, model, tuple(sorted((k, repr(v)) for k, v in params.items())))
+
+    def get(self, model, provider=DEFAULT_PROVIDER, **params):
+        """
+        Lấy client cho provider/model/params, tạo mới nếu chưa có
+        """
+        key = self.make_key(provider, model, params)
+        with self.lock:
+            client = self.clients.get(key)
+            if client is not None:
+                self.reused += 1
+                return client
+            client = self.factories[provider](model, **params)
+            self.clients[key] = client
+            self.created += 1
+            print(f"🔌 Tạo LLM client {provider}/{model}")
+            return client
+
+    def invoke(self, site, runnable, payload, client=None):
+        """
+        Gọi runnable.invoke(payload) và ghi lại độ trễ theo call site.
+        Lần gọi đầu của mỗi client (cold) được tính riêng.
+        """
+        client = client if client is not None else runnable
+        start = time.perf_counter()
+        with span(site, "llm", cold=id(client) not in self.warm) as llm_span:
+            try:
+                result = runnable.invoke(payload)
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                with self.lock:
+                    cold = id(client) not in self.warm
+                    self.warm.add(id(client))
+                    stats = self.calls.setdefault(site, {"calls": 0, "cold_calls": 0, "cold_ms": 0.0, "warm_ms": 0.0})
+                    stats["calls"] += 1
+                    if cold:
+                        stats["cold_calls"] += 1
+                        stats["cold_ms"] += elapsed_ms
+                    else:
+                        stats["warm_ms"] += elapsed_ms
+                print(f"🤖 [{site}] LLM trả lời sau {elapsed_ms:.0f}ms{' (cold)' if cold else ''}")
+            # Token thực tế nếu provider trả về usage_metadata
+            # (structured output với include_raw trả về dict có message gốc ở "raw")
+            message = result.get("raw") if isinstance(result, dict) else result
+            usage = getattr(message, "usage_metadata", None) or {}
+            llm_span["args"].update(
+                input_tokens=usage.get("input_tokens", 0),
+                output_tokens=usage.get("output_tokens", 0)
+            )
+        return result
+
+    def stats(self):
+        requests = self.created + self.reused
+        return {
+            "clients": len(self.clients),
+            "created": self.created,
+            "reused": self.reused,
+            "reuse_rate": self.reused / requests if requests else 0.0,
+            "calls": {site: dict(s) for site, s in self.calls.items()}
+        }
+
+
+_registry = LLMClientRegistry()
+
+
+def get_llm_registry():
+    return _registry
+
+
+def get_llm_client(model, provider=DEFAULT_PROVIDER, **params):
+    """
+    Client dùng chung của process cho provider/model/params
+    """
+    return _registry.get(model, provider, **params)
+
+
+def invoke_llm(site, runnable, payload, client=None):
+    """
+    Gọi LLM qua registry để thống kê độ trễ theo call site
+    """
+    return _registry.invoke(site, runnable, payload, client=client)
+
+
+def print_llm_stats():
+    """
+    In thống kê tái sử dụng client và độ trễ warm/cold theo call site
+    """
+    stats = _registry.stats()
+    print(f"LLM client: {stats['created']} tạo mới / {stats['reused']} tái sử dụng ({stats['reuse_rate'] * 100:.0f}%)")
+    for site, s in stats["calls"].items():
+        warm_calls = s["calls"] - s["cold_calls"]
+        warm_avg = s["warm_ms"] / warm_calls if warm_calls else 0.0
+        cold_avg = s["cold_ms"] / s["cold_calls"] if s["cold_calls"] else 0.0
+        print(f"LLM [{site}]: {s['calls']} lần, warm TB {warm_avg:.0f}ms, cold TB {cold_avg:.0f}ms ({s['cold_calls']} lần)")
@@ -0,0 +1,166 @@
+"""
+Đọc manifest chia sẻ (CSV hoặc JSONL) video_id → email.
+File được đọc từng dòng, gom theo video (mỗi video chỉ mở một lần) và bỏ email trùng.
+Không cần LLM: video ID/URL và email được kiểm tra bằng regex của youtube_share_extract.
+
+CSV: cột video_id (hoặc video, url) và email (hoặc emails, nhiều email cách nhau bằng , ;)
+JSONL: {"video_id": "...", "emails": ["..."]} hoặc {"video_id": "...", "email": "..."}
+Cả hai có thể thêm cột channel để chia video theo profile của từng kênh.
+"""
+import csv
+import json
+import re
+
+from src.agent.youtube_share_extract import VIDEO_URL_RE, EMAIL_RE
+
+VIDEO_COLUMNS = ["video_id", "video", "url", "video_url"]
+EMAIL_COLUMNS = ["emails", "email"]
+# Cột tùy chọn: kênh sở hữu video (dùng khi chia theo profile, xem youtube_share_shards)
+CHANNEL_COLUMNS = ["channel", "channel_id"]
+
+VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+EMAIL_SPLIT_RE = re.compile(r"[,;\s]+")
+
+
+def parse_video_id(value):
+    """
+    Video ID từ ID 11 ký tự hoặc URL YouTube/Studio (None nếu không hợp lệ)
+    """
+    value = (value or "").strip()
+    if VIDEO_ID_RE.match(value):
+        return value
+    match = VIDEO_URL_RE.search(value)
+    return match.group(1) if match else None
+
+
+def parse_emails(value):
+    """
+    Danh sách email từ chuỗi (nhiều email cách nhau bằng , ; hoặc khoảng trắng) hoặc list
+    """
+    if isinstance(value, list):
+        parts = value
+    else:
+        parts = EMAIL_SPLIT_RE.split(value or "")
+    return [p.strip() for p in parts if p and p.strip()]
+
+
+def field_type_error(video_value, email_value, channel_value):
+    """
+    Lỗi kiểu dữ liệu của các cột (dòng JSONL có thể chứa số/object), None nếu hợp lệ.
+    video_id phải là chuỗi (số JSON mất số 0 ở đầu nên không tự chuyển),
+    emails là chuỗi hoặc danh sách chuỗi, channel là chuỗi hoặc số.
+    """
+    if video_value is not None and not isinstance(video_value, str):
+        return f"video_id phải là chuỗi, không phải {type(video_value).__name__}"
+    if email_value is not None and not (
+        isinstance(email_value, str) or
+        (isinstance(email_value, list) and all(isinstance(e, str) for e in email_value))
+    ):
+        return f"emails phải là chuỗi hoặc danh sách chuỗi, không phải {type(email_value).__name__}"
+    if channel_value is not None and (isinstance(channel_value, bool) or not isinstance(channel_value, (str, int))):
+        return f"channel phải là chuỗi, không phải {type(channel_value).__name__}"
+    return None
+
+
+def first_value(row, columns):
+    for column in columns:
+        if row.get(column):
+            return row[column]
+    return None
+
+
+def iter_manifest_rows(path):
+    """
+    Đọc từng dòng manifest, trả về (số dòng, dict dòng)
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except ValueError:
+                    yield line_no, None
+        else:
+            reader = csv.DictReader(f)
+            reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames or []]
+            for row in reader:
+                yield reader.line_num, row
+
+
+class ShareManifest:
+    """
+    Manifest đã gom theo video: {video_id: [email, ...]} giữ thứ tự xuất hiện
+    """
+
+    def __init__(self):
+        self.videos = {}
+        self.channels = {}
+        self.rows = 0
+        self.duplicates = 0
+        self.invalid = []
+
+    @classmethod
+    def load(cls, path):
+        manifest = cls()
+        for line_no, row in iter_manifest_rows(path):
+            manifest.add_row(line_no, row)
+        return manifest
+
+    def add_row(self, line_no, row):
+        self.rows += 1
+        if not isinstance(row, dict):
+            self.invalid.append((line_no, "dòng không đọc được"))
+            return
+        video_value = first_value(row, VIDEO_COLUMNS)
+        email_value = first_value(row, EMAIL_COLUMNS)
+        channel_value = first_value(row, CHANNEL_COLUMNS)
+        error = field_type_error(video_value, email_value, channel_value)
+        if error:
+            self.invalid.append((line_no, error))
+            return
+        video_id = parse_video_id(video_value)
+        if not video_id:
+            self.invalid.append((line_no, "video_id không hợp lệ"))
+            return
+        emails = parse_emails(email_value)
+        if not emails:
+            self.invalid.append((line_no, "thiếu email"))
+            return
+        channel = str(channel_value or "").strip()
+        if channel and self.channels.setdefault(video_id, channel) != channel:
+            self.invalid.append((line_no, f"video {video_id} thuộc nhiều kênh: {self.channels[video_id]}, {channel}"))
+            return
+
+        video_emails = self.videos.setdefault(video_id, [])
+        for email in emails:
+            if not EMAIL_RE.fullmatch(email):
+                self.invalid.append((line_no, f"email không hợp lệ: {email}"))
+                continue
+            email = email.lower()
+            if email in video_emails:
+                self.duplicates += 1
+                continue
+            video_emails.append(email)
+        if not video_emails:
+            del self.videos[video_id]
+            self.channels.pop(video_id, None)
+
+    def stats(self):
+        return {
+            "rows": self.rows,
+            "videos": len(self.videos),
+            "pairs": sum(len(emails) for emails in self.videos.values()),
+            "duplicates": self.duplicates,
+            "invalid": len(self.invalid)
+        }
+
+    def print_summary(self):
+        stats = self.stats()
+        print(f"📄 Manifest: {stats['rows']} dòng → {stats['videos']} video, {stats['pairs']} cặp (video, email), "
+              f"bỏ {stats['duplicates']} email trùng, {stats['invalid']} dòng lỗi")
+        for line_no, reason in self.invalid[:20]:
+            print(f"   ⚠️ Dòng {line_no}: {reason}")
+        if len(self.invalid) > 20:
+            print(f"   ... và {len(self.invalid) - 20} lỗi khác")
@@ -0,0 +1,182 @@
+"""
+Theo dõi bộ nhớ Chrome cho batch chạy lâu (hàng trăm trang edit trên một context).
+- Bộ nhớ từng page: CDP Performance.getMetrics (JS heap, số DOM node)
+- Bộ nhớ cả Chrome: tổng RSS các process của profile (pid từ CDP SystemInfo.getProcessInfo,
+  fallback tìm process theo --user-data-dir trong /proc)
+- Sau mỗi video quyết định: thay page (sau N video hoặc JS heap vượt ngưỡng) hoặc
+  khởi động lại persistent context (RSS vượt ngưỡng hoặc sau M video)
+Ngưỡng mặc định để job nhiều giờ chạy được trong container 2 GB.
+"""
+import os
+
+# Thay page sau số video này (0 = tắt)
+PAGE_RECYCLE_AFTER = int(os.getenv("SHARE_PAGE_RECYCLE_AFTER", "25"))
+# Thay page khi JS heap của page vượt ngưỡng (MB)
+PAGE_MEMORY_LIMIT_MB = float(os.getenv("SHARE_PAGE_MEMORY_MB", "400"))
+# Khởi động lại context khi tổng RSS của Chrome vượt ngưỡng (MB)
+BROWSER_MEMORY_LIMIT_MB = float(os.getenv("SHARE_BROWSER_MEMORY_MB", "1400"))
+# Khởi động lại context sau số video này (0 = tắt)
+CONTEXT_RESTART_AFTER = int(os.getenv("SHARE_CONTEXT_RESTART_AFTER", "0"))
+
+MB = 1024 * 1024
+
+RECYCLE_PAGE = "recycle_page"
+RESTART_CONTEXT = "restart_context"
+
+
+def process_rss_mb(pid):
+    """
+    RSS của process (MB) đọc từ /proc, None nếu không đọc được
+    """
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / MB
+
+
+def find_profile_pids(profile_path):
+    """
+    Pid các process Chrome chạy với --user-data-dir của profile (Linux)
+    """
+    if not profile_path or not os.path.isdir("/proc"):
+        return []
+    marker = ("--user-data-dir=" + os.path.abspath(profile_path)).encode()
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        if marker in cmdline.split(b"\0"):
+            pids.append(int(entry))
+    return pids
+
+
+class MemoryWatchdog:
+    """
+    Đo bộ nhớ sau mỗi video và quyết định thay page / khởi động lại context
+    """
+
+    def __init__(self, profile_path=None, recycle_after=PAGE_RECYCLE_AFTER, page_limit_mb=PAGE_MEMORY_LIMIT_MB,
+                 browser_limit_mb=BROWSER_MEMORY_LIMIT_MB, restart_after=CONTEXT_RESTART_AFTER,
+                 rss_reader=process_rss_mb, pid_finder=find_profile_pids):
+        self.profile_path = profile_path
+        self.recycle_after = recycle_after
+        self.page_limit_mb = page_limit_mb
+        self.browser_limit_mb = browser_limit_mb
+        self.restart_after = restart_after
+        self.rss_reader = rss_reader
+        self.pid_finder = pid_finder
+        self.sessions = {}
+        self.page_videos = {}
+        self.context_videos = 0
+        self.peak = {"page_mb": 0.0, "browser_mb": 0.0, "dom_nodes": 0}
+        self.last = {}
+        self.counts = {"samples": 0, "recycled": 0, "restarts": 0}
+
+    def session(self, page):
+        session = self.sessions.get(page)
+        if session is None:
+            session = page.context.new_cdp_session(page)
+            session.send("Performance.enable")
+            self.sessions[page] = session
+        return session
+
+    def forget(self, page):
+        self.sessions.pop(page, None)
+        self.page_videos.pop(page, None)
+
+    def reset_context(self):
+        """
+        Context mới: bỏ session/bộ đếm của các page cũ
+        """
+        self.sessions.clear()
+        self.page_videos.clear()
+        self.context_videos = 0
+
+    def page_memory(self, page):
+        """
+        JS heap (MB) và số DOM node của page từ Performance.getMetrics
+        """
+        try:
+            metrics = self.session(page).send("Performance.getMetrics")["metrics"]
+        except Exception:
+            self.sessions.pop(page, None)
+            return None
+        values = {m["name"]: m["value"] for m in metrics}
+        return {"page_mb": values.get("JSHeapUsedSize", 0) / MB, "dom_nodes": int(values.get("Nodes", 0))}
+
+    def browser_pids(self, page):
+        try:
+            processes = self.session(page).send("SystemInfo.getProcessInfo")["processInfo"]
+            pids = [p["id"] for p in processes if p.get("id")]
+            if pids:
+                return pids
+        except Exception:
+            # SystemInfo chỉ có ở target browser, persistent context không có browser session
+            pass
+        return self.pid_finder(self.profile_path)
+
+    def browser_memory_mb(self, page):
+        """
+        Tổng RSS (MB) các process Chrome của profile, None nếu không đo được
+        """
+        sizes = [self.rss_reader(pid) for pid in self.browser_pids(page)]
+        sizes = [s for s in sizes if s is not None]
+        return sum(sizes) if sizes else None
+
+    def sample(self, page):
+        sample = self.page_memory(page) or {}
+        browser_mb = self.browser_memory_mb(page)
+        if browser_mb is not None:
+            sample["browser_mb"] = browser_mb
+        for key, value in sample.items():
+            self.peak[key] = max(self.peak[key], value)
+        self.last = sample
+        self.counts["samples"] += 1
+        return sample
+
+    def after_video(self, page):
+        """
+        Gọi sau mỗi video trên page: trả về RESTART_CONTEXT, RECYCLE_PAGE hoặc None
+        """
+        self.page_videos[page] = self.page_videos.get(page, 0) + 1
+        self.context_videos += 1
+        sample = self.sample(page)
+
+        if sample.get("browser_mb", 0) > self.browser_limit_mb:
+            print(f"🧠 Chrome dùng {sample['browser_mb']:.0f}MB (> {self.browser_limit_mb:.0f}MB), khởi động lại context")
+            return RESTART_CONTEXT
+        if self.restart_after and self.context_videos >= self.restart_after:
+            print(f"🧠 Đã chạy {self.context_videos} video trên context này, khởi động lại context")
+            return RESTART_CONTEXT
+        if sample.get("page_mb", 0) > self.page_limit_mb:
+            print(f"🧠 JS heap của page {sample['page_mb']:.0f}MB (> {self.page_limit_mb:.0f}MB), thay page mới")
+            return RECYCLE_PAGE
+        if self.recycle_after and self.page_videos[page] >= self.recycle_after:
+            print(f"🧠 Page đã xử lý {self.page_videos[page]} video, thay page mới")
+            return RECYCLE_PAGE
+        return None
+
+    def record(self, action):
+        self.counts["recycled" if action == RECYCLE_PAGE else "restarts"] += 1
+
+    def stats(self):
+        return {"peak": dict(self.peak), "last": dict(self.last), **self.counts}
+
+
+def print_memory_stats(stats):
+    """
+    In đỉnh bộ nhớ page/Chrome và số lần thay page, khởi động lại context
+    """
+    if not stats or not stats["samples"]:
+        return
+    peak = stats["peak"]
+    browser = f"{peak['browser_mb']:.0f}MB" if peak["browser_mb"] else "không đo được"
+    print(f"Bộ nhớ: đỉnh JS heap page {peak['page_mb']:.0f}MB ({peak['dom_nodes']} DOM node), đỉnh Chrome {browser}, "
+          f"thay page {stats['recycled']} lần, khởi động lại context {stats['restarts']} lần")
@@ -0,0 +1,225 @@
+"""
+Planning mode cho flow chia sẻ: một lần gọi LLM trả về selector cho tất cả các bước.
+- Gửi một snapshot gọn của trang edit kèm mẫu dialog của Studio (dialog chưa mở
+  thì chưa có trong DOM), nhận về plan {bước: selector}
+- Plan được thực thi tuần tự không cần LLM; selector chạy được được ghi vào selector cache
+- Chỉ lập lại plan khi selector của một bước không dùng được, tối đa
+  PLAN_MAX_CALLS_PER_VIDEO lần gọi LLM mỗi video
+Plan dùng chung cho các video cùng ngôn ngữ UI trong một lần chạy.
+"""
+import os
+
+from src.agent.youtube_share_steps import Strategy, dialog_scope
+from src.agent.youtube_share_selector_cache import get_selector_cache, get_cache_key
+from src.agent.youtube_share_snapshot import snapshot_to_page_info
+from src.agent.youtube_share_axtree import take_snapshot
+from src.agent.youtube_share_prompt import build_llm_context
+from src.agent.youtube_share_response import invoke_structured
+from src.agent.youtube_share_trace import span
+
+# Bật planning mode thay cho các strategy LLM của từng bước (1 = bật)
+PLAN_MODE = os.getenv("SHARE_PLAN", "1") == "1"
+# Số lần gọi LLM lập plan tối đa cho mỗi video (tính cả lập lại plan)
+PLAN_MAX_CALLS_PER_VIDEO = int(os.getenv("SHARE_PLAN_MAX_CALLS", "1"))
+# Ngân sách token cho snapshot trang trong prompt lập plan
+PLAN_TOKEN_BUDGET = 1600
+
+# Các bước cần selector, theo thứ tự của flow
+PLAN_STEPS = {
+    "visibility": 'Nút "Chế độ hiển thị"/"Visibility" trên trang edit',
+    "share": 'Nút "Chia sẻ riêng tư"/"Share privately" (hoặc "Chỉnh sửa"/"Edit") trong dialog chế độ hiển thị',
+    "email": "Ô nhập email trong dialog chia sẻ",
+    "popup_done": 'Nút "Xong"/"Done" của dialog chế độ hiển thị',
+    "save": 'Nút "Lưu"/"Save" trên trang edit',
+}
+
+# Cấu trúc các dialog của Studio (chưa có trong snapshot khi lập plan từ trang edit)
+DIALOG_TEMPLATES = """
+- Dialog chế độ hiển thị (mở sau khi click Chế độ hiển thị): tp-yt-paper-dialog/ytcp-dialog [role="dialog"],
+  có radio Riêng tư/Private, nút "Chia sẻ riêng tư"/"Share privately" (hoặc "Chỉnh sửa"/"Edit" khi đã chia sẻ)
+  và nút "Xong"/"Done"
+- Dialog chia sẻ (mở trên dialog chế độ hiển thị): [role="dialog"] có danh sách email đã chia sẻ,
+  textarea nhập email ("Mời"/"Invite") và nút "Xong"/"Done" (disabled cho đến khi nhập email)
+- Selector của bước trong dialog được tìm trong dialog mở sau cùng
+"""
+
+PLAN_PROMPT = """
+Lập kế hoạch chia sẻ riêng tư một video trên YouTube Studio: trả về selector Playwright cho từng bước.
+
+Các bước (theo thứ tự):
+{steps}
+
+Mẫu dialog của Studio:
+{templates}
+{replan}
+Trang hiện tại:
+- Text: {page_text}
+- Clickable elements: {clickable_elements}
+- Input fields: {inputs}
+
+Ưu tiên selector ổn định: #id, [aria-label="..."], button:has-text("..."), ytcp-button:has-text("...").
+Trả về JSON: {{"visibility": "selector", "share": "selector", "email": "selector",
+"popup_done": "selector", "save": "selector", "reason": "..."}}. Bước không xác định được thì để null.
+"""
+
+REPLAN_NOTE = """
+Selector cũ của bước "{step}" không dùng được: {selector}
+Lập lại plan từ trạng thái hiện tại của trang.
+"""
+
+# Từ khóa xếp hạng element trong snapshot: gộp từ khóa của tất cả các bước
+PLAN_KEYWORDS = ["hiển thị", "visibility", "chia sẻ", "share", "chỉnh sửa", "edit", "riêng tư", "private",
+                 "email", "mời", "invite", "xong", "done", "lưu", "save"]
+
+PAGE_LANG_JS = "() => document.documentElement.lang || ''"
+
+
+class SharePlanner:
+    """
+    Lập plan selector cho cả flow bằng một lần gọi LLM và giữ plan theo ngôn ngữ UI.
+    llm_factory(): client LLM (chỉ tạo khi cần lập plan).
+    schema: schema Pydantic của plan (mặc định SharePlan).
+    """
+
+    def __init__(self, llm_factory, schema=None, max_calls_per_video=PLAN_MAX_CALLS_PER_VIDEO,
+                 token_budget=PLAN_TOKEN_BUDGET):
+        self.llm_factory = llm_factory
+        self.schema = schema
+        self.max_calls_per_video = max_calls_per_video
+        self.token_budget = token_budget
+        self.plans = {}
+        self.video_calls = 0
+        self.pending_llm_calls = 0
+        self.counts = {"plans": 0, "replans": 0, "hits": 0, "misses": 0, "over_budget": 0}
+
+    def begin_video(self):
+        """
+        Bắt đầu video mới: reset số lần gọi LLM của video
+        """
+        self.video_calls = 0
+
+    def plan_key(self, page):
+        try:
+            return page.evaluate(PAGE_LANG_JS)
+        except Exception:
+            return ""
+
+    def current_plan(self, page):
+        """
+        Plan cho ngôn ngữ UI của page, lập plan nếu chưa có (và còn lượt gọi LLM)
+        """
+        key = self.plan_key(page)
+        if key not in self.plans and self.video_calls < self.max_calls_per_video:
+            self.counts["plans"] += 1
+            self.request_plan(page, key)
+        return self.plans.get(key, {})
+
+    def replan(self, page, step):
+        """
+        Lập lại plan sau khi selector của step không dùng được.
+        Trả về plan mới, None nếu đã hết lượt gọi LLM của video.
+        """
+        if self.video_calls >= self.max_calls_per_video:
+            self.counts["over_budget"] += 1
+            print(f"⚠️ [plan] Hết lượt gọi LLM cho video này, không lập lại plan cho bước {step}")
+            return None
+        key = self.plan_key(page)
+        self.counts["replans"] += 1
+        return self.request_plan(page, key, failed_step=step)
+
+    def request_plan(self, page, key, failed_step=None):
+        if self.schema is None:
+            from src.agent.youtube_share_schemas import SharePlan
+            self.schema = SharePlan
+        old_plan = self.plans.get(key, {})
+        page_info = snapshot_to_page_info(take_snapshot(page))
+        context = build_llm_context(page_info, "plan", token_budget=self.token_budget, keywords=PLAN_KEYWORDS)
+        replan = ""
+        if failed_step:
+            replan = REPLAN_NOTE.format(step=failed_step, selector=old_plan.get(failed_step))
+        prompt = PLAN_PROMPT.format(
+            steps="\n".join(f"- {step}: {description}" for step, description in PLAN_STEPS.items()),
+            templates=DIALOG_TEMPLATES.strip(),
+            replan=replan,
+            page_text=context["page_text"],
+            clickable_elements=context["clickable_elements"],
+            inputs=context["inputs"]
+        )
+
+        self.video_calls += 1
+        self.pending_llm_calls += 1
+        with span("plan", "llm", replan=bool(failed_step)):
+            data = invoke_structured("plan_share_steps", self.llm_factory(), self.schema, prompt) or {}
+        plan = dict(old_plan)
+        # Selector hỏng không được giữ lại khi plan mới không trả về selector cho bước đó
+        plan.pop(failed_step, None)
+        plan.update({step: data[step] for step in PLAN_STEPS if data.get(step)})
+        if plan:
+            self.plans[key] = plan
+        else:
+            self.plans.pop(key, None)
+        print(f"🗺️ [plan] {'Lập lại plan' if failed_step else 'Lập plan'} ({len(plan)}/{len(PLAN_STEPS)} bước): {data.get('reason', '')}")
+        return plan
+
+    def record(self, outcome):
+        self.counts[outcome] += 1
+
+    def take_llm_calls(self):
+        """
+        Số lần gọi LLM kể từ lần đọc trước (để step engine thống kê)
+        """
+        calls, self.pending_llm_calls = self.pending_llm_calls, 0
+        return calls
+
+    def stats(self):
+        return dict(self.counts)
+
+
+def run_plan_selector(page, selector, in_dialog=False, cache_step=None, fill=None, timeout=None):
+    """
+    Thực hiện một bước bằng selector của plan: click, hoặc fill(page, field) với ô nhập.
+    Selector chạy được được ghi vào selector cache của bước.
+    """
+    if not selector:
+        return False
+    # Key cache phải lấy trước khi click (DOM thay đổi sau khi click)
+    cache_key = get_cache_key(page, cache_step) if cache_step else None
+    element = dialog_scope(page, in_dialog).locator(selector).first
+    try:
+        if fill:
+            element.wait_for(state="visible", timeout=timeout)
+            fill(page, element)
+        else:
+            element.click(timeout=timeout)
+    except Exception as e:
+        print(f"❌ [plan] Selector '{selector}' không dùng được: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+        return False
+    if cache_key:
+        get_selector_cache().record_success(cache_key, selector)
+    return True
+
+
+def plan_strategy(planner, step, in_dialog=False, cache_step=None, fill=None):
+    """
+    Strategy: thực hiện bước theo plan, lập lại plan một lần nếu selector không dùng được
+    """
+    def run(page, timeout):
+        plan = planner.current_plan(page)
+        if run_plan_selector(page, plan.get(step), in_dialog, cache_step, fill, timeout):
+            planner.record("hits")
+            return True
+        planner.record("misses")
+        plan = planner.replan(page, step)
+        return bool(plan) and run_plan_selector(page, plan.get(step), in_dialog, cache_step, fill, timeout)
+    return Strategy("plan", run, llm_calls=planner.take_llm_calls)
+
+
+def print_plan_stats(planner):
+    """
+    In số lần lập plan và số bước chạy theo plan
+    """
+    if planner is None:
+        return
+    s = planner.stats()
+    print(f"Planning: {s['plans']} plan / {s['replans']} lập lại / {s['hits']} bước theo plan / "
+          f"{s['misses']} selector hỏng / {s['over_budget']} hết lượt LLM")
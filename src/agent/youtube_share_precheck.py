@@ -0,0 +1,74 @@
+"""
+Kiểm tra trước (idempotency) cho flow chia sẻ: đọc danh sách email đã được chia sẻ
+trong dialog chia sẻ riêng tư đang mở và tính phần email còn thiếu.
+Video đã chia sẻ đủ cho tất cả email thì đóng dialog, không nhập email và không bấm Lưu.
+"""
+from src.agent.youtube_share_waits import DIALOG_SELECTOR, count_visible_dialogs
+
+# Email hiển thị trong dialog đang mở (chip/danh sách người được chia sẻ).
+# Bỏ qua giá trị của ô input vì đó là nội dung đang nhập, chưa được lưu.
+SHARED_EMAILS_JS = """
+    (dialogSelector) => {
+        const isVisible = (el) => el.offsetParent !== null;
+        const emailRe = /[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\\.[A-Za-z0-9-]+)*\\.[A-Za-z]{2,}/g;
+        const found = new Set();
+        const collect = (text) => (text || '').match(emailRe)?.forEach(e => found.add(e.toLowerCase()));
+        for (const dialog of document.querySelectorAll(dialogSelector)) {
+            if (!isVisible(dialog)) continue;
+            const walker = document.createTreeWalker(dialog, NodeFilter.SHOW_TEXT);
+            let node;
+            while ((node = walker.nextNode())) {
+                const parent = node.parentElement;
+                if (parent && !parent.closest('input, textarea, [contenteditable="true"]')) collect(node.textContent);
+            }
+            dialog.querySelectorAll('[title], [aria-label]').forEach(el => {
+                collect(el.getAttribute('title'));
+                collect(el.getAttribute('aria-label'));
+            });
+        }
+        return Array.from(found);
+    }
+"""
+
+
+def email_delta(requested, existing):
+    """
+    Tách email cần chia sẻ thành (còn thiếu, đã có), không phân biệt hoa thường
+    """
+    existing = {e.lower() for e in existing}
+    pending = [e for e in requested if e.lower() not in existing]
+    already_shared = [e for e in requested if e.lower() in existing]
+    return pending, already_shared
+
+
+def read_shared_emails(page):
+    """
+    Email đang hiển thị trong dialog chia sẻ (rỗng nếu không đọc được)
+    """
+    try:
+        return page.evaluate(SHARED_EMAILS_JS, DIALOG_SELECTOR)
+    except Exception as e:
+        print(f"⚠️ Không đọc được danh sách đã chia sẻ: {str(e).splitlines()[0]}")
+        return []
+
+
+def close_share_dialogs(page):
+    """
+    Đóng các dialog đang mở mà không lưu (Escape từng dialog)
+    """
+    for _ in range(count_visible_dialogs(page)):
+        page.keyboard.press("Escape")
+
+
+def precheck_share(page, emails):
+    """
+    Tính email còn thiếu. Nếu không còn email nào thì đóng dialog.
+    Trả về {"pending": [...], "already_shared": [...]}.
+    """
+    pending, already_shared = email_delta(emails, read_shared_emails(page))
+    if already_shared:
+        print(f"🔎 Đã chia sẻ trước đó: {', '.join(already_shared)}")
+    if not pending:
+        print("⏭️ Tất cả email đã có quyền xem, bỏ qua (không bấm Lưu)")
+        close_share_dialogs(page)
+    return {"pending": pending, "already_shared": already_shared}
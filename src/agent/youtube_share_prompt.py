@@ -0,0 +1,144 @@
+"""
+Xây dựng context gửi cho LLM với ngân sách token.
+Chỉ giữ các element/text liên quan đến bước hiện tại (xếp hạng theo từ khóa),
+cắt theo ngân sách token và ghi lại số token đã gửi ở mỗi bước.
+"""
+import json
+
+from src.agent.youtube_share_snapshot import rank_elements
+
+# Ngân sách token mặc định cho phần thông tin trang trong prompt
+DEFAULT_TOKEN_BUDGET = 1200
+# Tỉ lệ ngân sách dành cho text trang (phần còn lại cho element và input)
+TEXT_BUDGET_RATIO = 0.25
+
+# Trường của element được gửi cho LLM (bỏ className, title... rỗng)
+ELEMENT_FIELDS = ["sid", "text", "ariaLabel", "tagName", "role", "selector", "disabled", "inDialog"]
+INPUT_FIELDS = ["sid", "type", "placeholder", "ariaLabel", "value", "id", "selector"]
+
+# Số token đã gửi theo từng bước: {step: [{"sent": n, "full": m}, ...]}
+PROMPT_TOKEN_LOG = {}
+
+
+def estimate_tokens(text):
+    """
+    Ước lượng số token (~4 ký tự/token), đủ để so sánh kích thước prompt
+    """
+    return (len(text) + 3) // 4
+
+
+def keywords_for_step(description):
+    """
+    Từ khóa liên quan đến bước/element đang tìm
+    """
+    description = description.lower()
+    if "email" in description:
+        return ["email", "mời", "invite", "xong", "done"]
+    if "xong" in description or "done" in description:
+        return ["xong", "done", "ok", "confirm", "apply", "save", "submit"]
+    if "chia sẻ" in description or "share" in description:
+        return ["chia sẻ", "share", "edit", "chỉnh sửa", "private", "riêng tư"]
+    if "hiển thị" in description or "visibility" in description:
+        return ["hiển thị", "visibility", "chế độ", "public", "private", "unlisted"]
+    if "lưu" in description or "save" in description:
+        return ["lưu", "save", "publish", "update"]
+    # Tách từ khóa từ mô tả
+    return description.split()
+
+
+def compact_element(element):
+    """
+    Chỉ giữ các trường có giá trị của element
+    """
+    return {k: element[k] for k in ELEMENT_FIELDS if element.get(k)}
+
+
+def to_compact_json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def build_llm_context(page_info, step, token_budget=DEFAULT_TOKEN_BUDGET, include_inputs=True, keywords=None):
+    """
+    Tạo context nhỏ gọn cho LLM từ page_info:
+    - element liên quan nhất (theo từ khóa của bước), rồi element trong dialog
+    - text trang có chứa từ khóa
+    - cắt theo ngân sách token
+    keywords: từ khóa xếp hạng (mặc định theo bước, xem keywords_for_step).
+    Trả về dict: page_text, clickable_elements, inputs (đã serialize) và tokens.
+    """
+    keywords = keywords or keywords_for_step(step)
+    elements = page_info.get("clickable_elements", [])
+
+    # Element liên quan xếp trước, sau đó element trong dialog, cuối cùng là phần còn lại
+    ranked = [el for _, el in rank_elements(elements, keywords)]
+    ranked_ids = {id(el) for el in ranked}
+    in_dialog = [el for el in elements if el.get("inDialog") and id(el) not in ranked_ids]
+    in_dialog_ids = {id(el) for el in in_dialog}
+    rest = [el for el in elements if id(el) not in ranked_ids and id(el) not in in_dialog_ids]
+    ordered = ranked + in_dialog + rest
+
+    text_budget = int(token_budget * TEXT_BUDGET_RATIO)
+    texts = page_info.get("snapshot", {}).get("texts") or page_info.get("page_text", "").split(" | ")
+    relevant_texts = []
+    used = 0
+    for text in texts:
+        if not any(k in text.lower() for k in keywords):
+            continue
+        cost = estimate_tokens(text) + 1
+        if used + cost > text_budget:
+            break
+        relevant_texts.append(text)
+        used += cost
+    page_text = " | ".join(relevant_texts)
+
+    inputs = []
+    if include_inputs:
+        inputs = [{k: i[k] for k in INPUT_FIELDS if i.get(k)} for i in page_info.get("inputs", [])]
+    inputs_json = to_compact_json(inputs)
+
+    remaining = token_budget - estimate_tokens(page_text) - estimate_tokens(inputs_json)
+    selected = []
+    for element in ordered:
+        compact = compact_element(element)
+        cost = estimate_tokens(to_compact_json(compact)) + 1
+        if cost > remaining:
+            break
+        selected.append(compact)
+        remaining -= cost
+    elements_json = to_compact_json(selected)
+
+    sent = estimate_tokens(page_text) + estimate_tokens(elements_json) + estimate_tokens(inputs_json)
+    full = (estimate_tokens(page_info.get("page_text", ""))
+            + estimate_tokens(json.dumps(elements, indent=2))
+            + estimate_tokens(json.dumps(page_info.get("inputs", []), indent=2)))
+    record_prompt_tokens(step, sent, full)
+
+    return {
+        "page_text": page_text,
+        "clickable_elements": elements_json,
+        "inputs": inputs_json,
+        "tokens": sent
+    }
+
+
+def record_prompt_tokens(step, sent, full):
+    """
+    Ghi lại số token gửi cho LLM ở một bước
+    """
+    PROMPT_TOKEN_LOG.setdefault(step, []).append({"sent": sent, "full": full})
+    saved = 100 * (1 - sent / full) if full else 0
+    print(f"📏 [{step}] Gửi ~{sent} tokens cho LLM (toàn trang: ~{full}, giảm {saved:.0f}%)")
+
+
+def prompt_token_summary():
+    """
+    Tổng hợp token đã gửi theo từng bước
+    """
+    return {
+        step: {
+            "calls": len(entries),
+            "sent": sum(e["sent"] for e in entries),
+            "full": sum(e["full"] for e in entries)
+        }
+        for step, entries in PROMPT_TOKEN_LOG.items()
+    }
@@ -0,0 +1,177 @@
+"""
+Giới hạn tốc độ thao tác với Studio theo từng tài khoản (profile).
+- Token bucket cho điều hướng (mở trang edit) và lưu (RPC metadata_update), tốc độ cấu hình được
+- Phát hiện bị giới hạn: response 429 của RPC mà flow chia sẻ gọi hoặc toast "thử lại sau"
+- Khi bị giới hạn: backoff lũy thừa có jitter cho tài khoản đó, reset khi thành công
+Thay cho sleep cố định giữa các video: chỉ chờ khi cần.
+"""
+import os
+import random
+import threading
+import time
+
+# Tốc độ tối đa (lần/phút) và burst cho từng loại thao tác
+NAVIGATION_RATE_PER_MIN = float(os.getenv("SHARE_NAVIGATION_RATE_PER_MIN", "30"))
+SAVE_RATE_PER_MIN = float(os.getenv("SHARE_SAVE_RATE_PER_MIN", "20"))
+RATE_BURST = int(os.getenv("SHARE_RATE_BURST", "3"))
+
+# Backoff khi bị giới hạn (giây)
+BACKOFF_BASE_S = 5.0
+BACKOFF_MAX_S = 300.0
+# Số lần chạy lại một video bị lỗi do giới hạn
+MAX_THROTTLE_RETRIES = 3
+
+THROTTLE_STATUSES = {429}
+# Chỉ RPC của flow chia sẻ (đọc/cập nhật video, danh sách người được chia sẻ);
+# 429 của telemetry (log_event, stats...) không làm hỏng lần chia sẻ nên bỏ qua
+THROTTLE_URL_PATTERNS = ("/youtubei/v1/video_manager/", "/youtubei/v1/creator/")
+THROTTLE_TOAST_KEYWORDS = ["thử lại sau", "try again later", "quá nhiều", "too many", "rate limit"]
+
+# Có toast lỗi "thử lại sau" đang hiển thị không
+THROTTLE_TOAST_JS = """
+    (keywords) => {
+        const toasts = document.querySelectorAll('ytcp-toast, tp-yt-paper-toast, [role="alert"], [role="status"]');
+        for (const toast of toasts) {
+            if (toast.offsetParent === null) continue;
+            const text = (toast.textContent || '').toLowerCase();
+            if (keywords.some(k => text.includes(k))) return text.trim().slice(0, 200);
+        }
+        return null;
+    }
+"""
+
+
+class TokenBucket:
+    """
+    Token bucket: rate_per_min token mỗi phút, tối đa burst token dồn lại
+    """
+
+    def __init__(self, rate_per_min, burst=RATE_BURST, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_min / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """
+        Lấy một token, chờ nếu hết. Trả về số giây đã chờ.
+        """
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        with self.lock:
+            self.refill()
+            while self.tokens < 1:
+                delay = (1 - self.tokens) / self.rate
+                self.sleep(delay)
+                waited += delay
+                self.refill()
+            self.tokens -= 1
+        return waited
+
+
+class AccountBackoff:
+    """
+    Backoff lũy thừa có full jitter cho một tài khoản
+    """
+
+    def __init__(self, base_s=BACKOFF_BASE_S, max_s=BACKOFF_MAX_S, clock=time.monotonic, rand=random.random):
+        self.base_s = base_s
+        self.max_s = max_s
+        self.clock = clock
+        self.rand = rand
+        self.failures = 0
+        self.until = 0.0
+
+    def record_throttle(self):
+        """
+        Tăng mức backoff, trả về số giây phải chờ
+        """
+        self.failures += 1
+        ceiling = min(self.max_s, self.base_s * (2 ** (self.failures - 1)))
+        delay = ceiling / 2 + self.rand() * ceiling / 2
+        self.until = max(self.until, self.clock() + delay)
+        return delay
+
+    def record_success(self):
+        self.failures = 0
+
+    def remaining(self):
+        return max(0.0, self.until - self.clock())
+
+
+class ShareRateLimiter:
+    """
+    Limiter của một tài khoản: token bucket cho điều hướng/lưu + backoff khi bị giới hạn.
+    Gắn vào page bằng watch(page) để nhận response 429.
+    """
+
+    def __init__(self, account, navigation_rate=NAVIGATION_RATE_PER_MIN, save_rate=SAVE_RATE_PER_MIN,
+                 burst=RATE_BURST, clock=time.monotonic, sleep=time.sleep):
+        self.account = account
+        self.buckets = {
+            "navigation": TokenBucket(navigation_rate, burst, clock, sleep),
+            "save": TokenBucket(save_rate, burst, clock, sleep),
+        }
+        self.backoff = AccountBackoff(clock=clock)
+        self.sleep = sleep
+        self.throttle_signals = []
+        # Tổng số lần bị giới hạn (backoff.failures reset khi thành công)
+        self.throttles = 0
+        self.waited = {"navigation": 0.0, "save": 0.0, "backoff": 0.0}
+
+    def acquire(self, kind):
+        """
+        Chờ backoff (nếu đang bị giới hạn) rồi lấy token cho thao tác kind
+        """
+        remaining = self.backoff.remaining()
+        if remaining:
+            print(f"⏳ [{self.account}] Đang backoff, chờ {remaining:.1f}s")
+            self.sleep(remaining)
+            self.waited["backoff"] += remaining
+        self.waited[kind] += self.buckets[kind].acquire()
+
+    def on_response(self, response):
+        if response.status in THROTTLE_STATUSES and any(p in response.url for p in THROTTLE_URL_PATTERNS):
+            self.throttle_signals.append(f"HTTP {response.status} {response.url.split('?')[0]}")
+
+    def watch(self, page):
+        page.on("response", self.on_response)
+        return page
+
+    def check_toast(self, page):
+        try:
+            text = page.evaluate(THROTTLE_TOAST_JS, THROTTLE_TOAST_KEYWORDS)
+        except Exception:
+            return
+        if text:
+            self.throttle_signals.append(f"toast: {text}")
+
+    def take_throttled(self, page=None):
+        """
+        Có tín hiệu bị giới hạn kể từ lần kiểm tra trước không (xóa tín hiệu sau khi đọc)
+        """
+        if page is not None:
+            self.check_toast(page)
+        signals, self.throttle_signals = self.throttle_signals, []
+        return signals
+
+    def record_throttle(self, signals):
+        self.throttles += 1
+        delay = self.backoff.record_throttle()
+        print(f"🐢 [{self.account}] Studio giới hạn ({signals[0]}), backoff {delay:.1f}s (lần {self.backoff.failures})")
+        return delay
+
+    def record_success(self):
+        self.backoff.record_success()
+
+    def stats(self):
+        return {"account": self.account, "waited": dict(self.waited), "throttles": self.throttles}
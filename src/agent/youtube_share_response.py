@@ -0,0 +1,181 @@
+"""
+Lớp đọc câu trả lời LLM dùng chung cho các call site của share agent.
+- Ưu tiên structured output của provider (with_structured_output + schema Pydantic).
+  include_raw=True nên khi provider trả JSON không hợp lệ vẫn còn text để đọc lại,
+  không tốn thêm một lần gọi LLM.
+- Fallback: args của tool call trong message gốc (Gemini đặt payload structured ở đó),
+  sau đó quét text tìm object JSON theo cân bằng ngoặc (đúng với object lồng nhau
+  như element_info, dấu ngoặc trong chuỗi, markdown code block).
+- Đếm số lần đọc được/không đọc được theo call site.
+"""
+import json
+import threading
+
+from src.agent.youtube_share_llm import invoke_llm
+
+
+class JsonObjectScanner:
+    """
+    Quét text (có thể theo từng đoạn stream) và trả về các object {...} cấp ngoài cùng
+    ngay khi đóng ngoặc. Ngoặc nằm trong chuỗi JSON không được tính.
+    """
+
+    def __init__(self):
+        self.buffer = []
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk):
+        objects = []
+        for ch in chunk:
+            if self.depth:
+                self.buffer.append(ch)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+            if ch == '"' and self.depth:
+                self.in_string = True
+            elif ch == "{":
+                if not self.depth:
+                    self.buffer = [ch]
+                self.depth += 1
+            elif ch == "}" and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    objects.append("".join(self.buffer))
+                    self.buffer = []
+        return objects
+
+
+def parse_json_object(text):
+    """
+    Object JSON (dict) đầu tiên đọc được trong text, None nếu không có
+    """
+    for candidate in JsonObjectScanner().feed(text or ""):
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            # Có thể là ngoặc trong văn bản bao quanh object thật
+            data = parse_json_object(candidate[1:-1])
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def message_text(message):
+    """
+    Nội dung text của AIMessage (content có thể là list các phần)
+    """
+    content = getattr(message, "content", message)
+    if isinstance(content, list):
+        return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    return str(content or "")
+
+
+def tool_call_args(message):
+    """
+    Args (dict) của tool call đầu tiên trong AIMessage, None nếu không có
+    """
+    for call in getattr(message, "tool_calls", None) or []:
+        args = call.get("args") if isinstance(call, dict) else getattr(call, "args", None)
+        if isinstance(args, str):
+            args = parse_json_object(args)
+        if isinstance(args, dict) and args:
+            return args
+    return None
+
+
+def to_dict(value):
+    # Bỏ trường None để call site dùng .get(key, mặc_định) như với JSON gốc
+    return value.model_dump(exclude_none=True) if hasattr(value, "model_dump") else dict(value)
+
+
+class ResponseParser:
+    """
+    Gọi LLM theo schema và thống kê kết quả đọc theo call site
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.structured = {}
+        self.stats = {}
+
+    def structured_client(self, llm, schema):
+        """
+        Client structured output cho llm/schema (None nếu provider không hỗ trợ)
+        """
+        key = (id(llm), schema)
+        if key not in self.structured:
+            try:
+                self.structured[key] = llm.with_structured_output(schema, include_raw=True)
+            except (NotImplementedError, AttributeError, TypeError, ValueError):
+                self.structured[key] = None
+        return self.structured[key]
+
+    def record(self, site, outcome):
+        with self.lock:
+            stats = self.stats.setdefault(site, {"structured": 0, "parsed": 0, "failed": 0})
+            stats[outcome] += 1
+
+    def invoke(self, site, llm, schema, payload, template=None):
+        """
+        Gọi LLM và trả về dict theo schema, None nếu không đọc được câu trả lời.
+        template: ChatPromptTemplate (payload là dict biến) hoặc None (payload là prompt).
+        """
+        structured = self.structured_client(llm, schema)
+        runnable = structured if structured is not None else llm
+        if template is not None:
+            runnable = template | runnable
+        result = invoke_llm(site, runnable, payload, client=llm)
+
+        if structured is not None:
+            if result.get("parsed") is not None:
+                self.record(site, "structured")
+                return to_dict(result["parsed"])
+            raw = result.get("raw")
+        else:
+            raw = result
+
+        # Payload structured nằm trong tool call (vd: Gemini), text chỉ là fallback
+        text = message_text(raw)
+        data = tool_call_args(raw)
+        if data is None:
+            data = parse_json_object(text)
+        if data is None:
+            self.record(site, "failed")
+            print(f"⚠️ [{site}] Không đọc được JSON từ câu trả lời LLM: {text[:200]!r}")
+            return None
+        self.record(site, "parsed")
+        try:
+            return to_dict(schema.model_validate(data))
+        except Exception:
+            # JSON đọc được nhưng lệch schema: giữ nguyên để call site tự kiểm tra
+            return data
+
+
+_parser = ResponseParser()
+
+
+def get_response_parser():
+    return _parser
+
+
+def invoke_structured(site, llm, schema, payload, template=None):
+    """
+    Gọi LLM qua registry và đọc câu trả lời theo schema (xem ResponseParser.invoke)
+    """
+    return _parser.invoke(site, llm, schema, payload, template=template)
+
+
+def print_parse_stats():
+    """
+    In số câu trả lời đọc bằng structured output / parse text / thất bại theo call site
+    """
+    for site, s in _parser.stats.items():
+        print(f"LLM JSON [{site}]: {s['structured']} structured / {s['parsed']} parse text / {s['failed']} lỗi")
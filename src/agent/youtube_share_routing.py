@@ -0,0 +1,99 @@
+"""
+Chặn tài nguyên không cần cho flow chia sẻ (opt-in, qua context.route).
+Trang edit của Studio tải thumbnail, preview video, font, beacon analytics và quảng cáo;
+flow chia sẻ chỉ cần script của app và các RPC youtubei. Bật bằng
+SHARE_BLOCK_RESOURCES=1 hoặc --block-resources, phù hợp cho batch headless trên VM nhỏ.
+"""
+import os
+
+BLOCK_RESOURCES = os.getenv("SHARE_BLOCK_RESOURCES", "") == "1"
+
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# Endpoint telemetry/quảng cáo (không ảnh hưởng đến RPC của Studio)
+TELEMETRY_PATTERNS = [
+    "/youtubei/v1/log_event",
+    "/api/stats/",
+    "/ptracking",
+    "/generate_204",
+    "/csi_204",
+    "play.google.com/log",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+]
+
+# Preview video tải qua xhr/fetch nên không có resource type "media"
+MEDIA_PATTERNS = [
+    "googlevideo.com/videoplayback",
+]
+
+# Kích thước ước tính của mỗi request bị chặn (bytes), vì request bị hủy trước khi tải
+ESTIMATED_BYTES = {
+    "image": 25_000,
+    "media": 500_000,
+    "font": 40_000,
+    "telemetry": 1_000,
+}
+
+
+def classify_request(url, resource_type):
+    """
+    Loại request cần chặn ("image", "media", "font", "telemetry") hoặc None nếu cho qua
+    """
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return resource_type
+    if any(p in url for p in MEDIA_PATTERNS):
+        return "media"
+    if any(p in url for p in TELEMETRY_PATTERNS):
+        return "telemetry"
+    return None
+
+
+class ResourceBlocker:
+    """
+    Chặn request theo classify_request và đếm số request/bytes tiết kiệm được
+    """
+
+    def __init__(self):
+        self.blocked = {}
+        self.allowed = 0
+
+    def handle(self, route):
+        request = route.request
+        kind = classify_request(request.url, request.resource_type)
+        if kind is None:
+            self.allowed += 1
+            route.continue_()
+            return
+        self.blocked[kind] = self.blocked.get(kind, 0) + 1
+        route.abort("blockedbyclient")
+
+    def attach(self, context):
+        context.route("**/*", self.handle)
+        print("🚫 Chặn ảnh, media, font và telemetry khi tải Studio")
+        return self
+
+    def snapshot(self):
+        return {"blocked": dict(self.blocked), "allowed": self.allowed}
+
+    @staticmethod
+    def saved_since(before, after):
+        """
+        Số request và bytes (ước tính) tiết kiệm được giữa hai snapshot
+        """
+        blocked = {k: v - before["blocked"].get(k, 0) for k, v in after["blocked"].items()}
+        blocked = {k: v for k, v in blocked.items() if v}
+        return {
+            "requests": sum(blocked.values()),
+            "bytes": sum(ESTIMATED_BYTES[k] * v for k, v in blocked.items()),
+            "by_type": blocked,
+            "allowed": after["allowed"] - before["allowed"]
+        }
+
+
+def format_saved(saved):
+    by_type = ", ".join(f"{k}={v}" for k, v in sorted(saved["by_type"].items()))
+    return f"chặn {saved['requests']} request (~{saved['bytes'] / 1024:.0f} KB){' [' + by_type + ']' if by_type else ''}"
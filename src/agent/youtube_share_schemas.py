@@ -0,0 +1,73 @@
+"""
+Schema Pydantic cho câu trả lời LLM của share agent.
+Dùng cho structured output của provider (with_structured_output) và để kiểm tra
+JSON đọc được từ text khi provider không hỗ trợ (xem youtube_share_response).
+"""
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ShareInfo(BaseModel):
+    """Video và email cần chia sẻ trong lệnh của người dùng"""
+    video_ids: List[str] = Field(default_factory=list, description="ID 11 ký tự của các video YouTube")
+    emails: List[str] = Field(default_factory=list, description="Email được chia sẻ")
+    # Định dạng cũ một video
+    video_id: Optional[str] = None
+
+
+class AIAction(BaseModel):
+    """Thao tác tiếp theo trên trang Studio"""
+    action: str = Field(description="click_button | fill_input | wait | done | error")
+    target: Optional[str] = Field(default=None, description="Mô tả element cần tương tác")
+    value: Optional[str] = Field(default=None, description="Giá trị cần nhập (fill_input)")
+    reason: Optional[str] = None
+    message: Optional[str] = Field(default=None, description="Mô tả lỗi (error)")
+
+
+class ElementInfo(BaseModel):
+    text: Optional[str] = None
+    aria_label: Optional[str] = None
+    tag_name: Optional[str] = None
+    class_name: Optional[str] = None
+    id: Optional[str] = None
+    selector: Optional[str] = Field(default=None, description="Selector Playwright để tìm element")
+
+
+class FoundElement(BaseModel):
+    """Kết quả tìm element theo mô tả"""
+    found: bool
+    element_info: Optional[ElementInfo] = None
+    reason: Optional[str] = None
+
+
+class PopupDone(BaseModel):
+    """Popup đang mở và nút Xong trong popup"""
+    found_popup: bool
+    popup_selector: Optional[str] = None
+    found_done_button: bool = False
+    done_button_selector: Optional[str] = None
+    reason: Optional[str] = None
+
+
+class InputInfo(BaseModel):
+    selector: Optional[str] = Field(default=None, description="Selector của ô nhập")
+    type: Optional[str] = None
+    placeholder: Optional[str] = None
+    reason: Optional[str] = None
+
+
+class FoundInput(BaseModel):
+    """Ô nhập email tìm được"""
+    found: bool
+    input_info: Optional[InputInfo] = None
+
+
+class SharePlan(BaseModel):
+    """Selector Playwright cho tất cả các bước chia sẻ (planning mode)"""
+    visibility: Optional[str] = Field(default=None, description="Nút Chế độ hiển thị/Visibility trên trang edit")
+    share: Optional[str] = Field(default=None, description="Nút Chia sẻ riêng tư/Share privately trong dialog chế độ hiển thị")
+    email: Optional[str] = Field(default=None, description="Ô nhập email trong dialog chia sẻ")
+    popup_done: Optional[str] = Field(default=None, description="Nút Xong/Done của dialog chế độ hiển thị")
+    save: Optional[str] = Field(default=None, description="Nút Lưu/Save trên trang edit")
+    reason: Optional[str] = None
@@ -0,0 +1,185 @@
+"""
+Cache selector đã học cho các element của YouTube Studio.
+Key: (bước, ngôn ngữ UI, fingerprint DOM). Selector nào click thành công
+được ghi lại và thử trước ở lần sau; selector thất bại bị loại khỏi cache.
+Chỉ khi cache miss mới cần hỏi LLM.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from src.agent.youtube_share_waits import DIALOG_SELECTOR
+
+SELECTOR_CACHE_PATH = os.getenv("SELECTOR_CACHE_PATH", "./tmp/selector_cache.json")
+
+# Số selector tối đa lưu cho mỗi key
+MAX_SELECTORS_PER_KEY = 3
+# Thời gian chờ selector cache hiển thị (dialog có thể đang chạy animation mở)
+CACHED_SELECTOR_TIMEOUT_MS = 3000
+
+# Cấu trúc DOM của vùng đang thao tác (dialog trên cùng hoặc body):
+# chỉ dùng tên custom element nên không phụ thuộc nội dung từng video
+DOM_STRUCTURE_JS = """
+    (dialogSelector) => {
+        const isVisible = (el) => el.offsetParent !== null;
+        const dialogs = Array.from(document.querySelectorAll(dialogSelector)).filter(isVisible);
+        const root = dialogs.length ? dialogs[dialogs.length - 1] : document.body;
+        const tags = new Set();
+        root.querySelectorAll('*').forEach(el => {
+            const tag = el.tagName.toLowerCase();
+            if (tag.includes('-')) tags.add(tag);
+        });
+        return {
+            lang: document.documentElement.lang || '',
+            structure: dialogs.length + ':' + Array.from(tags).sort().join(',')
+        };
+    }
+"""
+
+
+class SelectorCache:
+    """
+    Cache selector lưu trên đĩa (JSON), kèm bộ đếm hit/miss
+    """
+
+    def __init__(self, path=SELECTOR_CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.load()
+
+    @staticmethod
+    def make_key(step, lang, fingerprint):
+        return f"{step}|{lang}|{fingerprint}"
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Không đọc được selector cache {self.path}: {e}")
+            self.entries = {}
+
+    def save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # File tạm riêng cho mỗi lần ghi: nhiều process (shard) có thể dùng chung một cache
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory or ".", delete=False,
+                                         prefix=os.path.basename(self.path) + ".", suffix=".tmp") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(f.name, self.path)
+
+    def get(self, key):
+        """
+        Lấy danh sách selector đã học cho key (selector tốt nhất đứng đầu)
+        """
+        entry = self.entries.get(key)
+        if entry and entry.get("selectors"):
+            return list(entry["selectors"])
+        return []
+
+    def record_hit(self):
+        self.hits += 1
+
+    def record_miss(self):
+        self.misses += 1
+
+    def record_success(self, key, selector):
+        """
+        Ghi lại selector vừa click thành công, đưa lên đầu danh sách
+        """
+        entry = self.entries.setdefault(key, {"selectors": [], "successes": 0})
+        selectors = [s for s in entry["selectors"] if s != selector]
+        entry["selectors"] = ([selector] + selectors)[:MAX_SELECTORS_PER_KEY]
+        entry["successes"] = entry.get("successes", 0) + 1
+        entry["updated_at"] = time.time()
+        self.save()
+
+    def invalidate(self, key, selector):
+        """
+        Loại selector thất bại khỏi cache
+        """
+        entry = self.entries.get(key)
+        if not entry or selector not in entry.get("selectors", []):
+            return
+        entry["selectors"].remove(selector)
+        if not entry["selectors"]:
+            del self.entries[key]
+        self.invalidations += 1
+        self.save()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / total if total else 0.0,
+            "keys": len(self.entries)
+        }
+
+
+_selector_cache = None
+
+
+def get_selector_cache():
+    """
+    Cache dùng chung cho toàn bộ process (tạo khi dùng lần đầu)
+    """
+    global _selector_cache
+    if _selector_cache is None:
+        _selector_cache = SelectorCache()
+    return _selector_cache
+
+
+def get_cache_key(page, step):
+    """
+    Tạo key cache cho bước hiện tại dựa trên ngôn ngữ UI và cấu trúc DOM
+    """
+    try:
+        info = page.evaluate(DOM_STRUCTURE_JS, DIALOG_SELECTOR)
+    except Exception:
+        info = {"lang": "", "structure": ""}
+    fingerprint = hashlib.sha1(info["structure"].encode("utf-8")).hexdigest()[:12]
+    return SelectorCache.make_key(step, info["lang"], fingerprint)
+
+
+def is_selector_miss(error):
+    """
+    Lỗi cho thấy selector không còn đúng: hết timeout chờ element hoặc selector không hợp lệ
+    (lỗi khác như page đã đóng thì không xóa selector)
+    """
+    return type(error).__name__ == "TimeoutError" or "selector" in str(error).lower()
+
+
+def click_cached_selector(page, cache, key, timeout=None):
+    """
+    Thử click các selector đã học cho key: chờ element hiển thị (tối đa timeout ms) rồi click.
+    Selector hết timeout hoặc không hợp lệ bị xóa khỏi cache.
+    Trả về True nếu click thành công (cache hit).
+    """
+    timeout = timeout or CACHED_SELECTOR_TIMEOUT_MS
+    for selector in cache.get(key):
+        try:
+            element = page.locator(selector).first
+            element.wait_for(state="visible", timeout=timeout)
+            element.click(timeout=timeout)
+            cache.record_hit()
+            print(f"⚡ Đã click theo selector cache: {selector}")
+            return True
+        except Exception as e:
+            print(f"❌ Selector cache thất bại: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+            if is_selector_miss(e):
+                print(f"🗑️ Xóa selector cache không còn đúng: {selector}")
+                cache.invalidate(key, selector)
+    cache.record_miss()
+    return False
@@ -0,0 +1,208 @@
+"""
+Chạy manifest trên nhiều kênh: mỗi profile Chrome (một kênh đã đăng nhập) có một
+worker process riêng, vì Chrome chỉ cho một process dùng một profile.
+Coordinator chia video theo kênh sở hữu (cột channel của manifest), khởi động
+worker cho từng profile và gom kết quả/tiến độ qua một queue chung.
+
+File profiles (JSON): {"kenh-a": "D:/profiles/kenh-a", "kenh-b": "D:/profiles/kenh-b"}
+"""
+import json
+import multiprocessing
+import os
+import queue
+import time
+
+# Kênh mặc định cho video không có cột channel (chỉ dùng khi có đúng một profile)
+DEFAULT_CHANNEL = ""
+
+
+def load_profiles(path):
+    """
+    Đọc mapping kênh → thư mục profile
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        profiles = json.load(f)
+    if not isinstance(profiles, dict) or not profiles:
+        raise ValueError(f"File profiles {path} phải là object JSON {{kênh: đường_dẫn_profile}}")
+    return profiles
+
+
+def route_videos(videos, channels, profiles):
+    """
+    Chia video theo profile sở hữu.
+    videos: {video_id: [email]}, channels: {video_id: kênh}, profiles: {kênh: profile}.
+    Các kênh dùng chung một profile được gộp vào một shard (một profile chỉ một process).
+    Trả về (shards {profile: {"channels": [...], "videos": {video_id: [email]}}}, video không route được).
+    """
+    shards = {}
+    unrouted = []
+    only_channel = next(iter(profiles)) if len(profiles) == 1 else None
+    for video_id, emails in videos.items():
+        channel = channels.get(video_id, DEFAULT_CHANNEL) or only_channel
+        profile = profiles.get(channel)
+        if not profile:
+            unrouted.append(video_id)
+            continue
+        shard = shards.setdefault(os.path.normpath(profile), {"channels": [], "videos": {}})
+        if channel not in shard["channels"]:
+            shard["channels"].append(channel)
+        shard["videos"][video_id] = emails
+    return shards, unrouted
+
+
+def run_profile_worker(name, profile_path, videos, job_id, page_pool_size, block_resources, prefetch, events):
+    """
+    Worker process: chạy batch cho các video của một profile, gửi tiến độ về coordinator.
+    Journal riêng cho từng shard ({job_id}-{name}) nên chạy lại cùng job_id sẽ resume.
+    """
+    from src.agent.youtube_share_agent import share_videos_batch
+    from src.agent.youtube_share_journal import ShareJournal
+
+    shard_job_id = f"{job_id}-{name}"
+    try:
+        try:
+            journal = ShareJournal.open(shard_job_id)
+        except ValueError:
+            journal = ShareJournal.create(list(videos), videos, job_id=shard_job_id)
+        events.put({"type": "start", "shard": name, "pid": os.getpid(), "videos": len(videos)})
+        share_videos_batch(
+            list(videos),
+            videos,
+            page_pool_size=page_pool_size,
+            journal=journal,
+            block_resources=block_resources,
+            prefetch=prefetch,
+            profile_path=profile_path,
+            on_result=lambda result: events.put({"type": "video", "shard": name, **result})
+        )
+        events.put({"type": "done", "shard": name})
+    except Exception as e:
+        events.put({"type": "done", "shard": name, "error": str(e)})
+
+
+def shard_name(shard, index):
+    """
+    Tên shard (dùng trong job id và đường dẫn journal): tên các kênh đã bỏ ký tự không an toàn
+    """
+    from src.agent.youtube_share_journal import job_id_slug
+
+    channels = [c for c in shard["channels"] if c]
+    return job_id_slug("+".join(channels)) if channels else f"shard{index}"
+
+
+def drain_events(events, timeout=1):
+    """
+    Đợi tối đa timeout giây cho event đầu tiên rồi lấy hết các event đang có trong queue
+    """
+    drained = []
+    try:
+        drained.append(events.get(timeout=timeout))
+        while True:
+            drained.append(events.get_nowait())
+    except queue.Empty:
+        pass
+    return drained
+
+
+def handle_event(workers, running, event):
+    worker = workers[event["shard"]]
+    if event["type"] == "video":
+        worker["results"].append(event)
+        done = sum(len(w["results"]) for w in workers.values())
+        total = sum(w["total"] for w in workers.values())
+        status = "✅" if event["success"] else "❌"
+        print(f"📦 [{event['shard']}] {status} {event['video_id']} ({len(worker['results'])}/{worker['total']}) | tổng {done}/{total}")
+    elif event["type"] == "done":
+        worker["error"] = event.get("error")
+        running.discard(event["shard"])
+
+
+def run_sharded(videos, channels, profiles, job_id=None, page_pool_size=1, block_resources=False, prefetch=False):
+    """
+    Khởi động một worker process cho mỗi profile và gom kết quả
+    """
+    shards, unrouted = route_videos(videos, channels, profiles)
+    if unrouted:
+        print(f"⚠️ {len(unrouted)} video không có profile cho kênh sở hữu: {', '.join(unrouted[:10])}")
+    if not shards:
+        print("Không có video nào để chạy")
+        return {}
+
+    job_id = job_id or time.strftime("%Y%m%d-%H%M%S")
+    ctx = multiprocessing.get_context("spawn")
+    events = ctx.Queue()
+    workers = {}
+    for index, (profile, shard) in enumerate(shards.items(), start=1):
+        name = shard_name(shard, index)
+        if name in workers:
+            name = f"{name}-{index}"
+        process = ctx.Process(
+            target=run_profile_worker,
+            args=(name, profile, shard["videos"], job_id, page_pool_size, block_resources, prefetch, events),
+            name=f"share-{name}"
+        )
+        process.start()
+        workers[name] = {"process": process, "total": len(shard["videos"]), "results": [], "error": None}
+        print(f"🚀 Worker {name} (pid {process.pid}): {len(shard['videos'])} video, profile {profile}")
+
+    start = time.perf_counter()
+    running = set(workers)
+    while running:
+        for event in drain_events(events):
+            handle_event(workers, running, event)
+        # Worker chết mà không gửi "done" (vd: bị kill): kiểm tra mỗi vòng.
+        # Đọc nốt event đã gửi trước khi thoát để không coi nhầm worker vừa xong là chết.
+        exited = [name for name in running if workers[name]["process"].exitcode is not None]
+        if exited:
+            for event in drain_events(events, timeout=0):
+                handle_event(workers, running, event)
+        for name in exited:
+            if name in running:
+                workers[name]["error"] = workers[name]["error"] or f"exit code {workers[name]['process'].exitcode}"
+                running.discard(name)
+
+    for worker in workers.values():
+        worker["process"].join()
+    elapsed = time.perf_counter() - start
+    print_shard_report(workers, elapsed, job_id)
+    return {name: w["results"] for name, w in workers.items()}
+
+
+def print_shard_report(workers, elapsed, job_id):
+    """
+    Bảng tổng hợp theo từng kênh và thông lượng chung
+    """
+    print(f"\n{'='*60}")
+    print(f"📊 KẾT QUẢ THEO KÊNH (job {job_id})")
+    print(f"{'='*60}")
+    print(f"{'kênh':<20} {'thành công':>12} {'thời gian':>10} {'video/phút':>11}")
+    total_done = 0
+    for name, worker in workers.items():
+        results = worker["results"]
+        succeeded = sum(1 for r in results if r["success"])
+        busy = sum(r["duration"] for r in results)
+        rate = len(results) / busy * 60 if busy else 0.0
+        total_done += len(results)
+        print(f"{name:<20} {succeeded:>5}/{worker['total']:<6} {busy:>9.1f}s {rate:>11.1f}")
+        if worker["error"]:
+            print(f"   ❌ Worker lỗi: {worker['error']}")
+    if elapsed:
+        print(f"Tổng: {total_done} video trong {elapsed:.1f}s = {total_done / elapsed * 60:.1f} video/phút")
+    print(f"Chạy lại cùng --job-id {job_id} để resume các video chưa xong")
+
+
+def share_manifest_sharded(manifest_path, profiles_path, job_id=None, page_pool_size=1, block_resources=False,
+                           prefetch=False):
+    """
+    Đọc manifest + file profiles và chạy sharded theo kênh
+    """
+    from src.agent.youtube_share_manifest import ShareManifest
+
+    manifest = ShareManifest.load(manifest_path)
+    manifest.print_summary()
+    profiles = load_profiles(profiles_path)
+    missing = [p for p in profiles.values() if not os.path.exists(p)]
+    if missing:
+        print(f"Không tìm thấy profile: {', '.join(missing)}")
+        return
+    return run_sharded(manifest.videos, manifest.channels, profiles, job_id, page_pool_size, block_resources, prefetch)
@@ -0,0 +1,212 @@
+"""
+Snapshot DOM một lượt cho share agent.
+Thay cho nhiều lần page.evaluate riêng lẻ (text, clickable, input): chỉ đi qua
+DOM một lần, bỏ trùng bằng Set, giới hạn kích thước và gán id ổn định cho
+từng element để click lại mà không cần quét DOM lần nữa.
+"""
+from src.agent.youtube_share_trace import span
+
+INTERACTIVE_SELECTOR = ", ".join([
+    'button', '[role="button"]', 'ytcp-button',
+    'input[type="button"]', 'input[type="submit"]',
+    'div[onclick]', 'span[onclick]', 'a[onclick]',
+    'div[tabindex]', 'span[tabindex]', 'a[tabindex]',
+    '[role="radio"]', '[role="menuitem"]', '[role="option"]',
+    '[data-testid*="visibility"]', '[data-testid*="share"]',
+    '[aria-label*="visibility"]', '[aria-label*="share"]',
+    '.ytcp-dropdown-trigger',
+])
+
+# Giới hạn mặc định để snapshot luôn nhỏ
+MAX_ELEMENTS = 150
+MAX_TEXTS = 300
+MAX_TEXT_CHARS = 8000
+
+SNAPSHOT_JS = """
+    ({maxElements, maxTexts, maxTextChars, interactiveSelector}) => {
+        window.__ytShareNextId = window.__ytShareNextId || 1;
+        const isVisible = (el) => el.offsetParent !== null;
+        const clip = (s, n) => (s || '').replace(/\\s+/g, ' ').trim().slice(0, n);
+        const quote = (s) => s.replace(/"/g, '\\\\"');
+        const stableSelector = (el, text, ariaLabel) => {
+            const tag = el.tagName.toLowerCase();
+            if (el.id) return tag + '#' + CSS.escape(el.id);
+            if (ariaLabel) return tag + '[aria-label="' + quote(ariaLabel) + '"]';
+            if (text && text.length <= 40) return tag + ':has-text("' + quote(text) + '")';
+            return null;
+        };
+        const sid = (el) => {
+            if (!el.dataset.ytShareId) el.dataset.ytShareId = String(window.__ytShareNextId++);
+            return el.dataset.ytShareId;
+        };
+
+        const texts = [];
+        const seenTexts = new Set();
+        let textChars = 0;
+        const elements = [];
+        const seenElements = new Set();
+        const inputs = [];
+        let droppedElements = 0;
+
+        const walker = document.createTreeWalker(
+            document.body,
+            NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT,
+            {
+                acceptNode: (n) => (n.nodeType === 1 && ['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE'].includes(n.tagName))
+                    ? NodeFilter.FILTER_REJECT
+                    : NodeFilter.FILTER_ACCEPT
+            }
+        );
+        let node;
+        while ((node = walker.nextNode())) {
+            if (node.nodeType === 3) {
+                if (texts.length >= maxTexts || textChars >= maxTextChars) continue;
+                const text = clip(node.textContent, 200);
+                if (!text || seenTexts.has(text)) continue;
+                const parent = node.parentElement;
+                if (!parent || !isVisible(parent)) continue;
+                seenTexts.add(text);
+                texts.push(text);
+                textChars += text.length;
+                continue;
+            }
+
+            const el = node;
+            if (el.tagName === 'INPUT' || el.tagName === 'TEXTAREA') {
+                if (isVisible(el) && !['button', 'submit', 'hidden'].includes(el.type)) {
+                    inputs.push({
+                        sid: sid(el),
+                        type: el.type,
+                        placeholder: el.placeholder || '',
+                        value: clip(el.value, 200),
+                        ariaLabel: el.getAttribute('aria-label') || '',
+                        className: clip(el.getAttribute('class'), 80),
+                        id: el.id,
+                        visible: true
+                    });
+                }
+                continue;
+            }
+            if (!el.matches(interactiveSelector) || !isVisible(el)) continue;
+
+            const text = clip(el.textContent, 100);
+            const ariaLabel = el.getAttribute('aria-label') || '';
+            const title = el.getAttribute('title') || '';
+            const dataTestId = el.getAttribute('data-testid') || '';
+            if (!text && !ariaLabel && !title && !dataTestId) continue;
+
+            const key = el.tagName + '|' + text + '|' + ariaLabel;
+            if (seenElements.has(key)) continue;
+            seenElements.add(key);
+            if (elements.length >= maxElements) {
+                droppedElements++;
+                continue;
+            }
+            elements.push({
+                sid: sid(el),
+                text: text,
+                ariaLabel: ariaLabel,
+                title: title,
+                dataTestId: dataTestId,
+                tagName: el.tagName,
+                role: el.getAttribute('role') || '',
+                className: clip(el.getAttribute('class'), 80),
+                id: el.id,
+                disabled: !!(el.disabled || el.getAttribute('aria-disabled') === 'true'),
+                inDialog: !!el.closest('tp-yt-paper-dialog, ytcp-dialog, [role="dialog"]'),
+                selector: stableSelector(el, text, ariaLabel),
+                visible: true
+            });
+        }
+        return {texts, elements, inputs, droppedElements};
+    }
+"""
+
+
+def take_page_snapshot(page, max_elements=MAX_ELEMENTS, max_texts=MAX_TEXTS, max_text_chars=MAX_TEXT_CHARS):
+    """
+    Lấy snapshot trang bằng một lần đi qua DOM
+    """
+    with span("snapshot", "dom") as scan_span:
+        snapshot = page.evaluate(SNAPSHOT_JS, {
+            "maxElements": max_elements,
+            "maxTexts": max_texts,
+            "maxTextChars": max_text_chars,
+            "interactiveSelector": INTERACTIVE_SELECTOR
+        })
+        scan_span["args"]["elements"] = len(snapshot["elements"])
+    return snapshot
+
+
+def snapshot_to_page_info(snapshot):
+    """
+    Chuyển snapshot sang format page_info (page_text, clickable_elements, inputs)
+    """
+    return {
+        "page_text": " | ".join(snapshot["texts"]),
+        "clickable_elements": snapshot["elements"],
+        "inputs": snapshot["inputs"],
+        "snapshot": snapshot
+    }
+
+
+def score_element(element, keywords):
+    """
+    Tính điểm phù hợp của element với từ khóa (cùng trọng số với logic JS cũ)
+    """
+    text = element.get("text", "").lower()
+    aria_label = element.get("ariaLabel", "").lower()
+    title = element.get("title", "").lower()
+    class_name = element.get("className", "").lower()
+    element_id = (element.get("id") or "").lower()
+
+    score = 0
+    for keyword in keywords:
+        if text == keyword:
+            score += 5
+        if keyword in text:
+            score += 3
+        if keyword in aria_label:
+            score += 2
+        if keyword in title:
+            score += 2
+        if keyword in class_name:
+            score += 1
+        if keyword in element_id:
+            score += 1
+    if score and (element.get("tagName") == "BUTTON" or element.get("role") == "button"):
+        score += 1
+    return score
+
+
+def rank_elements(elements, keywords):
+    """
+    Sắp xếp element theo điểm (chỉ giữ element có điểm > 0)
+    """
+    keywords = [k.lower() for k in keywords]
+    scored = [(score_element(el, keywords), el) for el in elements]
+    scored = [item for item in scored if item[0] > 0]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored
+
+
+def snapshot_locator(page, element):
+    """
+    Locator của element trong snapshot theo id ổn định đã gán
+    (element từ cây accessibility: theo selector role)
+    """
+    if element.get("source") == "ax":
+        return page.locator(element["selector"]).first
+    return page.locator(f'[data-yt-share-id="{element["sid"]}"]').first
+
+
+def click_snapshot_element(page, element, timeout=2000):
+    """
+    Click element trong snapshot, trả về True nếu thành công
+    """
+    try:
+        snapshot_locator(page, element).click(timeout=timeout)
+        return True
+    except Exception as e:
+        print(f"❌ Không click được element snapshot '{element.get('text', '')}': {str(e).splitlines()[0]}")
+        return False
@@ -0,0 +1,216 @@
+"""
+Step engine khai báo cho flow chia sẻ video.
+Mỗi bước có danh sách strategy theo thứ tự ưu tiên (selector cache,
+locator role/text, chấm điểm JS, LLM), mỗi strategy có timeout riêng.
+Engine dừng ở strategy thành công đầu tiên và ghi lại strategy đã thắng,
+nên một lần chạy bình thường không cần gọi LLM.
+"""
+import re
+import time
+
+from src.agent.youtube_share_waits import DIALOG_SELECTOR
+from src.agent.youtube_share_selector_cache import get_selector_cache, get_cache_key, click_cached_selector
+from src.agent.youtube_share_snapshot import rank_elements, click_snapshot_element
+from src.agent.youtube_share_axtree import take_snapshot, invalidate_snapshot
+from src.agent.youtube_share_trace import span
+
+VISIBLE_DIALOG_SELECTOR = ", ".join(s.strip() + ":visible" for s in DIALOG_SELECTOR.split(","))
+
+# Timeout mặc định cho mỗi strategy (ms)
+DEFAULT_STRATEGY_TIMEOUT_MS = 3000
+
+
+class Strategy:
+    """
+    Một cách thực hiện bước: run(page, timeout_ms) trả về True nếu thành công
+    (hoặc dict kết quả, được lưu vào result["data"] của bước).
+    uses_llm=True để thống kê số lần gọi LLM.
+    llm_calls(): số lần gọi LLM của lần chạy vừa rồi, cho strategy chỉ gọi LLM khi cần (planning).
+    """
+
+    def __init__(self, name, run, timeout_ms=DEFAULT_STRATEGY_TIMEOUT_MS, uses_llm=False, llm_calls=None):
+        self.name = name
+        self.run = run
+        self.timeout_ms = timeout_ms
+        self.uses_llm = uses_llm
+        self.llm_calls = llm_calls
+
+
+class ShareStep:
+    """
+    Một bước của flow chia sẻ.
+    - strategies: thử lần lượt, dừng ở strategy thành công đầu tiên
+    - cache_step: tên bước dùng làm key của selector cache (None nếu không cache)
+    - before(page): chạy trước khi thử (vd: ghi nhận số dialog đang mở)
+    - wrap(page, attempt): bọc cả lần thử (vd: chờ RPC lưu), trả về kết quả attempt()
+    - after(page): chờ UI sẵn sàng cho bước tiếp theo
+    - finish_if(result): True nếu flow đã xong sau bước này (bỏ qua các bước còn lại)
+    """
+
+    def __init__(self, name, strategies, cache_step=None, before=None, wrap=None, after=None, finish_if=None):
+        self.name = name
+        self.strategies = strategies
+        self.cache_step = cache_step
+        self.before = before
+        self.wrap = wrap
+        self.after = after
+        self.finish_if = finish_if
+
+
+def run_step(page, step):
+    """
+    Chạy một bước, trả về kết quả gồm strategy thắng và thời gian từng lần thử
+    """
+    result = {"step": step.name, "success": False, "strategy": None, "attempts": [], "llm_calls": 0, "data": None, "finished": False}
+    start = time.perf_counter()
+
+    def attempt():
+        strategies = list(step.strategies)
+        if step.cache_step:
+            strategies.insert(0, cached_selector_strategy(step.cache_step))
+        for strategy in strategies:
+            attempt_start = time.perf_counter()
+            with span(strategy.name, "strategy", step=step.name, uses_llm=strategy.uses_llm) as attempt_span:
+                try:
+                    value = strategy.run(page, strategy.timeout_ms)
+                    success = bool(value)
+                    error = None
+                    if isinstance(value, dict):
+                        result["data"] = value
+                except Exception as e:
+                    success = False
+                    error = str(e).splitlines()[0] if str(e) else type(e).__name__
+                attempt_span["args"].update(success=success, error=error)
+            elapsed_ms = (time.perf_counter() - attempt_start) * 1000
+            if strategy.uses_llm:
+                result["llm_calls"] += 1
+            elif strategy.llm_calls:
+                result["llm_calls"] += strategy.llm_calls()
+            result["attempts"].append({
+                "strategy": strategy.name,
+                "success": success,
+                "elapsed_ms": elapsed_ms,
+                "error": error
+            })
+            if success:
+                result["strategy"] = strategy.name
+                return True
+            print(f"   ↪️ [{step.name}] {strategy.name} thất bại ({elapsed_ms:.0f}ms){': ' + error if error else ''}")
+        return False
+
+    with span(step.name, "step") as step_span:
+        if step.before:
+            step.before(page)
+        if step.wrap:
+            result["success"] = step.wrap(page, attempt)
+        else:
+            result["success"] = attempt()
+
+        if result["success"] and step.finish_if:
+            result["finished"] = bool(step.finish_if(result))
+        if result["success"] and step.after and not result["finished"]:
+            step.after(page)
+        step_span["args"].update(
+            success=result["success"],
+            strategy=result["strategy"],
+            retries=max(0, len(result["attempts"]) - 1),
+            llm_calls=result["llm_calls"]
+        )
+
+    result["duration_ms"] = (time.perf_counter() - start) * 1000
+    status = "✅" if result["success"] else "❌"
+    print(f"{status} [{step.name}] strategy: {result['strategy']} ({result['duration_ms']:.0f}ms)")
+    return result
+
+
+def run_steps(page, steps, on_step=None):
+    """
+    Chạy lần lượt các bước, dừng khi một bước thất bại hoặc flow đã xong sớm.
+    on_step(result) được gọi sau mỗi bước (vd: ghi journal).
+    """
+    results = []
+    for step in steps:
+        result = run_step(page, step)
+        results.append(result)
+        if on_step:
+            on_step(result)
+        if not result["success"] or result["finished"]:
+            break
+    return results
+
+
+def print_step_summary(results):
+    """
+    In strategy thắng của từng bước và tổng số lần gọi LLM
+    """
+    llm_calls = sum(r["llm_calls"] for r in results)
+    winners = ", ".join(f"{r['step']}={r['strategy']}" for r in results)
+    print(f"🏁 Strategy: {winners} | LLM calls: {llm_calls}")
+
+
+def dialog_scope(page, in_dialog):
+    """
+    Vùng tìm kiếm: dialog mở sau cùng hoặc toàn trang
+    """
+    if in_dialog:
+        return page.locator(VISIBLE_DIALOG_SELECTOR).last
+    return page
+
+
+def cached_selector_strategy(cache_step):
+    """
+    Strategy: click selector đã học trong cache
+    """
+    def run(page, timeout_ms):
+        cache = get_selector_cache()
+        return click_cached_selector(page, cache, get_cache_key(page, cache_step), timeout=timeout_ms)
+    return Strategy("cached_selector", run)
+
+
+def role_strategy(names, in_dialog=False, role="button", exact=True, timeout_ms=DEFAULT_STRATEGY_TIMEOUT_MS):
+    """
+    Strategy: locator theo role + accessible name (exact: regex khớp nguyên tên).
+    Playwright tự chờ element visible và enabled trong timeout.
+    """
+    alternatives = "|".join(re.escape(n) for n in names)
+    if exact:
+        pattern = re.compile(r"^\s*(" + alternatives + r")\s*$", re.IGNORECASE)
+    else:
+        pattern = re.compile(alternatives, re.IGNORECASE)
+
+    def run(page, timeout):
+        locator = dialog_scope(page, in_dialog).get_by_role(role, name=pattern).first
+        locator.click(timeout=timeout)
+        return True
+    return Strategy("role_locator", run, timeout_ms=timeout_ms)
+
+
+def snapshot_strategy(keywords, in_dialog=False, cache_step=None):
+    """
+    Strategy: chấm điểm element trong snapshot theo từ khóa rồi click.
+    Dùng snapshot accessibility đã cache (chỉ quét DOM khi không có CDP).
+    """
+    def run(page, timeout):
+        elements = take_snapshot(page)["elements"]
+        if in_dialog:
+            elements = [el for el in elements if el.get("inDialog")]
+        # Key cache phải lấy trước khi click (DOM thay đổi sau khi click)
+        cache_key = get_cache_key(page, cache_step) if cache_step else None
+        for _, element in rank_elements(elements, keywords)[:3]:
+            if element.get("disabled"):
+                continue
+            if click_snapshot_element(page, element, timeout=timeout):
+                # Click có thể đổi trang mà không mở/đóng dialog: snapshot cũ không còn đúng
+                invalidate_snapshot(page)
+                if cache_key and element.get("selector"):
+                    get_selector_cache().record_success(cache_key, element["selector"])
+                return True
+        return False
+    return Strategy("snapshot_scoring", run)
+
+
+def function_strategy(name, func, timeout_ms=DEFAULT_STRATEGY_TIMEOUT_MS, uses_llm=False):
+    """
+    Strategy từ một hàm có sẵn func(page) -> bool
+    """
+    return Strategy(name, lambda page, timeout: func(page), timeout_ms=timeout_ms, uses_llm=uses_llm)
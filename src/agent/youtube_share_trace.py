@@ -0,0 +1,181 @@
+"""
+Span có cấu trúc cho flow chia sẻ: mỗi video, bước, lần thử strategy, lần gọi LLM,
+lần chờ UI và lần quét DOM được ghi lại với thời điểm bắt đầu/kết thúc và thuộc tính.
+Cuối batch tổng hợp p50/p95 theo bước/strategy, tỉ lệ thời gian dành cho LLM,
+và xuất ra JSON cũng như file trace-event mở được bằng chrome://tracing hoặc Perfetto.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+SAVE_TRACE_PATH = os.getenv("SAVE_TRACE_PATH", "./tmp/traces")
+
+
+def percentile(values, p):
+    """
+    Percentile theo nearest-rank (values không cần sắp xếp sẵn)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def duration_stats(durations):
+    return {
+        "count": len(durations),
+        "total_ms": sum(durations),
+        "p50_ms": percentile(durations, 50),
+        "p95_ms": percentile(durations, 95)
+    }
+
+
+class Tracer:
+    """
+    Bộ ghi span trong bộ nhớ (mỗi span: name, cat, start_ms, dur_ms, tid, args)
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.origin = time.perf_counter()
+            self.spans = []
+
+    def now_ms(self):
+        return (time.perf_counter() - self.origin) * 1000
+
+    @contextmanager
+    def span(self, name, cat, **args):
+        """
+        Ghi một span; thuộc tính có thể bổ sung qua span["args"] trong khối with
+        """
+        record = {"name": name, "cat": cat, "start_ms": self.now_ms(), "tid": threading.get_ident(), "args": args}
+        try:
+            yield record
+        except Exception as e:
+            record["args"]["error"] = type(e).__name__
+            raise
+        finally:
+            record["dur_ms"] = self.now_ms() - record["start_ms"]
+            with self.lock:
+                self.spans.append(record)
+
+    def by_cat(self, cat):
+        return [s for s in self.spans if s["cat"] == cat]
+
+    def summary(self):
+        """
+        Tổng hợp: p50/p95 theo bước và strategy, thời gian chờ, LLM so với tổng thời gian
+        """
+        spans = list(self.spans)
+        batch = [s for s in spans if s["cat"] == "batch"]
+        wall_ms = sum(s["dur_ms"] for s in batch) if batch else max((s["start_ms"] + s["dur_ms"] for s in spans), default=0.0)
+
+        def grouped(cat, key):
+            groups = {}
+            for s in spans:
+                if s["cat"] == cat:
+                    groups.setdefault(key(s), []).append(s)
+            return groups
+
+        steps = {name: duration_stats([s["dur_ms"] for s in group])
+                 for name, group in grouped("step", lambda s: s["name"]).items()}
+        for name, group in grouped("step", lambda s: s["name"]).items():
+            steps[name]["retries"] = sum(s["args"].get("retries", 0) for s in group)
+
+        strategies = {}
+        for name, group in grouped("strategy", lambda s: f"{s['args'].get('step')}/{s['name']}").items():
+            strategies[name] = duration_stats([s["dur_ms"] for s in group])
+            strategies[name]["wins"] = sum(1 for s in group if s["args"].get("success"))
+
+        waits = {name: duration_stats([s["dur_ms"] for s in group])
+                 for name, group in grouped("wait", lambda s: s["name"]).items()}
+
+        llm = [s for s in spans if s["cat"] == "llm"]
+        llm_ms = sum(s["dur_ms"] for s in llm)
+        videos = [s["dur_ms"] for s in spans if s["cat"] == "video"]
+        return {
+            "wall_ms": wall_ms,
+            "videos": duration_stats(videos),
+            "steps": steps,
+            "strategies": strategies,
+            "waits": waits,
+            "navigation": duration_stats([s["dur_ms"] for s in spans if s["cat"] == "navigation"]),
+            "dom_scans": duration_stats([s["dur_ms"] for s in spans if s["cat"] == "dom"]),
+            "llm": {
+                **duration_stats([s["dur_ms"] for s in llm]),
+                "input_tokens": sum(s["args"].get("input_tokens", 0) for s in llm),
+                "output_tokens": sum(s["args"].get("output_tokens", 0) for s in llm),
+                "share_of_wall": llm_ms / wall_ms if wall_ms else 0.0
+            }
+        }
+
+    def to_trace_events(self):
+        """
+        Span dạng Chrome trace-event (complete event "X", đơn vị micro giây)
+        """
+        pid = os.getpid()
+        return {
+            "traceEvents": [{
+                "name": s["name"],
+                "cat": s["cat"],
+                "ph": "X",
+                "ts": round(s["start_ms"] * 1000),
+                "dur": round(s["dur_ms"] * 1000),
+                "pid": pid,
+                "tid": s["tid"],
+                "args": s["args"]
+            } for s in sorted(self.spans, key=lambda s: s["start_ms"])],
+            "displayTimeUnit": "ms"
+        }
+
+    def export(self, name, directory=SAVE_TRACE_PATH):
+        """
+        Ghi <name>.summary.json (tổng hợp + span) và <name>.trace.json (trace-event)
+        """
+        os.makedirs(directory, exist_ok=True)
+        summary_path = os.path.join(directory, f"{name}.summary.json")
+        trace_path = os.path.join(directory, f"{name}.trace.json")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump({"summary": self.summary(), "spans": self.spans}, f, ensure_ascii=False, indent=2, default=str)
+        with open(trace_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_trace_events(), f, ensure_ascii=False, default=str)
+        return summary_path, trace_path
+
+
+_tracer = Tracer()
+
+
+def get_tracer():
+    return _tracer
+
+
+def span(name, cat, **args):
+    """
+    Ghi span vào tracer dùng chung của process
+    """
+    return _tracer.span(name, cat, **args)
+
+
+def print_trace_summary(summary):
+    """
+    In p50/p95 theo bước và tỉ lệ thời gian LLM
+    """
+    print(f"\n{'bước':<14} {'lần':>5} {'p50':>9} {'p95':>9} {'retry':>6}")
+    for name, s in summary["steps"].items():
+        print(f"{name:<14} {s['count']:>5} {s['p50_ms']:>7.0f}ms {s['p95_ms']:>7.0f}ms {s['retries']:>6}")
+    nav = summary["navigation"]
+    if nav["count"]:
+        print(f"{'navigation':<14} {nav['count']:>5} {nav['p50_ms']:>7.0f}ms {nav['p95_ms']:>7.0f}ms")
+    llm = summary["llm"]
+    print(f"LLM: {llm['count']} lần, {llm['total_ms'] / 1000:.1f}s = {llm['share_of_wall'] * 100:.1f}% tổng thời gian "
+          f"({llm['input_tokens']} tokens vào / {llm['output_tokens']} tokens ra)")
+    dom = summary["dom_scans"]
+    print(f"Quét DOM: {dom['count']} lần, {dom['total_ms'] / 1000:.1f}s")
@@ -0,0 +1,216 @@
+"""
+Lớp chờ "sẵn sàng" cho flow chia sẻ video: chờ đúng trạng thái UI
+(dialog, element, network response, DOM ổn định) thay vì sleep cố định.
+Sleep cố định chỉ còn là fallback khi điều kiện không xảy ra.
+Nút được bật / dialog mở, đóng được chờ bằng MutationObserver trong trang
+(window.__ytShare.waitForState) nên trả về ngay khi UI thay đổi; poll dự phòng
+250ms chỉ để bắt thay đổi hiển thị do CSS không tạo mutation.
+"""
+import time
+
+from src.agent.youtube_share_trace import span
+from src.agent.youtube_share_helpers import call_helper
+
+DIALOG_SELECTOR = 'tp-yt-paper-dialog, ytcp-dialog, [role="dialog"]'
+EMAIL_FIELD_SELECTOR = 'textarea, input[type="email"], input[type="text"], [contenteditable="true"]'
+
+# RPC Studio gọi khi bấm Lưu
+SAVE_RPC_PATTERN = "/youtubei/v1/video_manager/metadata_update"
+
+# Thời gian sleep cố định của flow cũ cho từng bước (ms), dùng để so sánh
+SLEEP_BUDGET_MS = {
+    "navigation": 8000,
+    "visibility_control": 2000,
+    "visibility_dialog": 2000,
+    "share_dialog": 2000,
+    "email_done_enabled": 2000,
+    "email_dialog_closed": 3000,
+    "popup_closed": 2000,
+    "save_rpc": 2000,
+    "dom_settled": 2000,
+}
+
+# Đếm số dialog đang hiển thị
+VISIBLE_DIALOG_COUNT_JS = """
+    (dialogSelector) => Array.from(document.querySelectorAll(dialogSelector))
+        .filter(el => el.offsetParent !== null).length
+"""
+
+# Chờ DOM không thay đổi trong quietMs (MutationObserver)
+DOM_SETTLED_JS = """
+    (quietMs) => new Promise(resolve => {
+        let timer = setTimeout(done, quietMs);
+        const observer = new MutationObserver(() => {
+            clearTimeout(timer);
+            timer = setTimeout(done, quietMs);
+        });
+        function done() {
+            observer.disconnect();
+            resolve(true);
+        }
+        observer.observe(document.body, {childList: true, subtree: true, attributes: true});
+    })
+"""
+
+
+def wait_until_ready(page, step, condition, timeout=5000, fallback_ms=0, log=None):
+    """
+    Chờ condition(timeout) thành công, tối đa timeout ms.
+    Nếu thất bại thì sleep fallback_ms. Ghi lại độ trễ so với sleep cũ.
+    """
+    start = time.perf_counter()
+    ready = True
+    with span(step, "wait", timeout_ms=timeout) as wait_span:
+        try:
+            condition(timeout)
+        except Exception as e:
+            ready = False
+            print(f"⚠️ [{step}] Không chờ được trạng thái sẵn sàng: {str(e).splitlines()[0]}")
+            if fallback_ms:
+                page.wait_for_timeout(fallback_ms)
+        wait_span["args"].update(ready=ready, fallback_ms=0 if ready else fallback_ms)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    budget_ms = SLEEP_BUDGET_MS.get(step, 0)
+    status = "sẵn sàng" if ready else "fallback"
+    print(f"⏱️ [{step}] {status} sau {elapsed_ms:.0f}ms (sleep cũ: {budget_ms}ms)")
+    if log is not None:
+        log.append({"step": step, "ready": ready, "elapsed_ms": elapsed_ms, "budget_ms": budget_ms})
+    return ready
+
+
+def observe_state(page, arg, timeout):
+    """
+    Chờ trạng thái UI bằng observer trong trang, lỗi TimeoutError nếu hết timeout ms
+    """
+    result = call_helper(page, "waitForState", {**arg, "dialogSelector": DIALOG_SELECTOR, "timeout": timeout})
+    if not result or not result.get("ready"):
+        raise TimeoutError(f"Hết {timeout}ms chờ {arg['state']}")
+    return result
+
+
+def wait_for_keyword_element(page, step, keywords, in_dialog=False, enabled_only=False, timeout=5000, fallback_ms=0, log=None):
+    """
+    Chờ element có text/aria-label chứa từ khóa xuất hiện (và được bật nếu enabled_only)
+    """
+    arg = {
+        "state": "element",
+        "keywords": [k.lower() for k in keywords],
+        "inDialog": in_dialog,
+        "enabledOnly": enabled_only
+    }
+    return wait_until_ready(
+        page, step,
+        lambda t: observe_state(page, arg, t),
+        timeout=timeout, fallback_ms=fallback_ms, log=log
+    )
+
+
+def wait_for_button_enabled(page, step, keywords, timeout=5000, fallback_ms=0, log=None):
+    """
+    Chờ nút theo từ khóa trong dialog đang mở hết disabled/aria-disabled
+    """
+    return wait_for_keyword_element(page, step, keywords, in_dialog=True, enabled_only=True,
+                                    timeout=timeout, fallback_ms=fallback_ms, log=log)
+
+
+def wait_for_dialog_open(page, step, dialogs_before=0, timeout=5000, fallback_ms=0, log=None):
+    """
+    Chờ số dialog hiển thị tăng lên so với dialogs_before (dialog mới mở)
+    """
+    arg = {"state": "dialogCount", "op": "gt", "before": dialogs_before}
+    return wait_until_ready(
+        page, step,
+        lambda t: observe_state(page, arg, t),
+        timeout=timeout, fallback_ms=fallback_ms, log=log
+    )
+
+
+def wait_for_email_field(page, step, timeout=5000, fallback_ms=0, log=None):
+    """
+    Chờ ô nhập email trong dialog chia sẻ hiển thị
+    """
+    return wait_until_ready(
+        page, step,
+        lambda t: page.wait_for_selector(EMAIL_FIELD_SELECTOR, state="visible", timeout=t),
+        timeout=timeout, fallback_ms=fallback_ms, log=log
+    )
+
+
+def count_visible_dialogs(page):
+    """
+    Số dialog đang hiển thị trên trang
+    """
+    try:
+        return page.evaluate(VISIBLE_DIALOG_COUNT_JS, DIALOG_SELECTOR)
+    except Exception:
+        return 0
+
+
+def wait_for_dialog_closed(page, step, dialogs_before, timeout=5000, fallback_ms=0, log=None):
+    """
+    Chờ số dialog hiển thị giảm xuống so với dialogs_before (dialog đã đóng)
+    """
+    arg = {"state": "dialogCount", "op": "lt", "before": dialogs_before}
+    return wait_until_ready(
+        page, step,
+        lambda t: observe_state(page, arg, t),
+        timeout=timeout, fallback_ms=fallback_ms, log=log
+    )
+
+
+def wait_for_dom_settled(page, step="dom_settled", quiet_ms=300, timeout=2000, log=None):
+    """
+    Chờ DOM ngừng thay đổi trong quiet_ms (dùng khi không có điều kiện cụ thể).
+    Trả về False (kèm cảnh báo) nếu DOM vẫn thay đổi sau timeout ms.
+    """
+    # Promise của DOM_SETTLED_JS có thể kéo dài nếu trang liên tục thay đổi,
+    # nên giới hạn bằng Promise.race với timeout (resolve false khi hết giờ)
+    def bounded(t):
+        settled = page.evaluate(
+            f"""({{quietMs, timeout}}) => Promise.race([
+                ({DOM_SETTLED_JS})(quietMs),
+                new Promise(r => setTimeout(() => r(false), timeout))
+            ])""",
+            {"quietMs": quiet_ms, "timeout": t}
+        )
+        if not settled:
+            raise TimeoutError(f"Hết {t}ms, DOM vẫn đang thay đổi")
+
+    return wait_until_ready(page, step, bounded, timeout=timeout, log=log)
+
+
+def is_save_response(response):
+    """
+    Response có phải RPC lưu thay đổi của Studio không
+    """
+    return SAVE_RPC_PATTERN in response.url and response.request.method == "POST"
+
+
+def click_and_wait_for_save(page, click, timeout=10000, log=None):
+    """
+    Gọi click() (trả về True/False) và chờ RPC lưu của Studio trả về.
+    Trả về True chỉ khi đã click và RPC lưu trả về thành công (2xx);
+    không có response hoặc HTTP lỗi đều tính là lưu thất bại.
+    """
+    result = {"clicked": False, "response": None}
+
+    def condition(t):
+        with page.expect_response(is_save_response, timeout=t) as response_info:
+            result["clicked"] = click()
+            if not result["clicked"]:
+                # Không click được thì không cần chờ response
+                raise RuntimeError("Không click được nút Lưu")
+        result["response"] = response_info.value
+
+    wait_until_ready(page, "save_rpc", condition, timeout=timeout, log=log)
+    response = result["response"]
+    if not result["clicked"]:
+        return False
+    if response is None:
+        print("❌ Không thấy RPC lưu của Studio trả về, coi như lưu thất bại")
+        return False
+    if not response.ok:
+        print(f"❌ RPC lưu trả về HTTP {response.status}")
+        return False
+    return True
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Test registry client LLM dùng chung (client giả, không gọi API)
+"""
+
+import sys
+sys.path.append('src')
+
+from src.agent.youtube_share_llm import LLMClientRegistry
+
+class FakeClient:
+    def __init__(self, model, **params):
+        self.model = model
+        self.params = params
+
+    def invoke(self, payload):
+        return f"{self.model}: {payload}"
+
+def test_registry_reuses_clients():
+    """Cùng provider/model/params dùng lại một client, lần gọi đầu tính là cold"""
+
+    registry = LLMClientRegistry(factories={"google": FakeClient})
+    first = registry.get("gemini", google_api_key="key")
+    second = registry.get("gemini", google_api_key="key")
+    other = registry.get("gemini", google_api_key="key", temperature=0)
+
+    assert first is second
+    assert other is not first
+
+    assert registry.invoke("step", first, "a") == "gemini: a"
+    registry.invoke("step", second, "b")
+    stats = registry.stats()
+    assert stats["created"] == 2
+    assert stats["reused"] == 1
+    assert stats["calls"]["step"]["calls"] == 2
+    assert stats["calls"]["step"]["cold_calls"] == 1
+    print(f"✅ {stats}")
+
+if __name__ == "__main__":
+    test_registry_reuses_clients()
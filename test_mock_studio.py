@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Test Studio giả lập cho benchmark: trang edit và RPC lưu (không cần browser)
+"""
+
+import json
+import sys
+import urllib.request
+sys.path.append('src')
+
+from tests.mock_studio import MockStudioServer, SAVE_RPC_PATH
+
+def test_mock_studio_edit_page_and_save():
+    """Trang edit có nhãn đúng ngôn ngữ, RPC lưu ghi lại email đã chia sẻ"""
+
+    with MockStudioServer(lang="en", save_delay_ms=0) as server:
+        html = urllib.request.urlopen(f"{server.url}/video/dQw4w9WgXcQ/edit").read().decode("utf-8")
+        assert "Share privately" in html
+        assert 'role="dialog"' in html
+
+        request = urllib.request.Request(
+            server.url + SAVE_RPC_PATH,
+            data=json.dumps({"videoId": "dQw4w9WgXcQ", "emails": ["a@gmail.com"]}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        assert json.loads(urllib.request.urlopen(request).read())["success"]
+        assert server.shares == {"dQw4w9WgXcQ": ["a@gmail.com"]}
+
+        # Lần tải sau hiển thị email đã chia sẻ để precheck đọc được
+        html = urllib.request.urlopen(f"{server.url}/video/dQw4w9WgXcQ/edit").read().decode("utf-8")
+        assert '"shared": ["a@gmail.com"]' in html
+    print("✅ Studio giả lập hoạt động")
+
+if __name__ == "__main__":
+    test_mock_studio_edit_page_and_save()
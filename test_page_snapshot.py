@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Test chấm điểm element trên snapshot DOM (không cần browser)
+"""
+
+import sys
+sys.path.append('src')
+
+from src.agent.youtube_share_snapshot import rank_elements, snapshot_to_page_info
+
+ELEMENTS = [
+    {"sid": "1", "text": "Chế độ hiển thị Riêng tư", "ariaLabel": "", "title": "", "tagName": "DIV", "role": "", "className": "", "id": ""},
+    {"sid": "2", "text": "Lưu", "ariaLabel": "Lưu", "title": "", "tagName": "YTCP-BUTTON", "role": "button", "className": "", "id": "save"},
+    {"sid": "3", "text": "Hủy", "ariaLabel": "", "title": "", "tagName": "BUTTON", "role": "", "className": "", "id": ""},
+    {"sid": "4", "text": "Lưu bản nháp và các thay đổi khác", "ariaLabel": "", "title": "", "tagName": "SPAN", "role": "", "className": "", "id": ""},
+]
+
+def test_rank_elements():
+    """Nút Lưu chính xác phải đứng đầu, element không liên quan bị loại"""
+    
+    ranked = rank_elements(ELEMENTS, ["Lưu", "save"])
+    sids = [el["sid"] for _, el in ranked]
+    assert sids[0] == "2"
+    assert "3" not in sids
+    print(f"✅ Thứ tự: {sids}")
+
+def test_snapshot_to_page_info():
+    """Snapshot chuyển được sang format page_info cũ"""
+    
+    snapshot = {"texts": ["Chi tiết", "Chế độ hiển thị"], "elements": ELEMENTS, "inputs": [], "droppedElements": 0}
+    page_info = snapshot_to_page_info(snapshot)
+    assert page_info["page_text"] == "Chi tiết | Chế độ hiển thị"
+    assert page_info["clickable_elements"] is ELEMENTS
+    assert page_info["inputs"] == []
+
+if __name__ == "__main__":
+    test_rank_elements()
+    test_snapshot_to_page_info()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Test context gửi cho LLM nằm trong ngân sách token (không cần browser)
+"""
+
+import json
+import sys
+sys.path.append('src')
+
+from src.agent.youtube_share_prompt import build_llm_context, estimate_tokens
+
+def make_page_info():
+    elements = [
+        {"sid": str(i), "text": f"Menu item {i} " * 5, "ariaLabel": "", "tagName": "DIV", "className": "style-scope ytcp-menu"}
+        for i in range(300)
+    ]
+    elements.append({"sid": "save", "text": "Lưu", "ariaLabel": "Lưu", "tagName": "YTCP-BUTTON", "role": "button"})
+    texts = [f"Phân tích kênh dòng {i}" for i in range(500)] + ["Lưu"]
+    return {
+        "page_text": " | ".join(texts),
+        "clickable_elements": elements,
+        "inputs": [],
+        "snapshot": {"texts": texts, "elements": elements, "inputs": []}
+    }
+
+def test_build_llm_context():
+    """Element liên quan đứng đầu và context nhỏ hơn ngân sách"""
+    
+    context = build_llm_context(make_page_info(), "Click Lưu/Save", token_budget=500)
+    elements = json.loads(context["clickable_elements"])
+    
+    assert elements[0]["sid"] == "save"
+    assert context["tokens"] <= 500
+    assert "Phân tích kênh" not in context["page_text"]
+    assert estimate_tokens(context["clickable_elements"]) <= 500
+    print(f"✅ Gửi ~{context['tokens']} tokens, {len(elements)} element")
+
+if __name__ == "__main__":
+    test_build_llm_context()
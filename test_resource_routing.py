@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test phân loại request bị chặn khi tải Studio (không cần browser)
+"""
+
+import sys
+sys.path.append('src')
+
+from src.agent.youtube_share_routing import ResourceBlocker, classify_request
+
+class FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = FakeRequest(url, resource_type)
+        self.result = None
+
+    def continue_(self):
+        self.result = "continue"
+
+    def abort(self, error_code=None):
+        self.result = "abort"
+
+def test_classify_request():
+    """Script và RPC của Studio được cho qua, ảnh/media/font/telemetry bị chặn"""
+
+    assert classify_request("https://studio.youtube.com/youtubei/v1/video_manager/metadata_update", "fetch") is None
+    assert classify_request("https://www.youtube.com/s/studio/app.js", "script") is None
+    assert classify_request("https://i.ytimg.com/vi/abc/hqdefault.jpg", "image") == "image"
+    assert classify_request("https://rr1.googlevideo.com/videoplayback?id=1", "xhr") == "media"
+    assert classify_request("https://studio.youtube.com/youtubei/v1/log_event?alt=json", "fetch") == "telemetry"
+    print("✅ Phân loại request đúng")
+
+def test_blocker_stats():
+    """Đếm request bị chặn giữa hai snapshot"""
+
+    blocker = ResourceBlocker()
+    before = blocker.snapshot()
+    routes = [
+        FakeRoute("https://i.ytimg.com/a.jpg", "image"),
+        FakeRoute("https://fonts.gstatic.com/a.woff2", "font"),
+        FakeRoute("https://studio.youtube.com/app.js", "script"),
+    ]
+    for route in routes:
+        blocker.handle(route)
+
+    assert [r.result for r in routes] == ["abort", "abort", "continue"]
+    saved = ResourceBlocker.saved_since(before, blocker.snapshot())
+    assert saved["requests"] == 2
+    assert saved["by_type"] == {"image": 1, "font": 1}
+    assert saved["allowed"] == 1
+    print(f"✅ {saved}")
+
+if __name__ == "__main__":
+    test_classify_request()
+    test_blocker_stats()
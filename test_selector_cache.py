@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test cache selector đã học (không cần browser)
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append('src')
+
+from src.agent.youtube_share_selector_cache import SelectorCache, click_cached_selector
+
+def test_selector_cache():
+    """Test ghi nhận, đọc lại và loại bỏ selector"""
+    
+    path = os.path.join(tempfile.mkdtemp(), "selector_cache.json")
+    cache = SelectorCache(path)
+    key = SelectorCache.make_key("Lưu hoặc Save", "vi", "abc123")
+    
+    assert cache.get(key) == []
+    cache.record_miss()
+    
+    cache.record_success(key, "#save-button")
+    cache.record_success(key, 'ytcp-button:has-text("Lưu")')
+    assert cache.get(key)[0] == 'ytcp-button:has-text("Lưu")'
+    
+    # Cache được lưu xuống đĩa và đọc lại được
+    reloaded = SelectorCache(path)
+    assert reloaded.get(key) == cache.get(key)
+    
+    # Selector thất bại bị loại
+    reloaded.invalidate(key, 'ytcp-button:has-text("Lưu")')
+    assert reloaded.get(key) == ["#save-button"]
+    reloaded.invalidate(key, "#save-button")
+    assert reloaded.get(key) == []
+    
+    reloaded.record_hit()
+    stats = reloaded.stats()
+    assert stats["hits"] == 1
+    assert stats["invalidations"] == 2
+    assert stats["keys"] == 0
+    print(f"✅ Selector cache: {stats}")
+
+class TimeoutError(Exception):
+    """Cùng tên với TimeoutError của Playwright"""
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+
+    @property
+    def first(self):
+        return self
+
+    def wait_for(self, state=None, timeout=None):
+        if self.selector not in self.page.visible_after_wait:
+            raise TimeoutError(f"Timeout {timeout}ms exceeded waiting for {self.selector}")
+
+    def click(self, timeout=None):
+        if self.page.closed:
+            raise RuntimeError("Target page, context or browser has been closed")
+        self.page.clicked.append(self.selector)
+
+class FakePage:
+    """Element trong visible_after_wait chỉ hiển thị sau khi chờ (dialog đang mở)"""
+
+    def __init__(self, visible_after_wait, closed=False):
+        self.visible_after_wait = set(visible_after_wait)
+        self.closed = closed
+        self.clicked = []
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+def test_click_cached_selector_waits():
+    """Selector đúng được chờ hiển thị; chỉ selector hết timeout mới bị xóa"""
+
+    cache = SelectorCache(os.path.join(tempfile.mkdtemp(), "selector_cache.json"))
+    key = SelectorCache.make_key("Xong", "vi", "abc123")
+    cache.record_success(key, "#done-button")
+    cache.record_success(key, "#old-done")
+
+    page = FakePage(["#done-button"])
+    assert click_cached_selector(page, cache, key, timeout=100)
+    assert page.clicked == ["#done-button"]
+    assert cache.get(key) == ["#done-button"]
+
+    # Page đã đóng: không phải lỗi của selector, giữ lại trong cache
+    assert not click_cached_selector(FakePage(["#done-button"], closed=True), cache, key, timeout=100)
+    assert cache.get(key) == ["#done-button"]
+    print(f"✅ Selector cache chờ element hiển thị: {cache.stats()}")
+
+if __name__ == "__main__":
+    test_selector_cache()
+    test_click_cached_selector_waits()
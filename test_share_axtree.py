@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test snapshot cây accessibility: cắt node, selector role, cache theo page (CDP giả, không cần browser)
+"""
+
+import sys
+sys.path.append('src')
+
+from src.agent.youtube_share_axtree import AXSnapshotCache, build_ax_snapshot, cdp_entries, playwright_entries, role_selector
+from src.agent.youtube_share_snapshot import rank_elements
+from src.agent.youtube_share_steps import snapshot_strategy
+
+def ax_node(node_id, role, name="", parent=None, ignored=False, disabled=False):
+    node = {"nodeId": node_id, "ignored": ignored, "role": {"type": "role", "value": role},
+            "name": {"type": "computedString", "value": name}, "properties": []}
+    if parent:
+        node["parentId"] = parent
+    if disabled:
+        node["properties"].append({"name": "disabled", "value": {"type": "boolean", "value": True}})
+    return node
+
+STUDIO_TREE = [
+    ax_node("1", "RootWebArea", "Chi tiết video"),
+    ax_node("2", "generic", parent="1"),
+    ax_node("3", "button", "Chế độ hiển thị", parent="2"),
+    ax_node("4", "button", "Lưu", parent="2", disabled=True),
+    ax_node("5", "StaticText", "Tiêu đề", parent="2"),
+    ax_node("6", "dialog", "Chia sẻ video", parent="1"),
+    ax_node("7", "generic", parent="6"),
+    ax_node("8", "textbox", "Nhập email", parent="7"),
+    ax_node("9", "button", "Xong", parent="7"),
+    ax_node("10", "button", "Xong", parent="2"),
+    # Dialog đã đóng: Chrome đánh dấu ignored
+    ax_node("11", "button", "Hủy", parent="2", ignored=True),
+]
+
+class FakeSession:
+    def __init__(self, page):
+        self.page = page
+
+    def send(self, method):
+        assert method == "Accessibility.getFullAXTree"
+        self.page.cdp_calls += 1
+        return {"nodes": self.page.nodes}
+
+class FakeContext:
+    def __init__(self, page):
+        self.page = page
+
+    def new_cdp_session(self, page):
+        return FakeSession(page)
+
+class FakePage:
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.url = "https://studio.youtube.com/video/abc/edit"
+        self.main_frame = object()
+        self.context = FakeContext(self)
+        self.dialogs = 1
+        self.cdp_calls = 0
+        self.handlers = {}
+        self.clicked = []
+
+    def evaluate(self, script, arg=None):
+        return self.dialogs
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+
+    @property
+    def first(self):
+        return self
+
+    def click(self, timeout=None):
+        self.page.clicked.append(self.selector)
+
+def test_prune_and_selectors():
+    """Chỉ giữ role tương tác có tên, đánh dấu element trong dialog, nth cho tên trùng"""
+
+    snapshot = build_ax_snapshot(cdp_entries(STUDIO_TREE))
+    elements = {(el["text"], el["inDialog"]): el for el in snapshot["elements"]}
+    assert [el["text"] for el in snapshot["elements"]] == ["Chế độ hiển thị", "Lưu", "Xong", "Xong"]
+    assert elements[("Lưu", False)]["disabled"] is True
+    assert elements[("Xong", True)]["selector"] == 'role=button[name="Xong"s]'
+    assert elements[("Xong", False)]["selector"] == 'role=button[name="Xong"s] >> nth=1'
+    assert snapshot["inputs"][0]["selector"] == 'role=textbox[name="Nhập email"s]'
+    assert snapshot["inputs"][0]["inDialog"] is True
+    assert "Chia sẻ video" in snapshot["texts"] and "Tiêu đề" not in snapshot["texts"]
+
+    # Tìm element bằng Python trên cây đã cắt
+    best = rank_elements(snapshot["elements"], ["hiển thị", "visibility"])[0][1]
+    assert best["text"] == "Chế độ hiển thị"
+    assert role_selector("link", 'a "b"') == 'role=link[name="a \\"b\\""s]'
+    print(f"✅ Giữ {len(snapshot['elements'])} element, {len(snapshot['inputs'])} input")
+
+def test_playwright_fallback_format():
+    """Cây của page.accessibility.snapshot() cho cùng kết quả"""
+
+    tree = {"role": "WebArea", "name": "", "children": [
+        {"role": "button", "name": "Lưu", "disabled": True},
+        {"role": "dialog", "name": "Chia sẻ video", "children": [{"role": "button", "name": "Xong"}]}
+    ]}
+    snapshot = build_ax_snapshot(playwright_entries(tree))
+    assert [(el["text"], el["inDialog"], el["disabled"]) for el in snapshot["elements"]] == [
+        ("Lưu", False, True), ("Xong", True, False)
+    ]
+    print("✅ Fallback snapshot của Playwright")
+
+def test_cache_until_navigation_or_dialog_change():
+    """Snapshot dùng lại cho đến khi điều hướng hoặc số dialog thay đổi"""
+
+    cache = AXSnapshotCache()
+    page = FakePage(STUDIO_TREE)
+    first = cache.get(page)
+    assert cache.get(page) is first and page.cdp_calls == 1
+
+    page.dialogs = 2
+    assert cache.get(page) is not first and page.cdp_calls == 2
+
+    page.handlers["framenavigated"](page.main_frame)
+    cache.get(page)
+    assert page.cdp_calls == 3
+
+    stats = cache.stats()
+    assert stats["builds"] == 3 and stats["hits"] == 1 and stats["invalidations"] == 1
+    assert stats["kept"] == 15 and stats["nodes"] == 33
+    print(f"✅ Cache snapshot: {stats}")
+
+def test_snapshot_strategy_uses_cache():
+    """Strategy snapshot dùng cây accessibility đã cache, tạo lại sau khi click"""
+
+    page = FakePage(STUDIO_TREE)
+    missing = snapshot_strategy(["không có"])
+    assert not missing.run(page, 1000) and not missing.run(page, 1000)
+    assert page.cdp_calls == 1
+
+    calls = page.cdp_calls
+    assert snapshot_strategy(["xong", "done"], in_dialog=True).run(page, 1000)
+    assert page.clicked == ['role=button[name="Xong"s]']
+    snapshot_strategy(["không có"]).run(page, 1000)
+    assert page.cdp_calls == calls + 1
+    print("✅ Strategy snapshot dùng cache accessibility")
+
+if __name__ == "__main__":
+    test_prune_and_selectors()
+    test_playwright_fallback_format()
+    test_cache_until_navigation_or_dialog_change()
+    test_snapshot_strategy_uses_cache()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test trích xuất video_id/email bằng regex và LRU (không cần LLM)
+"""
+
+import sys
+sys.path.append('src')
+
+from src.agent.youtube_share_extract import ExtractCache, extract_share_info_cached, extract_share_info_local
+
+def test_extract_share_info_local():
+    """Video ID từ URL/ID riêng và email được trích xuất, lệnh mơ hồ trả về None"""
+
+    info = extract_share_info_local(
+        "Chia sẻ video https://studio.youtube.com/video/dQw4w9WgXcQ/edit, youtu.be/aB3_dE-6gHi "
+        "và x1y2z3A4b5C cho Test@Gmail.com, user.name+tag@example.co."
+    )
+    assert info == {
+        "video_ids": ["dQw4w9WgXcQ", "aB3_dE-6gHi", "x1y2z3A4b5C"],
+        "emails": ["test@gmail.com", "user.name+tag@example.co"]
+    }
+
+    # Từ 11 chữ cái thường hoặc thiếu email thì để LLM xử lý
+    assert extract_share_info_local("share information with a@b.com") is None
+    assert extract_share_info_local("chia sẻ video dQw4w9WgXcQ") is None
+    assert extract_share_info_local("chia sẻ video dQw4w9WgXcQ cho @khoa") is None
+    # Tên biến/slug 11 ký tự không bị coi là video ID
+    assert extract_share_info_local("chia sẻ video_12345 cho a@b.com") is None
+    # Từ tiếng Anh, số điện thoại, mã ticket 11 ký tự không bị coi là video ID
+    assert extract_share_info_local("Immediately share dQw4w9WgXcQ with a@b.com") is None
+    assert extract_share_info_local("share dQw4w9WgXcQ with Engineering a@b.com") is None
+    assert extract_share_info_local("share dQw4w9WgXcQ with a@b.com, call 09123456789") is None
+    assert extract_share_info_local("share dQw4w9WgXcQ with a@b.com for ABCD-123456") is None
+
+    # Thứ tự video giữ đúng như trong prompt (ID riêng trước URL)
+    info = extract_share_info_local("share x1y2z3A4b5C, youtu.be/dQw4w9WgXcQ and aB3_dE-6gHi with a@b.com")
+    assert info["video_ids"] == ["x1y2z3A4b5C", "dQw4w9WgXcQ", "aB3_dE-6gHi"]
+    print("✅ Regex trích xuất đúng")
+
+def test_extract_cache():
+    """Chạy lại cùng lệnh không gọi LLM"""
+
+    calls = []
+    def fake_llm(prompt):
+        calls.append(prompt)
+        return {"video_ids": ["dQw4w9WgXcQ"], "emails": ["a@b.com"]}
+
+    cache = ExtractCache(max_size=2)
+    prompt = "share the video  for the information team with a@b.com"
+    first = extract_share_info_cached(prompt, fake_llm, cache)
+    first["emails"].append("x@y.com")
+    second = extract_share_info_cached(" share the video for the information team with a@b.com ", fake_llm, cache)
+
+    assert len(calls) == 1
+    assert second == {"video_ids": ["dQw4w9WgXcQ"], "emails": ["a@b.com"]}
+
+    extract_share_info_cached("dQw4w9WgXcQ a@b.com", fake_llm, cache)
+    extract_share_info_cached("x1y2z3A4b5C a@b.com", fake_llm, cache)
+    assert len(cache.entries) == 2
+    assert cache.stats() == {"hits": 1, "regex": 2, "llm_calls": 1, "size": 2}
+    print("✅ LRU nhớ kết quả")
+
+if __name__ == "__main__":
+    test_extract_share_info_local()
+    test_extract_cache()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test gọi thư viện JS window.__ytShare từ Python (page giả, không cần browser)
+"""
+
+import sys
+sys.path.append('src')
+
+from src.agent.youtube_share_helpers import (
+    SHARE_HELPERS_JS, CALL_HELPER_JS, HELPER_MISSING, install_share_helpers, call_helper, helper_predicate
+)
+from src.agent.youtube_share_waits import DIALOG_SELECTOR, wait_for_button_enabled, wait_for_dialog_closed, wait_for_dom_settled
+
+class FakePage:
+    """Page giả: chỉ có thư viện sau khi init script/evaluate cài nó"""
+
+    def __init__(self, installed=False):
+        self.installed = installed
+        self.init_scripts = []
+        self.calls = []
+
+    def add_init_script(self, script):
+        self.init_scripts.append(script)
+        self.installed = True
+
+    def evaluate(self, expression, arg=None):
+        if expression == SHARE_HELPERS_JS:
+            self.installed = True
+            return None
+        assert expression == CALL_HELPER_JS
+        self.calls.append(arg)
+        return {"success": True, "args": arg[1]} if self.installed else HELPER_MISSING
+
+def test_call_sends_only_name_and_json_args():
+    """Mỗi lần gọi chỉ gửi tên hàm + tham số, email có dấu nháy không bị chèn vào script"""
+
+    page = install_share_helpers(FakePage())
+    assert page.init_scripts == [SHARE_HELPERS_JS]
+    email = "o'brien@example.com"
+    result = call_helper(page, "fillEmailField", email)
+    assert result == {"success": True, "args": [email]}
+    assert page.calls == [["fillEmailField", [email]]]
+    assert email not in CALL_HELPER_JS
+    print("✅ Gọi helper bằng tham số JSON")
+
+def test_installs_on_uninstrumented_page():
+    """Page không tạo từ context đã cài: cài vào document hiện tại rồi gọi lại"""
+
+    page = FakePage()
+    result = call_helper(page, "clickInPopup", ["xong", "done"])
+    assert result["success"]
+    assert len(page.calls) == 2
+    print("✅ Tự cài thư viện khi document chưa có")
+
+def test_bundle_defines_helpers():
+    """Các hàm mà agent/async gọi đều có trong thư viện"""
+
+    for name in ["clickByText", "clickEditButton", "clickEnabledButton", "clickDoneNearInput",
+                 "clickInPopup", "clickBestMatch", "fillEmailField", "clickByKeywords", "fillEmail", "waitForState"]:
+        assert f"{name}(" in SHARE_HELPERS_JS, name
+    assert helper_predicate("fillEmail") == "(arg) => window.__ytShare && window.__ytShare.fillEmail(arg)"
+    print("✅ Thư viện đủ hàm")
+
+class ObserverPage:
+    """Page giả trả kết quả waitForState theo kịch bản"""
+
+    def __init__(self, ready):
+        self.ready = ready
+        self.args = []
+        self.waits = []
+
+    def evaluate(self, expression, arg=None):
+        name, args = arg
+        assert name == "waitForState"
+        self.args.append(args[0])
+        return {"ready": self.ready, "elapsedMs": 12.0}
+
+    def wait_for_timeout(self, ms):
+        self.waits.append(ms)
+
+def test_observer_waits():
+    """Chờ nút được bật/dialog đóng bằng observer trong trang, fallback khi hết timeout"""
+
+    page = ObserverPage(ready=True)
+    log = []
+    assert wait_for_button_enabled(page, "email_done_enabled", ["Xong", "Done"], timeout=3000, fallback_ms=500, log=log)
+    assert page.args[0] == {
+        "state": "element", "keywords": ["xong", "done"], "inDialog": True, "enabledOnly": True,
+        "dialogSelector": DIALOG_SELECTOR, "timeout": 3000
+    }
+    assert log[0]["ready"] and page.waits == []
+
+    page = ObserverPage(ready=False)
+    assert not wait_for_dialog_closed(page, "popup_closed", 2, timeout=1000, fallback_ms=300)
+    assert page.args[0]["state"] == "dialogCount" and page.args[0]["op"] == "lt" and page.args[0]["before"] == 2
+    assert page.waits == [300]
+    print("✅ Chờ bằng observer")
+
+class MutatingPage:
+    """Page giả: DOM ổn định sau settle_ms, Promise.race trả false nếu timeout ngắn hơn"""
+
+    def __init__(self, settle_ms):
+        self.settle_ms = settle_ms
+
+    def evaluate(self, expression, arg=None):
+        return arg["timeout"] >= self.settle_ms
+
+def test_dom_settled_timeout():
+    """DOM thay đổi liên tục: hết timeout trả về False thay vì báo sẵn sàng"""
+
+    log = []
+    assert wait_for_dom_settled(MutatingPage(settle_ms=500), timeout=2000, log=log)
+    assert not wait_for_dom_settled(MutatingPage(settle_ms=float("inf")), timeout=2000, log=log)
+    assert [entry["ready"] for entry in log] == [True, False]
+    print("✅ DOM không ổn định được báo là hết giờ")
+
+if __name__ == "__main__":
+    test_call_sends_only_name_and_json_args()
+    test_installs_on_uninstrumented_page()
+    test_bundle_defines_helpers()
+    test_observer_waits()
+    test_dom_settled_timeout()
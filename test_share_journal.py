@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test journal job chia sẻ: ghi, đọc lại và resume (không cần browser)
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append('src')
+
+from src.agent.youtube_share_journal import ShareJournal, STATUS_DONE, STATUS_FAILED, STATUS_IN_PROGRESS
+
+def test_journal_resume():
+    """Cặp đã xong bị bỏ qua, dòng bị cắt ngang khi crash không làm hỏng journal"""
+
+    directory = tempfile.mkdtemp()
+    emails = ["a@gmail.com", "b@gmail.com"]
+    journal = ShareJournal.create(["vid1", "vid2", "vid3"], emails, job_id="job1", directory=directory)
+    journal.record("vid1", emails, "save", STATUS_DONE)
+    journal.record("vid2", emails, "share", STATUS_IN_PROGRESS)
+    journal.record("vid2", ["a@gmail.com"], "save", STATUS_DONE)
+    journal.record("vid2", ["b@gmail.com"], "email", STATUS_FAILED, error="timeout")
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"type": "pair", "video_id": "vid3", "ema')
+
+    resumed = ShareJournal.open("job1", directory=directory)
+    assert resumed.job["video_ids"] == ["vid1", "vid2", "vid3"]
+    assert resumed.corrupt_lines == 1
+    assert resumed.pending_emails("vid1", emails) == []
+    assert resumed.pending_emails("vid2", emails) == ["b@gmail.com"]
+    assert resumed.pending_emails("vid3", emails) == emails
+    assert resumed.failed_step("vid2") == "email"
+    assert resumed.summary() == {STATUS_DONE: 3, STATUS_FAILED: 1}
+
+    resumed.record("vid3", emails, "save", STATUS_DONE)
+    assert ShareJournal.open("job1", directory=directory).pending_emails("vid3", emails) == []
+    print("✅ Journal đọc lại đúng trạng thái")
+
+def test_job_id_stays_in_directory():
+    """Job id có dấu phân cách/.. không ghi ra ngoài thư mục journal, trùng job thì gợi ý --resume"""
+
+    directory = tempfile.mkdtemp()
+    journal = ShareJournal.create(["vid1"], ["a@gmail.com"], job_id="../../etc/job 1", directory=directory)
+    assert journal.job_id == "etc-job-1"
+    assert os.path.dirname(journal.path) == directory
+    try:
+        ShareJournal.create(["vid1"], ["a@gmail.com"], job_id="etc/job 1", directory=directory)
+        assert False, "job trùng phải báo lỗi"
+    except ValueError as e:
+        assert "--resume etc-job-1" in str(e)
+    print("✅ Job id an toàn cho đường dẫn")
+
+if __name__ == "__main__":
+    test_journal_resume()
+    test_job_id_stays_in_directory()
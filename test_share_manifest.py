@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test đọc manifest CSV/JSONL và gom theo video (không cần browser/LLM)
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append('src')
+
+from src.agent.youtube_share_manifest import ShareManifest
+
+def write_file(name, content):
+    path = os.path.join(tempfile.mkdtemp(), name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+def test_csv_manifest():
+    """Dòng cùng video được gom lại, email trùng và dòng lỗi bị bỏ qua"""
+
+    path = write_file("jobs.csv", "\n".join([
+        "Video_ID,Email",
+        "dQw4w9WgXcQ,a@gmail.com",
+        "https://studio.youtube.com/video/dQw4w9WgXcQ/edit,\"A@gmail.com; b@gmail.com\"",
+        "x1y2z3A4b5C,c@gmail.com",
+        "short,d@gmail.com",
+        "x1y2z3A4b5C,not-an-email",
+    ]))
+    manifest = ShareManifest.load(path)
+
+    assert manifest.videos == {
+        "dQw4w9WgXcQ": ["a@gmail.com", "b@gmail.com"],
+        "x1y2z3A4b5C": ["c@gmail.com"]
+    }
+    assert manifest.stats() == {"rows": 5, "videos": 2, "pairs": 3, "duplicates": 1, "invalid": 2}
+    print("✅ Manifest CSV gom đúng theo video")
+
+def test_jsonl_manifest():
+    """JSONL hỗ trợ email đơn hoặc danh sách, dòng hỏng không làm dừng cả file"""
+
+    path = write_file("jobs.jsonl", "\n".join([
+        '{"video_id": "dQw4w9WgXcQ", "emails": ["a@gmail.com", "b@gmail.com"]}',
+        '{"video_id": "dQw4w9WgXcQ", "email": "b@gmail.com"}',
+        '{"video_id": "x1y2z3A4b5C"',
+    ]))
+    manifest = ShareManifest.load(path)
+
+    assert manifest.videos == {"dQw4w9WgXcQ": ["a@gmail.com", "b@gmail.com"]}
+    assert manifest.invalid == [(3, "dòng không đọc được")]
+    print("✅ Manifest JSONL gom đúng theo video")
+
+def test_jsonl_mixed_types():
+    """Cột sai kiểu (số, object) được báo lỗi theo dòng, các dòng khác vẫn được đọc"""
+
+    path = write_file("jobs.jsonl", "\n".join([
+        '{"video_id": 12345678901, "email": "a@gmail.com"}',
+        '{"video_id": "dQw4w9WgXcQ", "emails": {"to": "a@gmail.com"}}',
+        '{"video_id": "dQw4w9WgXcQ", "emails": 42}',
+        '{"video_id": "dQw4w9WgXcQ", "emails": ["a@gmail.com", 7]}',
+        '{"video_id": "x1y2z3A4b5C", "email": "c@gmail.com", "channel": 1001}',
+    ]))
+    manifest = ShareManifest.load(path)
+
+    assert manifest.videos == {"x1y2z3A4b5C": ["c@gmail.com"]}
+    assert manifest.channels == {"x1y2z3A4b5C": "1001"}
+    assert [line_no for line_no, _ in manifest.invalid] == [1, 2, 3, 4]
+    assert "video_id phải là chuỗi" in manifest.invalid[0][1]
+    print(f"✅ Dòng sai kiểu được báo lỗi: {manifest.invalid}")
+
+if __name__ == "__main__":
+    test_csv_manifest()
+    test_jsonl_manifest()
+    test_jsonl_mixed_types()
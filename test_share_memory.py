@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test theo dõi bộ nhớ: thay page sau N video / khi heap lớn, khởi động lại context khi Chrome dùng quá nhiều RSS
+"""
+
+import sys
+sys.path.append('src')
+
+from src.agent.youtube_share_memory import MemoryWatchdog, RECYCLE_PAGE, RESTART_CONTEXT, MB
+
+class FakeSession:
+    def __init__(self, page):
+        self.page = page
+
+    def send(self, method):
+        if method == "Performance.enable":
+            return {}
+        if method == "Performance.getMetrics":
+            return {"metrics": [
+                {"name": "JSHeapUsedSize", "value": self.page.heap_mb * MB},
+                {"name": "Nodes", "value": 5000}
+            ]}
+        # Persistent context: page session không có SystemInfo
+        raise RuntimeError(f"'{method}' wasn't found")
+
+class FakeContext:
+    def new_cdp_session(self, page):
+        return FakeSession(page)
+
+class FakePage:
+    def __init__(self, heap_mb=100):
+        self.heap_mb = heap_mb
+        self.context = FakeContext()
+
+def make_watchdog(rss, **kwargs):
+    # Hai process Chrome của profile, RSS đọc từ dict (thay cho /proc)
+    return MemoryWatchdog("/tmp/profile", rss_reader=rss.get, pid_finder=lambda path: [11, 12], **kwargs)
+
+def test_recycle_after_videos():
+    """Page được thay sau recycle_after video, đếm lại từ đầu với page mới"""
+
+    rss = {11: 300, 12: 200}
+    watchdog = make_watchdog(rss, recycle_after=3)
+    page = FakePage()
+    assert [watchdog.after_video(page) for _ in range(3)] == [None, None, RECYCLE_PAGE]
+    watchdog.record(RECYCLE_PAGE)
+    watchdog.forget(page)
+    assert watchdog.after_video(FakePage()) is None
+
+    stats = watchdog.stats()
+    assert stats["recycled"] == 1 and stats["samples"] == 4
+    assert stats["peak"]["browser_mb"] == 500 and stats["peak"]["dom_nodes"] == 5000
+    print(f"✅ Thay page sau N video: {stats}")
+
+def test_memory_thresholds():
+    """Heap page vượt ngưỡng → thay page; RSS Chrome vượt ngưỡng → khởi động lại context"""
+
+    rss = {11: 300, 12: 200}
+    watchdog = make_watchdog(rss, recycle_after=0, page_limit_mb=400, browser_limit_mb=1400)
+    page = FakePage(heap_mb=450)
+    assert watchdog.after_video(page) == RECYCLE_PAGE
+
+    rss[12] = 1200
+    assert watchdog.after_video(FakePage()) == RESTART_CONTEXT
+    watchdog.record(RESTART_CONTEXT)
+    watchdog.reset_context()
+    assert watchdog.sessions == {} and watchdog.context_videos == 0
+    assert watchdog.stats()["restarts"] == 1
+    print(f"✅ Ngưỡng bộ nhớ: {watchdog.stats()['peak']}")
+
+def test_restart_after_videos():
+    """Khởi động lại context định kỳ khi đặt restart_after"""
+
+    watchdog = make_watchdog({}, recycle_after=0, restart_after=2)
+    page = FakePage()
+    assert watchdog.after_video(page) is None
+    assert watchdog.after_video(page) == RESTART_CONTEXT
+    # Không đo được RSS: chỉ dựa vào heap của page
+    assert "browser_mb" not in watchdog.stats()["last"]
+    print("✅ Khởi động lại context sau M video")
+
+if __name__ == "__main__":
+    test_recycle_after_videos()
+    test_memory_thresholds()
+    test_restart_after_videos()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test planning mode: một lần gọi LLM cho cả flow, lập lại plan khi selector hỏng (page và LLM giả)
+"""
+
+import json
+import os
+import sys
+import tempfile
+sys.path.append('src')
+os.environ.setdefault("SELECTOR_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "selector_cache.json"))
+
+from src.agent.youtube_share_plan import SharePlanner, plan_strategy
+from src.agent.youtube_share_steps import ShareStep, run_step
+
+class FakeSchema:
+    """Thay cho schema Pydantic: chỉ cần model_validate"""
+
+    @staticmethod
+    def model_validate(data):
+        return data
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+class ScriptedLLM:
+    """LLM không hỗ trợ structured output, trả lần lượt các plan"""
+
+    def __init__(self, plans):
+        self.plans = list(plans)
+        self.prompts = []
+
+    def with_structured_output(self, schema, include_raw=False):
+        raise NotImplementedError
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return FakeMessage(json.dumps(self.plans.pop(0)))
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+
+    @property
+    def first(self):
+        return self
+
+    def locator(self, selector):
+        return FakeLocator(self.page, selector)
+
+    def click(self, timeout=None):
+        if self.selector not in self.page.selectors:
+            raise TimeoutError(f"Timeout {timeout}ms: {self.selector}")
+        self.page.clicked.append(self.selector)
+
+    def wait_for(self, state=None, timeout=None):
+        self.click(timeout)
+
+class FakePage:
+    """Page giả: chỉ các selector trong selectors tồn tại"""
+
+    def __init__(self, selectors):
+        self.selectors = set(selectors)
+        self.clicked = []
+
+    def evaluate(self, script, arg=None):
+        if isinstance(arg, dict):
+            # Snapshot DOM
+            return {"texts": ["Chế độ hiển thị", "Lưu"], "elements": [
+                {"sid": "1", "text": "Chế độ hiển thị", "tagName": "BUTTON", "selector": "#visibility"}
+            ], "inputs": []}
+        if arg is not None:
+            # Fingerprint DOM của selector cache
+            return {"lang": "vi", "structure": "0:"}
+        return "vi"
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+PLAN = {"visibility": "#visibility", "share": "#share", "email": "#email", "popup_done": "#done", "save": "#save"}
+
+def test_single_plan_call():
+    """Cả 5 bước chạy theo một plan, plan dùng lại cho video sau"""
+
+    llm = ScriptedLLM([PLAN])
+    planner = SharePlanner(lambda: llm, schema=FakeSchema)
+    page = FakePage(PLAN.values())
+    filled = []
+
+    for video in range(2):
+        planner.begin_video()
+        llm_calls = 0
+        for step in PLAN:
+            fill = (lambda page, field: filled.append(field.selector)) if step == "email" else None
+            result = run_step(page, ShareStep(step, [plan_strategy(planner, step, fill=fill)]))
+            assert result["success"], step
+            llm_calls += result["llm_calls"]
+        assert llm_calls == (1 if video == 0 else 0)
+
+    assert len(llm.prompts) == 1
+    assert "Mẫu dialog" in llm.prompts[0] and "#visibility" in llm.prompts[0]
+    assert page.clicked.count("#save") == 2 and filled == ["#email", "#email"]
+    assert planner.stats()["hits"] == 10
+    print(f"✅ Một lần gọi LLM cho 2 video: {planner.stats()}")
+
+def test_replan_on_miss():
+    """Selector hỏng: lập lại plan một lần, không vượt số lần gọi LLM của video"""
+
+    llm = ScriptedLLM([PLAN, dict(PLAN, save="#save-button")])
+    planner = SharePlanner(lambda: llm, schema=FakeSchema)
+    page = FakePage(["#visibility", "#save-button"])
+
+    # Video 1: plan lập ở bước đầu, selector Lưu hỏng nhưng đã hết lượt gọi LLM
+    planner.begin_video()
+    assert run_step(page, ShareStep("visibility", [plan_strategy(planner, "visibility")]))["success"]
+    assert not run_step(page, ShareStep("save", [plan_strategy(planner, "save")]))["success"]
+    assert len(llm.prompts) == 1
+
+    # Video 2: plan cũ hỏng ở bước Lưu → lập lại plan
+    planner.begin_video()
+    result = run_step(page, ShareStep("save", [plan_strategy(planner, "save")]))
+    assert result["success"] and result["llm_calls"] == 1
+    assert 'Selector cũ của bước "save"' in llm.prompts[1]
+    assert page.clicked[-1] == "#save-button"
+
+    stats = planner.stats()
+    assert stats["plans"] == 1 and stats["replans"] == 1 and stats["over_budget"] == 1
+    print(f"✅ Lập lại plan khi selector hỏng: {stats}")
+
+def test_replan_drops_failed_selector():
+    """Plan mới không có selector cho bước hỏng: bỏ selector hỏng, giữ selector của các bước khác"""
+
+    llm = ScriptedLLM([PLAN, {"save": None, "reason": "không thấy nút Lưu"}])
+    planner = SharePlanner(lambda: llm, schema=FakeSchema, max_calls_per_video=2)
+    page = FakePage(["#visibility"])
+
+    planner.begin_video()
+    assert not run_step(page, ShareStep("save", [plan_strategy(planner, "save")]))["success"]
+    plan = planner.current_plan(page)
+    assert "save" not in plan and plan["visibility"] == "#visibility"
+    print("✅ Bỏ selector hỏng khi lập lại plan")
+
+if __name__ == "__main__":
+    test_single_plan_call()
+    test_replan_on_miss()
+    test_replan_drops_failed_selector()
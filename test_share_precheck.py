@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Test kiểm tra trước khi chia sẻ: tính email còn thiếu và dừng flow sớm (không cần browser)
+"""
+
+import sys
+sys.path.append('src')
+
+from src.agent.youtube_share_precheck import email_delta
+from src.agent.youtube_share_steps import ShareStep, Strategy, run_steps
+
+def test_email_delta():
+    """Email đã có trong dialog (không phân biệt hoa thường) bị bỏ qua"""
+
+    pending, already_shared = email_delta(["A@gmail.com", "b@gmail.com"], ["a@gmail.com", "owner@gmail.com"])
+    assert pending == ["b@gmail.com"]
+    assert already_shared == ["A@gmail.com"]
+    print("✅ Tính đúng email còn thiếu")
+
+def test_run_steps_finishes_early():
+    """Bước precheck không còn email thì các bước sau (Lưu) không chạy"""
+
+    clicked = []
+    steps = [
+        ShareStep("precheck", [Strategy("shared_list", lambda page, t: {"pending": [], "already_shared": ["a@gmail.com"]})],
+                  finish_if=lambda result: not result["data"]["pending"]),
+        ShareStep("save", [Strategy("click", lambda page, t: clicked.append("save") or True)])
+    ]
+    results = run_steps(None, steps)
+
+    assert [r["step"] for r in results] == ["precheck"]
+    assert results[0]["finished"]
+    assert clicked == []
+    print("✅ Bỏ qua bước Lưu khi không có thay đổi")
+
+if __name__ == "__main__":
+    test_email_delta()
+    test_run_steps_finishes_early()
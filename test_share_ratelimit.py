@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test giới hạn tốc độ và backoff khi Studio giới hạn (đồng hồ giả, không cần browser)
+"""
+
+import sys
+sys.path.append('src')
+
+from src.agent.youtube_share_ratelimit import TokenBucket, AccountBackoff, ShareRateLimiter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class FakeResponse:
+    def __init__(self, status, url):
+        self.status = status
+        self.url = url
+
+def test_token_bucket():
+    """Burst đi ngay, sau đó chờ đúng theo tốc độ"""
+
+    clock = FakeClock()
+    bucket = TokenBucket(60, burst=2, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert abs(bucket.acquire() - 1.0) < 1e-9
+    clock.now += 5
+    # Token dồn lại không vượt quá burst
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() > 0
+    print(f"✅ Chờ {sum(clock.sleeps):.1f}s cho 6 lần lấy token")
+
+def test_backoff():
+    """Backoff tăng lũy thừa, có trần và reset khi thành công"""
+
+    clock = FakeClock()
+    backoff = AccountBackoff(base_s=5, max_s=30, clock=clock, rand=lambda: 1.0)
+    assert [backoff.record_throttle() for _ in range(5)] == [5, 10, 20, 30, 30]
+    assert backoff.remaining() == 30
+    backoff.record_success()
+    assert backoff.failures == 0
+    assert AccountBackoff(base_s=5, clock=clock, rand=lambda: 0.0).record_throttle() == 2.5
+    print("✅ Backoff đúng")
+
+def test_throttle_detection():
+    """Chỉ 429 của RPC flow chia sẻ được coi là bị giới hạn (không tính telemetry); limiter chờ hết backoff trước lần điều hướng sau"""
+
+    clock = FakeClock()
+    limiter = ShareRateLimiter("kenh-a", navigation_rate=600, clock=clock, sleep=clock.sleep)
+    limiter.on_response(FakeResponse(200, "https://studio.youtube.com/youtubei/v1/video_manager/metadata_update"))
+    limiter.on_response(FakeResponse(429, "https://i.ytimg.com/vi/abc/hq.jpg"))
+    # Telemetry bị giới hạn không ảnh hưởng flow chia sẻ
+    limiter.on_response(FakeResponse(429, "https://studio.youtube.com/youtubei/v1/log_event?alt=json"))
+    limiter.on_response(FakeResponse(429, "https://www.youtube.com/api/stats/qoe?event=streamingstats"))
+    assert limiter.take_throttled() == []
+
+    limiter.on_response(FakeResponse(429, "https://studio.youtube.com/youtubei/v1/video_manager/metadata_update?alt=json"))
+    signals = limiter.take_throttled()
+    assert signals == ["HTTP 429 https://studio.youtube.com/youtubei/v1/video_manager/metadata_update"]
+    assert limiter.take_throttled() == []
+
+    delay = limiter.record_throttle(signals)
+    limiter.acquire("navigation")
+    assert abs(limiter.stats()["waited"]["backoff"] - delay) < 1e-9
+
+    # Số lần bị giới hạn là tổng cộng dồn, không reset khi thành công
+    limiter.record_success()
+    limiter.record_throttle(["toast: try again later"])
+    assert limiter.stats()["throttles"] == 2 and limiter.backoff.failures == 1
+    print(f"✅ {limiter.stats()}")
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_backoff()
+    test_throttle_detection()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test chia video theo profile của kênh sở hữu (không cần browser)
+"""
+
+import os
+import sys
+sys.path.append('src')
+
+from src.agent.youtube_share_shards import route_videos, shard_name
+
+def test_route_videos():
+    """Video được gửi tới profile của kênh, kênh dùng chung profile gộp một shard"""
+
+    videos = {"vid1": ["a@gmail.com"], "vid2": ["b@gmail.com"], "vid3": ["c@gmail.com"], "vid4": ["d@gmail.com"]}
+    channels = {"vid1": "kenh-a", "vid2": "kenh-b", "vid3": "kenh-c", "vid4": "kenh-x"}
+    profiles = {"kenh-a": "/profiles/a", "kenh-b": "/profiles/b", "kenh-c": "/profiles/a"}
+
+    shards, unrouted = route_videos(videos, channels, profiles)
+
+    assert unrouted == ["vid4"]
+    a, b = os.path.normpath("/profiles/a"), os.path.normpath("/profiles/b")
+    assert set(shards) == {a, b}
+    assert shards[a]["channels"] == ["kenh-a", "kenh-c"]
+    assert shards[a]["videos"] == {"vid1": ["a@gmail.com"], "vid3": ["c@gmail.com"]}
+    assert shards[b]["videos"] == {"vid2": ["b@gmail.com"]}
+    print("✅ Chia video theo profile đúng")
+
+def test_route_single_profile():
+    """Manifest không có cột channel dùng profile duy nhất"""
+
+    shards, unrouted = route_videos({"vid1": ["a@gmail.com"]}, {}, {"kenh-a": "/profiles/a"})
+    assert unrouted == []
+    assert shards[os.path.normpath("/profiles/a")]["videos"] == {"vid1": ["a@gmail.com"]}
+    print("✅ Một profile nhận tất cả video")
+
+def test_shard_name_slug():
+    """Tên kênh có ký tự không an toàn cho đường dẫn được thay trước khi dùng trong job id"""
+
+    assert shard_name({"channels": ["kenh-a", "kenh-c"]}, 1) == "kenh-a-kenh-c"
+    assert shard_name({"channels": ["../Kênh B/x"]}, 2) == "Kênh-B-x"
+    assert shard_name({"channels": [""]}, 3) == "shard3"
+    print("✅ Tên shard an toàn cho job id")
+
+if __name__ == "__main__":
+    test_route_videos()
+    test_route_single_profile()
+    test_shard_name_slug()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test span và tổng hợp p50/p95 của flow chia sẻ (không cần browser)
+"""
+
+import json
+import sys
+import tempfile
+sys.path.append('src')
+
+from src.agent.youtube_share_trace import Tracer, percentile
+from src.agent.youtube_share_steps import ShareStep, Strategy, run_steps
+import src.agent.youtube_share_trace as trace
+
+def test_percentile():
+    """Percentile nearest-rank"""
+
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) == 0.0
+    print("✅ Percentile đúng")
+
+def test_step_spans_export():
+    """Bước và lần thử strategy được ghi span, xuất được JSON và trace-event"""
+
+    tracer = Tracer()
+    original, trace._tracer = trace._tracer, tracer
+    steps = [
+        ShareStep("share", [
+            Strategy("role_locator", lambda page, t: False),
+            Strategy("smart_find", lambda page, t: True, uses_llm=True)
+        ])
+    ]
+    try:
+        with tracer.span("batch", "batch"):
+            run_steps(None, steps)
+            with tracer.span("ask", "llm", input_tokens=120, output_tokens=30):
+                pass
+    finally:
+        trace._tracer = original
+
+    summary = tracer.summary()
+    assert summary["steps"]["share"]["count"] == 1
+    assert summary["steps"]["share"]["retries"] == 1
+    assert summary["strategies"]["share/smart_find"]["wins"] == 1
+    assert summary["strategies"]["share/role_locator"]["wins"] == 0
+    assert summary["llm"]["input_tokens"] == 120
+    assert 0 <= summary["llm"]["share_of_wall"] <= 1
+
+    summary_path, trace_path = tracer.export("test", directory=tempfile.mkdtemp())
+    with open(trace_path, encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    assert {e["cat"] for e in events} == {"batch", "step", "strategy", "llm"}
+    assert all(e["ph"] == "X" for e in events)
+    print(f"✅ {len(events)} trace event")
+
+if __name__ == "__main__":
+    test_percentile()
+    test_step_spans_export()
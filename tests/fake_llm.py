@@ -0,0 +1,25 @@
+"""
+LLM giả trả lời theo kịch bản cho benchmark/test offline (không cần GOOGLE_API_KEY).
+Thay factory "google" của registry client LLM nên mọi lần gọi qua invoke_llm
+vẫn được đếm như LLM thật.
+"""
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.agent.youtube_share_llm import get_llm_registry
+
+# Câu trả lời mặc định: "không tìm thấy" cho các hàm tìm element, "wait" cho ask_ai_for_action
+DEFAULT_RESPONSES = [
+    '{"found": false, "action": "wait", "reason": "fake llm"}',
+]
+
+
+def install_fake_llm(responses=None):
+    """
+    Dùng LLM giả cho mọi client tạo từ registry. responses được trả lần lượt (quay vòng).
+    Trả về registry để đọc số lần gọi.
+    """
+    registry = get_llm_registry()
+    scripted = list(responses or DEFAULT_RESPONSES)
+    registry.factories = {"google": lambda model, **params: FakeListChatModel(responses=scripted)}
+    registry.clients.clear()
+    return registry
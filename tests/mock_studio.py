@@ -0,0 +1,259 @@
+"""
+Studio giả lập chạy local cho benchmark flow chia sẻ (không cần profile/mạng).
+Mô phỏng trang edit video: nút Chế độ hiển thị, dialog hiển thị, dialog chia sẻ
+riêng tư (danh sách email đã chia sẻ + ô nhập), nút Xong/Lưu được bật có độ trễ,
+và RPC lưu metadata_update. Hỗ trợ giao diện tiếng Việt và tiếng Anh.
+
+    server = MockStudioServer(lang="en").start()
+    os.environ["STUDIO_URL"] = server.url
+"""
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAVE_RPC_PATH = "/youtubei/v1/video_manager/metadata_update"
+
+LABELS = {
+    "vi": {
+        "visibility": "Chế độ hiển thị",
+        "private": "Riêng tư",
+        "share": "Chia sẻ riêng tư",
+        "edit": "Chỉnh sửa",
+        "done": "Xong",
+        "cancel": "Hủy",
+        "save": "Lưu",
+        "placeholder": "Nhập địa chỉ email",
+        "shared_with": "Đã chia sẻ với",
+    },
+    "en": {
+        "visibility": "Visibility",
+        "private": "Private",
+        "share": "Share privately",
+        "edit": "Edit",
+        "done": "Done",
+        "cancel": "Cancel",
+        "save": "Save",
+        "placeholder": "Enter email addresses",
+        "shared_with": "Shared with",
+    },
+}
+
+EDIT_PAGE_HTML = """<!DOCTYPE html>
+<html lang="{lang}">
+<head>
+<meta charset="utf-8">
+<title>Video details - YouTube Studio (mock)</title>
+<style>
+    body {{ font-family: sans-serif; margin: 0; }}
+    ytcp-button {{ display: inline-block; padding: 6px 12px; margin: 4px; border: 1px solid #999; cursor: pointer; }}
+    ytcp-button[aria-disabled="true"] {{ opacity: 0.4; cursor: default; }}
+    tp-yt-paper-dialog {{ display: none; position: absolute; top: 60px; left: 60px; width: 480px;
+                          background: #fff; border: 1px solid #333; padding: 12px; }}
+    tp-yt-paper-dialog.opened {{ display: block; }}
+    #share-dialog {{ top: 100px; left: 100px; }}
+    textarea {{ width: 100%; height: 60px; }}
+</style>
+</head>
+<body>
+<ytcp-app id="app">
+    <h1>{video_id}</h1>
+    <div id="toolbar"></div>
+    <img src="/thumbnail/{video_id}.jpg" width="160" height="90" alt="">
+</ytcp-app>
+
+<tp-yt-paper-dialog id="visibility-dialog" role="dialog">
+    <tp-yt-paper-radio-button role="radio" aria-checked="true">{private}</tp-yt-paper-radio-button>
+    <ytcp-button id="share-button" role="button"></ytcp-button>
+    <ytcp-button id="visibility-done" role="button">{done}</ytcp-button>
+</tp-yt-paper-dialog>
+
+<tp-yt-paper-dialog id="share-dialog" role="dialog">
+    <div>{shared_with}:</div>
+    <div id="shared-list"></div>
+    <textarea id="email-input" placeholder="{placeholder}" aria-label="{placeholder}"></textarea>
+    <ytcp-button id="share-cancel" role="button">{cancel}</ytcp-button>
+    <ytcp-button id="share-done" role="button" aria-disabled="true">{done}</ytcp-button>
+</tp-yt-paper-dialog>
+
+<script>
+(() => {{
+    const config = {config};
+    const labels = config.labels;
+    let shared = config.shared.slice();
+    let pending = [];
+    const $ = (id) => document.getElementById(id);
+    const later = (fn) => setTimeout(fn, config.delayMs);
+    const setEnabled = (el, enabled) => el.setAttribute('aria-disabled', enabled ? 'false' : 'true');
+    const isEnabled = (el) => el.getAttribute('aria-disabled') !== 'true';
+    const open = (el) => el.classList.add('opened');
+    const close = (el) => el.classList.remove('opened');
+    const renderShared = () => {{
+        $('shared-list').innerHTML = shared.map(e => '<div class="shared-email" title="' + e + '">' + e + '</div>').join('');
+        $('share-button').textContent = shared.length ? labels.edit : labels.share;
+    }};
+
+    // App "khởi động" chậm: nút chỉ xuất hiện sau bootMs
+    setTimeout(() => {{
+        const visibility = document.createElement('ytcp-button');
+        visibility.id = 'visibility-button';
+        visibility.setAttribute('role', 'button');
+        visibility.textContent = labels.visibility;
+        visibility.addEventListener('click', () => later(() => open($('visibility-dialog'))));
+        const save = document.createElement('ytcp-button');
+        save.id = 'save-button';
+        save.setAttribute('role', 'button');
+        save.setAttribute('aria-disabled', 'true');
+        save.textContent = labels.save;
+        save.addEventListener('click', async () => {{
+            if (!isEnabled(save)) return;
+            setEnabled(save, false);
+            await fetch(config.saveRpc, {{
+                method: 'POST',
+                headers: {{'Content-Type': 'application/json'}},
+                body: JSON.stringify({{videoId: config.videoId, emails: shared}})
+            }});
+        }});
+        $('toolbar').append(visibility, save);
+    }}, config.bootMs);
+
+    $('share-button').addEventListener('click', () => later(() => {{
+        renderShared();
+        $('email-input').value = '';
+        setEnabled($('share-done'), false);
+        open($('share-dialog'));
+    }}));
+    $('email-input').addEventListener('input', () => {{
+        const hasText = $('email-input').value.trim().length > 0;
+        later(() => setEnabled($('share-done'), hasText));
+    }});
+    $('share-done').addEventListener('click', () => {{
+        if (!isEnabled($('share-done'))) return;
+        pending = $('email-input').value.split(/[\\s,;]+/).filter(e => e.includes('@'));
+        pending.forEach(e => {{ if (!shared.includes(e.toLowerCase())) shared.push(e.toLowerCase()); }});
+        later(() => {{ close($('share-dialog')); renderShared(); }});
+    }});
+    $('share-cancel').addEventListener('click', () => close($('share-dialog')));
+    $('visibility-done').addEventListener('click', () => later(() => {{
+        close($('visibility-dialog'));
+        if (pending.length) setEnabled(document.getElementById('save-button'), true);
+    }}));
+    document.addEventListener('keydown', (event) => {{
+        if (event.key !== 'Escape') return;
+        const opened = Array.from(document.querySelectorAll('tp-yt-paper-dialog.opened'));
+        if (opened.length) close(opened[opened.length - 1]);
+    }});
+    renderShared();
+}})();
+</script>
+</body>
+</html>
+"""
+
+EDIT_PATH_RE = re.compile(r"^/video/([A-Za-z0-9_-]{11})/edit/?$")
+
+
+class MockStudioServer:
+    """
+    HTTP server giả lập Studio. shares: {video_id: [email, ...]} đã lưu qua RPC.
+    """
+
+    def __init__(self, lang="vi", host="127.0.0.1", port=0, boot_ms=300, delay_ms=150, save_delay_ms=200):
+        if lang not in LABELS:
+            raise ValueError(f"Ngôn ngữ không hỗ trợ: {lang}")
+        self.lang = lang
+        self.boot_ms = boot_ms
+        self.delay_ms = delay_ms
+        self.save_delay_ms = save_delay_ms
+        self.shares = {}
+        self.requests = {"page": 0, "save": 0, "asset": 0}
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self.make_handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def render_edit_page(self, video_id):
+        with self.lock:
+            shared = list(self.shares.get(video_id, []))
+        config = {
+            "videoId": video_id,
+            "labels": LABELS[self.lang],
+            "shared": shared,
+            "bootMs": self.boot_ms,
+            "delayMs": self.delay_ms,
+            "saveRpc": SAVE_RPC_PATH,
+        }
+        return EDIT_PAGE_HTML.format(
+            lang=self.lang,
+            video_id=video_id,
+            config=json.dumps(config),
+            **LABELS[self.lang]
+        )
+
+    def record_save(self, video_id, emails):
+        with self.lock:
+            self.requests["save"] += 1
+            existing = self.shares.setdefault(video_id, [])
+            for email in emails:
+                if email not in existing:
+                    existing.append(email)
+
+    def make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_body(self, status, body, content_type):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                match = EDIT_PATH_RE.match(path)
+                if match:
+                    with server.lock:
+                        server.requests["page"] += 1
+                    self.send_body(200, server.render_edit_page(match.group(1)), "text/html; charset=utf-8")
+                    return
+                with server.lock:
+                    server.requests["asset"] += 1
+                self.send_body(404, "", "text/plain")
+
+            def do_POST(self):
+                path = self.path.split("?", 1)[0]
+                if path != SAVE_RPC_PATH:
+                    self.send_body(404, "", "text/plain")
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                # Mô phỏng độ trễ RPC lưu của Studio
+                threading.Event().wait(server.save_delay_ms / 1000)
+                server.record_save(payload.get("videoId"), payload.get("emails", []))
+                self.send_body(200, json.dumps({"success": True}), "application/json")
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()